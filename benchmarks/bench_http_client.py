@@ -0,0 +1,79 @@
+# bench_http_client.py
+"""
+Benchmark of a fresh BanRep session per call vs the shared pooled client
+
+Usage: python benchmarks/bench_http_client.py [--calls 500] [--latency 0.0]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.banrep_api import BanRepAPI
+from data.banrep_replay import BanRepStandInServer
+
+
+# Respuesta grabada de /series/TRM/latest que sirve el servidor de reemplazo
+TRM_LATEST = {
+    "status": 200,
+    "content_type": "application/json",
+    "body": json.dumps({"series_id": "TRM", "date": "2024-05-30", "value": 3870.45})
+}
+
+
+def time_calls(get_client, calls):
+    """
+    Mide la latencia de llamadas secuenciales a get_trm().
+    
+    Args:
+        get_client (callable): Devuelve el cliente a usar en cada llamada
+        calls (int): Número de llamadas
+    
+    Returns:
+        list: Latencias por llamada en milisegundos
+    """
+    latencies = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        api = get_client()
+        if api.get_trm() is None:
+            raise RuntimeError("el servidor de reemplazo no respondió")
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=500, help="llamadas secuenciales por variante")
+    parser.add_argument("--latency", type=float, default=0.0, help="latencia inyectada por respuesta (s)")
+    args = parser.parse_args()
+    
+    with BanRepStandInServer(interactions={"/series/TRM/latest": TRM_LATEST}, latency=args.latency) as server:
+        # Comportamiento anterior: un BanRepAPI (y una requests.Session) nuevo por llamada
+        def fresh_client():
+            return BanRepAPI(base_url=server.url, session=requests.Session())
+        
+        # Cliente compartido: un solo pool keep-alive para todas las llamadas
+        pooled = BanRepAPI(base_url=server.url)
+        try:
+            results = {
+                "sesión nueva por llamada": time_calls(fresh_client, args.calls),
+                "cliente compartido con pool": time_calls(lambda: pooled, args.calls)
+            }
+        finally:
+            pooled.close()
+    
+    print(f"{args.calls} llamadas get_trm() contra {server.url} (latencia inyectada {args.latency * 1000:.1f} ms)")
+    for name, latencies in results.items():
+        print(f"  {name:<28} media {statistics.mean(latencies):7.2f} ms   "
+              f"mediana {statistics.median(latencies):7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# bench_indicators.py
+"""
+Benchmark of the batched SMA/EMA/MACD kernels vs calling calculate_sma/calculate_macd per timestep
+
+Usage: python benchmarks/bench_indicators.py [--series 40] [--steps 2500] [--samples 200 40]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.indicators import batch_ema, batch_macd, batch_sma, calculate_macd, calculate_sma
+
+
+# Períodos de SMA y combinaciones (rápido, lento, señal) de MACD a calcular
+SMA_WINDOWS = [20, 45, 90]
+MACD_PERIODS = [(12, 26, 9), (5, 35, 5)]
+
+
+def best_time(func, repeat=5):
+    """
+    Mejor tiempo de varias ejecuciones.
+    
+    Args:
+        func (callable): Función sin argumentos a medir
+        repeat (int): Número de ejecuciones
+    
+    Returns:
+        float: Mejor tiempo en segundos
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def per_call_time(matrix, calls, samples, rng, compute):
+    """
+    Estima el tiempo de calcular un indicador por separado en cada (serie, período,
+    instante), midiendo una muestra de llamadas y extrapolando al total.
+    
+    Args:
+        matrix (np.ndarray): Matriz (series x tiempo)
+        calls (list): Combinaciones de períodos a calcular en cada instante
+        samples (int): Llamadas a medir
+        rng (np.random.Generator): Generador para elegir las muestras
+        compute (callable): compute(prefijo, combinación) con la llamada por separado
+    
+    Returns:
+        float: Tiempo total estimado en segundos
+    """
+    n_series, n_time = matrix.shape
+    total_calls = n_series * n_time * len(calls)
+    # Llamada de calentamiento (calculate_macd importa pandas la primera vez)
+    compute(list(matrix[0]), calls[0])
+    elapsed = 0.0
+    for _ in range(samples):
+        series = matrix[rng.integers(n_series)]
+        call = calls[rng.integers(len(calls))]
+        prefix = list(series[:rng.integers(1, n_time + 1)])
+        start = time.perf_counter()
+        compute(prefix, call)
+        elapsed += time.perf_counter() - start
+    return elapsed / samples * total_calls
+
+
+def calculate_sma_or_nan(prefix, window):
+    """calculate_sma, devolviendo NaN cuando la ventana no está completa (como batch_sma)."""
+    return calculate_sma(prefix, window) if len(prefix) >= window else float("nan")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--series", type=int, default=40, help="número de series")
+    parser.add_argument("--steps", type=int, default=2500, help="instantes por serie")
+    parser.add_argument("--samples", type=int, nargs=2, default=[200, 40],
+                        help="llamadas por separado a medir para SMA y MACD")
+    args = parser.parse_args()
+    
+    rng = np.random.default_rng(0)
+    matrix = 4000 + rng.normal(0, 20, size=(args.series, args.steps)).cumsum(axis=1)
+    spans = sorted({span for fast, slow, _ in MACD_PERIODS for span in (fast, slow)})
+    
+    batched = {
+        "batch_sma": best_time(lambda: batch_sma(matrix, SMA_WINDOWS)),
+        "batch_ema": best_time(lambda: batch_ema(matrix, spans)),
+        "batch_macd": best_time(lambda: batch_macd(matrix, MACD_PERIODS))
+    }
+    per_call = {
+        "calculate_sma": per_call_time(matrix, SMA_WINDOWS, args.samples[0], rng, calculate_sma_or_nan),
+        "calculate_macd": per_call_time(matrix, MACD_PERIODS, args.samples[1], rng,
+                                        lambda prefix, periods: calculate_macd(prefix, *periods))
+    }
+    
+    print(f"{args.series} series x {args.steps} instantes; SMA {SMA_WINDOWS}, MACD {MACD_PERIODS}")
+    for name, seconds in batched.items():
+        print(f"  {name:<15} {seconds * 1000:10.1f} ms")
+    for name, seconds in per_call.items():
+        print(f"  {name:<15} {seconds:10.2f} s   (estimado a partir de una muestra de llamadas)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+# bench_portfolio_queries.py
+"""
+Benchmark of portfolio query latency on a large database with and without the schema indexes
+
+Usage: python benchmarks/bench_portfolio_queries.py [--rows 10000000] [--repeat 20] [--db PATH]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.portfolio import Portfolio
+
+
+# Inversiones por mes en los datos sintéticos (cada consulta por mes devuelve unas 100 filas)
+ROWS_PER_MONTH = 100
+
+# Las fechas TEXT YYYY-MM-DD solo llegan al año 9999: la TRM se limita a ~3M días
+MAX_TRM_ROWS = 3000000
+
+# Índices de la migración 1 que se eliminan para medir las consultas sin ellos
+MIGRATION_INDEXES = ["idx_investments_month", "idx_investments_status", "ux_trm_history_date"]
+
+
+def populate(db_path, rows):
+    """
+    Llena investments y trm_history con datos sintéticos generados dentro de SQLite.
+    
+    Args:
+        db_path (str): Ruta de la base de datos (ya migrada por Portfolio)
+        rows (int): Número de inversiones
+    
+    Returns:
+        int: Número de fechas de TRM insertadas
+    """
+    trm_rows = min(rows, MAX_TRM_ROWS)
+    conn = sqlite3.connect(db_path)
+    try:
+        with conn:
+            # 1% de inversiones activas; ROWS_PER_MONTH inversiones por mes
+            conn.execute('''
+                INSERT INTO investments (month, amount, currency, instrument, nominal_rate,
+                                         real_rate, start_date, end_date, status)
+                WITH RECURSIVE seq(n) AS (SELECT 0 UNION ALL SELECT n + 1 FROM seq WHERE n + 1 < ?1)
+                SELECT n / ?2 + 1, 1000 + n % 997, CASE n % 2 WHEN 0 THEN 'COP' ELSE 'USD' END,
+                       'Banco ' || (n % 8), 5 + (n % 50) / 10.0, 1 + (n % 30) / 10.0,
+                       '2024-01-01', '2024-02-01', CASE n % 100 WHEN 0 THEN 'active' ELSE 'completed' END
+                FROM seq
+            ''', (rows, ROWS_PER_MONTH))
+            conn.execute('''
+                INSERT INTO trm_history (date, trm_value)
+                WITH RECURSIVE seq(n) AS (SELECT 0 UNION ALL SELECT n + 1 FROM seq WHERE n + 1 < ?1)
+                SELECT date(julianday('0001-01-01') + n), 4000 + n % 500 FROM seq
+            ''', (trm_rows,))
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+    return trm_rows
+
+
+def median_latency(query, repeat):
+    """
+    Latencia mediana de una consulta.
+    
+    Args:
+        query (callable): Consulta sin argumentos
+        repeat (int): Número de ejecuciones
+    
+    Returns:
+        float: Latencia mediana en milisegundos
+    """
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        query()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return statistics.median(latencies)
+
+
+def run_queries(portfolio, months, trm_rows, repeat, rng):
+    """
+    Mide las consultas que aprovechan los índices de la migración 1.
+    
+    Args:
+        portfolio (Portfolio): Portfolio sobre la base de datos poblada
+        months (int): Número de meses con inversiones
+        trm_rows (int): Número de fechas de TRM
+        repeat (int): Ejecuciones por consulta
+        rng (random.Random): Generador para elegir meses y fechas
+    
+    Returns:
+        dict: Latencia mediana en milisegundos por consulta
+    """
+    # Fechas en la segunda mitad del historial, como en una simulación en curso
+    def until():
+        return date.fromordinal(rng.randrange(trm_rows // 2, trm_rows) + 1).isoformat()
+    
+    return {
+        f"inversiones por mes ({ROWS_PER_MONTH} filas)":
+            median_latency(lambda: portfolio.get_historical_investments(rng.randint(1, months)), repeat),
+        "load_investment_columns por mes":
+            median_latency(lambda: portfolio.load_investment_columns(month=rng.randint(1, months)), repeat),
+        "load_investment_columns activas (1%)":
+            median_latency(lambda: portfolio.load_investment_columns(["amount"], status="active"), repeat),
+        "últimos 45 valores de TRM hasta una fecha":
+            median_latency(lambda: portfolio.get_trm_values(45, until=until()), repeat),
+        "rango de fechas de TRM hasta una fecha":
+            median_latency(lambda: portfolio.get_trm_date_range(until=until()), repeat)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000000, help="filas de investments (y de TRM, hasta 3M)")
+    parser.add_argument("--repeat", type=int, default=20, help="ejecuciones por consulta")
+    parser.add_argument("--db", help="base de datos a crear (por defecto, un archivo temporal)")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_path = args.db or os.path.join(tmpdir, "bench_portfolio.db")
+        Portfolio(db_path).close()
+        
+        start = time.perf_counter()
+        trm_rows = populate(db_path, args.rows)
+        print(f"{args.rows} inversiones y {trm_rows} fechas de TRM cargadas en "
+              f"{time.perf_counter() - start:.1f} s ({os.path.getsize(db_path) / 1e9:.2f} GB)")
+        
+        months = (args.rows - 1) // ROWS_PER_MONTH + 1
+        portfolio = Portfolio(db_path)
+        try:
+            indexed = run_queries(portfolio, months, trm_rows, args.repeat, random.Random(0))
+            
+            # Mismas consultas sin los índices de la migración 1 (estado anterior al esquema versionado)
+            conn = sqlite3.connect(db_path)
+            for index in MIGRATION_INDEXES:
+                conn.execute(f"DROP INDEX {index}")
+            conn.execute("ANALYZE")
+            conn.close()
+            unindexed = run_queries(portfolio, months, trm_rows, args.repeat, random.Random(0))
+        finally:
+            portfolio.close()
+    
+    print(f"{'consulta':<44} {'sin índices':>12} {'con índices':>12}")
+    for name, latency in indexed.items():
+        print(f"  {name:<42} {unindexed[name]:>9.2f} ms {latency:>9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
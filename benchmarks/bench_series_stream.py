@@ -0,0 +1,145 @@
+# bench_series_stream.py
+"""
+Benchmark of json() + list of floats vs the streaming NumPy parser for series payloads
+
+Usage: python benchmarks/bench_series_stream.py [--rows 10000 1000000] [--repeat 3] [--http]
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.banrep_api import BanRepAPI
+from data.banrep_replay import BanRepStandInServer
+from data.series_stream import parse_series_bytes
+
+
+def make_payload(rows, seed=0):
+    """
+    Genera una respuesta de serie sintética {"series_id", "data": [{"date", "value"}]}.
+    
+    Args:
+        rows (int): Número de registros
+        seed (int): Semilla de los valores
+    
+    Returns:
+        bytes: Cuerpo JSON de la respuesta
+    """
+    dates = np.arange(np.datetime64("1000-01-01"), np.datetime64("1000-01-01") + rows).astype(str)
+    values = np.round(4000 + np.random.default_rng(seed).normal(0, 50, rows).cumsum(), 2)
+    data = [{"date": date, "value": value} for date, value in zip(dates.tolist(), values.tolist())]
+    return json.dumps({"series_id": "TRM", "name": "Tasa Representativa del Mercado", "data": data}).encode("utf-8")
+
+
+def parse_old(body):
+    """Camino anterior: árbol JSON completo y luego una lista de floats."""
+    return [float(item['value']) for item in json.loads(body)['data']]
+
+
+def parse_streaming(body):
+    """Camino por bloques: registros directo a arreglos NumPy de fechas y valores."""
+    return parse_series_bytes(body)
+
+
+def best_time(func, arg, repeat):
+    """
+    Mejor tiempo de varias ejecuciones, sin tracemalloc activo.
+    
+    Args:
+        func (callable): Función a medir
+        arg: Argumento de la función
+        repeat (int): Número de ejecuciones
+    
+    Returns:
+        float: Mejor tiempo en milisegundos
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func(arg)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def peak_memory(func, arg):
+    """
+    Pico de memoria asignada durante una ejecución, medido con tracemalloc.
+    
+    Args:
+        func (callable): Función a medir
+        arg: Argumento de la función
+    
+    Returns:
+        float: Pico en MB (sin contar el cuerpo ya descargado)
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = func(arg)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return peak / 1e6
+
+
+def bench_http(rows, body, repeat):
+    """
+    Mide la descarga más el decodificado contra el servidor de reemplazo.
+    
+    Args:
+        rows (int): Número de registros (usado como parámetro days)
+        body (bytes): Cuerpo que sirve el servidor
+        repeat (int): Número de ejecuciones
+    
+    Returns:
+        tuple: (mejor tiempo anterior, mejor tiempo por bloques) en milisegundos
+    """
+    interaction = {"status": 200, "content_type": "application/json", "body": body.decode("utf-8")}
+    with BanRepStandInServer(interactions={f"/series/TRM/history?days={rows}": interaction}) as server:
+        api = BanRepAPI(base_url=server.url)
+        try:
+            old = best_time(lambda days: [float(item['value']) for item in api.get_trm_history(days=days)['data']], rows, repeat)
+            streaming = best_time(lambda days: api.get_trm_history_arrays(days=days), rows, repeat)
+        finally:
+            api.close()
+    return old, streaming
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 1000000], help="tamaños de la respuesta")
+    parser.add_argument("--repeat", type=int, default=3, help="ejecuciones por medición de tiempo")
+    parser.add_argument("--http", action="store_true", help="medir también a través del servidor de reemplazo")
+    args = parser.parse_args()
+    
+    print(f"{'filas':>9} {'MB':>7}   {'anterior':>22}   {'por bloques':>22}")
+    for rows in args.rows:
+        body = make_payload(rows)
+        
+        # Ambos caminos deben producir los mismos valores
+        dates, values = parse_streaming(body)
+        if len(dates) != rows or not np.array_equal(values, parse_old(body)):
+            raise RuntimeError("el parser por bloques no coincide con json()")
+        del dates, values
+        
+        old = (peak_memory(parse_old, body), best_time(parse_old, body, args.repeat))
+        streaming = (peak_memory(parse_streaming, body), best_time(parse_streaming, body, args.repeat))
+        print(f"{rows:>9} {len(body) / 1e6:>7.1f}   "
+              f"{old[0]:>8.1f} MB / {old[1]:>7.1f} ms   {streaming[0]:>8.1f} MB / {streaming[1]:>7.1f} ms")
+        
+        if args.http:
+            old_ms, streaming_ms = bench_http(rows, body, args.repeat)
+            print(f"{'HTTP':>19}   {old_ms:>18.1f} ms   {streaming_ms:>18.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,9 @@
 """
 Technical indicators module for Global Yield Optimizer v3.0
 """
-import pandas as pd
+import math
+import numpy as np
+from collections import deque
 
 
 def calculate_sma(data, period):
@@ -35,6 +37,9 @@ def calculate_macd(data, fast_period=12, slow_period=26, signal_period=9):
     Returns:
         tuple: (macd_line, signal_line, histogram)
     """
+    # pandas solo se necesita aquí; importarlo al cargar el módulo retrasa el arranque
+    import pandas as pd
+    
     # Convertir a pandas Series para facilitar cálculos
     series = pd.Series(data)
     
@@ -51,4 +56,1148 @@ def calculate_macd(data, fast_period=12, slow_period=26, signal_period=9):
     # Calcular histograma
     histogram = macd_line - signal_line
     
-    return macd_line.iloc[-1], signal_line.iloc[-1], histogram.iloc[-1]
\ No newline at end of file
+    return macd_line.iloc[-1], signal_line.iloc[-1], histogram.iloc[-1]
+
+
+# Cada cuántas actualizaciones se recalculan exactamente las sumas acumuladas,
+# para que el error de redondeo no crezca en series largas
+RESYNC_INTERVAL = 10000
+
+
+class StreamingSMA:
+    """Media móvil simple que se actualiza en O(1) con cada nueva observación."""
+    
+    def __init__(self, period):
+        """
+        Inicializa el indicador.
+        
+        Args:
+            period (int): Período de la media móvil
+        """
+        if period < 1:
+            raise ValueError("El período debe ser mayor o igual a 1")
+        self.period = period
+        self.window = deque(maxlen=period)
+        self.total = 0.0
+        self.updates = 0
+    
+    @property
+    def ready(self):
+        """True cuando la ventana está completa."""
+        return len(self.window) == self.period
+    
+    @property
+    def value(self):
+        """Valor actual de la media, o None si la ventana no está completa."""
+        return self.total / self.period if self.ready else None
+    
+    def update(self, x):
+        """
+        Agrega una observación.
+        
+        Args:
+            x (float): Nueva observación
+        
+        Returns:
+            float: Media actual, o None si la ventana no está completa
+        """
+        x = float(x)
+        if self.ready:
+            self.total -= self.window[0]
+        self.window.append(x)
+        self.total += x
+        
+        self.updates += 1
+        if self.updates % RESYNC_INTERVAL == 0:
+            self.total = math.fsum(self.window)
+        return self.value
+    
+    def to_dict(self):
+        """
+        Serializa el estado del indicador.
+        
+        Returns:
+            dict: Estado serializable en JSON
+        """
+        return {
+            "type": "sma",
+            "period": self.period,
+            "window": list(self.window),
+            "total": self.total,
+            "updates": self.updates
+        }
+    
+    @classmethod
+    def from_dict(cls, state):
+        """
+        Restaura un indicador serializado con to_dict.
+        
+        Args:
+            state (dict): Estado serializado
+        
+        Returns:
+            StreamingSMA: Indicador restaurado
+        """
+        indicator = cls(state["period"])
+        indicator.window.extend(state["window"])
+        indicator.total = state.get("total", math.fsum(indicator.window))
+        indicator.updates = state.get("updates", 0)
+        return indicator
+
+
+class StreamingEMA:
+    """
+    Media móvil exponencial que se actualiza en O(1), equivalente a
+    pandas.Series.ewm(span=span).mean() (con ajuste de pesos, adjust=True).
+    """
+    
+    def __init__(self, span):
+        """
+        Inicializa el indicador.
+        
+        Args:
+            span (int): Período de la media exponencial (alpha = 2 / (span + 1))
+        """
+        if span < 1:
+            raise ValueError("El período debe ser mayor o igual a 1")
+        self.span = span
+        self.decay = 1.0 - 2.0 / (span + 1)
+        self.numerator = 0.0
+        self.denominator = 0.0
+        self.count = 0
+    
+    @property
+    def ready(self):
+        """True cuando hay al menos una observación."""
+        return self.count > 0
+    
+    @property
+    def value(self):
+        """Valor actual de la media, o None si no hay observaciones."""
+        return self.numerator / self.denominator if self.ready else None
+    
+    def update(self, x):
+        """
+        Agrega una observación.
+        
+        Args:
+            x (float): Nueva observación
+        
+        Returns:
+            float: Media exponencial actual
+        """
+        self.numerator = float(x) + self.decay * self.numerator
+        self.denominator = 1.0 + self.decay * self.denominator
+        self.count += 1
+        return self.value
+    
+    def to_dict(self):
+        """
+        Serializa el estado del indicador.
+        
+        Returns:
+            dict: Estado serializable en JSON
+        """
+        return {
+            "type": "ema",
+            "span": self.span,
+            "numerator": self.numerator,
+            "denominator": self.denominator,
+            "count": self.count
+        }
+    
+    @classmethod
+    def from_dict(cls, state):
+        """
+        Restaura un indicador serializado con to_dict.
+        
+        Args:
+            state (dict): Estado serializado
+        
+        Returns:
+            StreamingEMA: Indicador restaurado
+        """
+        indicator = cls(state["span"])
+        indicator.numerator = state["numerator"]
+        indicator.denominator = state["denominator"]
+        indicator.count = state["count"]
+        return indicator
+
+
+class StreamingMACD:
+    """MACD (línea, señal e histograma) que se actualiza en O(1), equivalente a calculate_macd."""
+    
+    def __init__(self, fast_period=12, slow_period=26, signal_period=9):
+        """
+        Inicializa el indicador.
+        
+        Args:
+            fast_period (int): Período para la media móvil rápida
+            slow_period (int): Período para la media móvil lenta
+            signal_period (int): Período para la línea de señal
+        """
+        self.fast = StreamingEMA(fast_period)
+        self.slow = StreamingEMA(slow_period)
+        self.signal = StreamingEMA(signal_period)
+    
+    @property
+    def ready(self):
+        """True cuando hay al menos una observación."""
+        return self.signal.ready
+    
+    @property
+    def value(self):
+        """Valor actual (macd_line, signal_line, histogram), o None si no hay observaciones."""
+        if not self.ready:
+            return None
+        macd_line = self.fast.value - self.slow.value
+        signal_line = self.signal.value
+        return macd_line, signal_line, macd_line - signal_line
+    
+    def update(self, x):
+        """
+        Agrega una observación.
+        
+        Args:
+            x (float): Nueva observación
+        
+        Returns:
+            tuple: (macd_line, signal_line, histogram)
+        """
+        macd_line = self.fast.update(x) - self.slow.update(x)
+        self.signal.update(macd_line)
+        return self.value
+    
+    def to_dict(self):
+        """
+        Serializa el estado del indicador.
+        
+        Returns:
+            dict: Estado serializable en JSON
+        """
+        return {
+            "type": "macd",
+            "fast": self.fast.to_dict(),
+            "slow": self.slow.to_dict(),
+            "signal": self.signal.to_dict()
+        }
+    
+    @classmethod
+    def from_dict(cls, state):
+        """
+        Restaura un indicador serializado con to_dict.
+        
+        Args:
+            state (dict): Estado serializado
+        
+        Returns:
+            StreamingMACD: Indicador restaurado
+        """
+        indicator = cls()
+        indicator.fast = StreamingEMA.from_dict(state["fast"])
+        indicator.slow = StreamingEMA.from_dict(state["slow"])
+        indicator.signal = StreamingEMA.from_dict(state["signal"])
+        return indicator
+
+
+class StreamingStd:
+    """
+    Desviación estándar móvil que se actualiza en O(1), equivalente a
+    pandas.Series.rolling(period).std(ddof).
+    
+    Usa la actualización de Welford sobre la ventana (en lugar de suma de
+    cuadrados), que es estable para series de nivel alto y poca variación
+    como la TRM.
+    """
+    
+    def __init__(self, period, ddof=1):
+        """
+        Inicializa el indicador.
+        
+        Args:
+            period (int): Tamaño de la ventana
+            ddof (int): Grados de libertad que se descuentan (1 = muestral)
+        """
+        if period <= ddof:
+            raise ValueError("El período debe ser mayor que ddof")
+        self.period = period
+        self.ddof = ddof
+        self.window = deque(maxlen=period)
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.updates = 0
+    
+    @property
+    def ready(self):
+        """True cuando la ventana está completa."""
+        return len(self.window) == self.period
+    
+    @property
+    def value(self):
+        """Desviación estándar actual, o None si la ventana no está completa."""
+        if not self.ready:
+            return None
+        return math.sqrt(max(self.m2, 0.0) / (self.period - self.ddof))
+    
+    def _resync(self):
+        """Recalcula exactamente la media y la suma de cuadrados de la ventana."""
+        n = len(self.window)
+        self.mean = math.fsum(self.window) / n if n else 0.0
+        self.m2 = math.fsum((x - self.mean) ** 2 for x in self.window)
+    
+    def update(self, x):
+        """
+        Agrega una observación.
+        
+        Args:
+            x (float): Nueva observación
+        
+        Returns:
+            float: Desviación estándar actual, o None si la ventana no está completa
+        """
+        x = float(x)
+        if self.ready:
+            old = self.window[0]
+            self.window.append(x)
+            old_mean = self.mean
+            self.mean += (x - old) / self.period
+            self.m2 += (x - old) * (x - self.mean + old - old_mean)
+        else:
+            self.window.append(x)
+            delta = x - self.mean
+            self.mean += delta / len(self.window)
+            self.m2 += delta * (x - self.mean)
+        
+        self.updates += 1
+        if self.updates % RESYNC_INTERVAL == 0:
+            self._resync()
+        return self.value
+    
+    def to_dict(self):
+        """
+        Serializa el estado del indicador.
+        
+        Returns:
+            dict: Estado serializable en JSON
+        """
+        return {
+            "type": "std",
+            "period": self.period,
+            "ddof": self.ddof,
+            "window": list(self.window),
+            "mean": self.mean,
+            "m2": self.m2,
+            "updates": self.updates
+        }
+    
+    @classmethod
+    def from_dict(cls, state):
+        """
+        Restaura un indicador serializado con to_dict.
+        
+        Args:
+            state (dict): Estado serializado
+        
+        Returns:
+            StreamingStd: Indicador restaurado
+        """
+        indicator = cls(state["period"], state["ddof"])
+        indicator.window.extend(state["window"])
+        if "m2" in state:
+            indicator.mean = state["mean"]
+            indicator.m2 = state["m2"]
+        else:
+            indicator._resync()
+        indicator.updates = state.get("updates", 0)
+        return indicator
+
+
+class StreamingBollinger:
+    """Bandas de Bollinger que se actualizan en O(1) con cada nueva observación."""
+    
+    def __init__(self, period=20, num_std=2.0, ddof=0):
+        """
+        Inicializa el indicador.
+        
+        Args:
+            period (int): Tamaño de la ventana
+            num_std (float): Desviaciones estándar entre la media y cada banda
+            ddof (int): Grados de libertad de la desviación (0 = poblacional, como en la definición clásica)
+        """
+        self.num_std = num_std
+        self.std = StreamingStd(period, ddof)
+    
+    @property
+    def ready(self):
+        """True cuando la ventana está completa."""
+        return self.std.ready
+    
+    @property
+    def value(self):
+        """Valor actual (middle, upper, lower), o None si la ventana no está completa."""
+        if not self.ready:
+            return None
+        width = self.num_std * self.std.value
+        return self.std.mean, self.std.mean + width, self.std.mean - width
+    
+    def update(self, x):
+        """
+        Agrega una observación.
+        
+        Args:
+            x (float): Nueva observación
+        
+        Returns:
+            tuple: (middle, upper, lower), o None si la ventana no está completa
+        """
+        self.std.update(x)
+        return self.value
+    
+    def to_dict(self):
+        """
+        Serializa el estado del indicador.
+        
+        Returns:
+            dict: Estado serializable en JSON
+        """
+        return {"type": "bollinger", "num_std": self.num_std, "std": self.std.to_dict()}
+    
+    @classmethod
+    def from_dict(cls, state):
+        """
+        Restaura un indicador serializado con to_dict.
+        
+        Args:
+            state (dict): Estado serializado
+        
+        Returns:
+            StreamingBollinger: Indicador restaurado
+        """
+        indicator = cls(num_std=state["num_std"])
+        indicator.std = StreamingStd.from_dict(state["std"])
+        return indicator
+
+
+class StreamingZScore:
+    """Distancia de la última observación a su SMA, en desviaciones estándar, actualizada en O(1)."""
+    
+    def __init__(self, period=20, ddof=1):
+        """
+        Inicializa el indicador.
+        
+        Args:
+            period (int): Tamaño de la ventana de la media y la desviación
+            ddof (int): Grados de libertad de la desviación
+        """
+        self.std = StreamingStd(period, ddof)
+    
+    @property
+    def ready(self):
+        """True cuando la ventana está completa."""
+        return self.std.ready
+    
+    @property
+    def value(self):
+        """Z-score actual, o None si la ventana no está completa."""
+        if not self.ready:
+            return None
+        deviation = self.std.value
+        return (self.std.window[-1] - self.std.mean) / deviation if deviation > 0 else 0.0
+    
+    def update(self, x):
+        """
+        Agrega una observación.
+        
+        Args:
+            x (float): Nueva observación
+        
+        Returns:
+            float: Z-score actual, o None si la ventana no está completa
+        """
+        self.std.update(x)
+        return self.value
+    
+    def to_dict(self):
+        """
+        Serializa el estado del indicador.
+        
+        Returns:
+            dict: Estado serializable en JSON
+        """
+        return {"type": "zscore", "std": self.std.to_dict()}
+    
+    @classmethod
+    def from_dict(cls, state):
+        """
+        Restaura un indicador serializado con to_dict.
+        
+        Args:
+            state (dict): Estado serializado
+        
+        Returns:
+            StreamingZScore: Indicador restaurado
+        """
+        indicator = cls()
+        indicator.std = StreamingStd.from_dict(state["std"])
+        return indicator
+
+
+class StreamingRSI:
+    """
+    RSI de Wilder que se actualiza en O(1): las primeras period variaciones
+    se promedian y desde ahí se suavizan con alpha = 1 / period.
+    """
+    
+    def __init__(self, period=14):
+        """
+        Inicializa el indicador.
+        
+        Args:
+            period (int): Período de suavizado
+        """
+        if period < 1:
+            raise ValueError("El período debe ser mayor o igual a 1")
+        self.period = period
+        self.previous = None
+        self.changes = 0
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+    
+    @property
+    def ready(self):
+        """True cuando ya se observaron period variaciones."""
+        return self.changes >= self.period
+    
+    @property
+    def value(self):
+        """RSI actual (0 a 100), o None si no hay suficientes variaciones."""
+        if not self.ready:
+            return None
+        total = self.avg_gain + self.avg_loss
+        return 100.0 * self.avg_gain / total if total > 0 else 50.0
+    
+    def update(self, x):
+        """
+        Agrega una observación.
+        
+        Args:
+            x (float): Nueva observación
+        
+        Returns:
+            float: RSI actual, o None si no hay suficientes variaciones
+        """
+        x = float(x)
+        if self.previous is not None:
+            change = x - self.previous
+            gain = max(change, 0.0)
+            loss = max(-change, 0.0)
+            self.changes += 1
+            if self.changes <= self.period:
+                # Promedio simple de las primeras variaciones
+                self.avg_gain += (gain - self.avg_gain) / self.changes
+                self.avg_loss += (loss - self.avg_loss) / self.changes
+            else:
+                self.avg_gain += (gain - self.avg_gain) / self.period
+                self.avg_loss += (loss - self.avg_loss) / self.period
+        self.previous = x
+        return self.value
+    
+    def to_dict(self):
+        """
+        Serializa el estado del indicador.
+        
+        Returns:
+            dict: Estado serializable en JSON
+        """
+        return {
+            "type": "rsi",
+            "period": self.period,
+            "previous": self.previous,
+            "changes": self.changes,
+            "avg_gain": self.avg_gain,
+            "avg_loss": self.avg_loss
+        }
+    
+    @classmethod
+    def from_dict(cls, state):
+        """
+        Restaura un indicador serializado con to_dict.
+        
+        Args:
+            state (dict): Estado serializado
+        
+        Returns:
+            StreamingRSI: Indicador restaurado
+        """
+        indicator = cls(state["period"])
+        indicator.previous = state["previous"]
+        indicator.changes = state["changes"]
+        indicator.avg_gain = state["avg_gain"]
+        indicator.avg_loss = state["avg_loss"]
+        return indicator
+
+
+class StreamingVolatility:
+    """Volatilidad realizada anualizada (en porcentaje) de los retornos logarítmicos, actualizada en O(1)."""
+    
+    def __init__(self, period=20, annualization=252):
+        """
+        Inicializa el indicador.
+        
+        Args:
+            period (int): Número de retornos de la ventana
+            annualization (int): Observaciones por año para anualizar (252 días hábiles)
+        """
+        self.annualization = annualization
+        self.previous = None
+        self.std = StreamingStd(period, ddof=1)
+    
+    @property
+    def ready(self):
+        """True cuando la ventana de retornos está completa."""
+        return self.std.ready
+    
+    @property
+    def value(self):
+        """Volatilidad anualizada en porcentaje, o None si la ventana no está completa."""
+        if not self.ready:
+            return None
+        return self.std.value * math.sqrt(self.annualization) * 100
+    
+    def update(self, x):
+        """
+        Agrega una observación (debe ser positiva).
+        
+        Args:
+            x (float): Nueva observación
+        
+        Returns:
+            float: Volatilidad anualizada en porcentaje, o None si la ventana no está completa
+        """
+        x = float(x)
+        if self.previous is not None:
+            self.std.update(math.log(x / self.previous))
+        self.previous = x
+        return self.value
+    
+    def to_dict(self):
+        """
+        Serializa el estado del indicador.
+        
+        Returns:
+            dict: Estado serializable en JSON
+        """
+        return {
+            "type": "volatility",
+            "annualization": self.annualization,
+            "previous": self.previous,
+            "std": self.std.to_dict()
+        }
+    
+    @classmethod
+    def from_dict(cls, state):
+        """
+        Restaura un indicador serializado con to_dict.
+        
+        Args:
+            state (dict): Estado serializado
+        
+        Returns:
+            StreamingVolatility: Indicador restaurado
+        """
+        indicator = cls(annualization=state["annualization"])
+        indicator.previous = state["previous"]
+        indicator.std = StreamingStd.from_dict(state["std"])
+        return indicator
+
+
+class StreamingROC:
+    """Tasa de cambio (en porcentaje) respecto a la observación de period pasos atrás, en O(1)."""
+    
+    def __init__(self, period=20):
+        """
+        Inicializa el indicador.
+        
+        Args:
+            period (int): Número de pasos hacia atrás
+        """
+        if period < 1:
+            raise ValueError("El período debe ser mayor o igual a 1")
+        self.period = period
+        self.window = deque(maxlen=period + 1)
+    
+    @property
+    def ready(self):
+        """True cuando ya se observó el valor de period pasos atrás."""
+        return len(self.window) == self.period + 1
+    
+    @property
+    def value(self):
+        """Tasa de cambio actual en porcentaje, o None si no hay suficientes observaciones."""
+        if not self.ready:
+            return None
+        return (self.window[-1] / self.window[0] - 1) * 100
+    
+    def update(self, x):
+        """
+        Agrega una observación.
+        
+        Args:
+            x (float): Nueva observación
+        
+        Returns:
+            float: Tasa de cambio en porcentaje, o None si no hay suficientes observaciones
+        """
+        self.window.append(float(x))
+        return self.value
+    
+    def to_dict(self):
+        """
+        Serializa el estado del indicador.
+        
+        Returns:
+            dict: Estado serializable en JSON
+        """
+        return {"type": "roc", "period": self.period, "window": list(self.window)}
+    
+    @classmethod
+    def from_dict(cls, state):
+        """
+        Restaura un indicador serializado con to_dict.
+        
+        Args:
+            state (dict): Estado serializado
+        
+        Returns:
+            StreamingROC: Indicador restaurado
+        """
+        indicator = cls(state["period"])
+        indicator.window.extend(state["window"])
+        return indicator
+
+
+# Tipos de indicadores incrementales, por el campo "type" de su estado serializado
+STREAMING_INDICATORS = {
+    "sma": StreamingSMA,
+    "ema": StreamingEMA,
+    "macd": StreamingMACD,
+    "std": StreamingStd,
+    "bollinger": StreamingBollinger,
+    "zscore": StreamingZScore,
+    "rsi": StreamingRSI,
+    "volatility": StreamingVolatility,
+    "roc": StreamingROC
+}
+
+
+def indicator_from_dict(state):
+    """
+    Restaura cualquier indicador incremental serializado con to_dict.
+    
+    Args:
+        state (dict): Estado serializado
+    
+    Returns:
+        Indicador restaurado
+    """
+    return STREAMING_INDICATORS[state["type"]].from_dict(state)
+
+
+class IndicatorEngine:
+    """Conjunto de indicadores incrementales con nombre que se actualizan con cada tick."""
+    
+    def __init__(self, indicators=None):
+        """
+        Inicializa el motor.
+        
+        Args:
+            indicators (dict): Indicadores por nombre (ej: {"sma_45": StreamingSMA(45)})
+        """
+        self.indicators = dict(indicators or {})
+    
+    def update(self, x):
+        """
+        Agrega una observación a todos los indicadores.
+        
+        Args:
+            x (float): Nueva observación
+        
+        Returns:
+            dict: Valor actual de cada indicador
+        """
+        return {name: indicator.update(x) for name, indicator in self.indicators.items()}
+    
+    def update_many(self, values):
+        """
+        Agrega varias observaciones en orden (por ejemplo, para precalentar el motor).
+        
+        Args:
+            values (list): Observaciones
+        
+        Returns:
+            dict: Valor de cada indicador tras la última observación
+        """
+        for x in values:
+            for indicator in self.indicators.values():
+                indicator.update(x)
+        return self.values()
+    
+    def values(self):
+        """
+        Obtiene el valor actual de cada indicador.
+        
+        Returns:
+            dict: Valores por nombre (None si el indicador aún no tiene datos suficientes)
+        """
+        return {name: indicator.value for name, indicator in self.indicators.items()}
+    
+    def to_dict(self):
+        """
+        Serializa el estado de todos los indicadores.
+        
+        Returns:
+            dict: Estado serializable en JSON
+        """
+        return {name: indicator.to_dict() for name, indicator in self.indicators.items()}
+    
+    @classmethod
+    def from_dict(cls, state):
+        """
+        Restaura un motor serializado con to_dict.
+        
+        Args:
+            state (dict): Estado serializado
+        
+        Returns:
+            IndicatorEngine: Motor restaurado
+        """
+        return cls({name: indicator_from_dict(item) for name, item in state.items()})
+
+
+# Pesos exponenciales por debajo de este valor ya no afectan el resultado en float64
+EMA_WEIGHT_EPSILON = 1e-18
+
+
+def _as_matrix(data):
+    """
+    Convierte los datos de entrada en una matriz (series x tiempo) de float64.
+    
+    Args:
+        data (array): Serie (1-D) o matriz de series (2-D)
+    
+    Returns:
+        np.ndarray: Matriz de forma (series, tiempo)
+    """
+    matrix = np.asarray(data, dtype=np.float64)
+    if matrix.ndim == 1:
+        matrix = matrix[np.newaxis, :]
+    if matrix.ndim != 2:
+        raise ValueError("Los datos deben ser una serie o una matriz (series x tiempo)")
+    return matrix
+
+
+def batch_sma(data, windows):
+    """
+    Calcula la SMA de muchas series y varios períodos en cada instante.
+    
+    Usa sumas acumuladas sobre las series centradas en su primer valor, de modo
+    que cada ventana se obtiene como diferencia de dos sumas sin recorrer el tiempo.
+    
+    Args:
+        data (array): Matriz (series x tiempo), o una sola serie
+        windows (list): Períodos de la media móvil
+    
+    Returns:
+        np.ndarray: Matriz (períodos x series x tiempo); NaN donde la ventana no está completa
+    """
+    matrix = _as_matrix(data)
+    n_series, n_time = matrix.shape
+    
+    # Centrar cada serie reduce el error de redondeo de las sumas acumuladas
+    offset = matrix[:, :1]
+    cumulative = np.zeros((n_series, n_time + 1))
+    np.cumsum(matrix - offset, axis=1, out=cumulative[:, 1:])
+    
+    result = np.full((len(windows), n_series, n_time), np.nan)
+    for i, window in enumerate(windows):
+        if window < 1:
+            raise ValueError("El período debe ser mayor o igual a 1")
+        if window <= n_time:
+            result[i, :, window - 1:] = (cumulative[:, window:] - cumulative[:, :-window]) / window + offset
+    return result
+
+
+def _recursive_scan(values, decay):
+    """
+    Resuelve el filtro recursivo y[t] = x[t] + decay * y[t-1] a lo largo del último eje.
+    
+    Usa un barrido por duplicación: en cada paso k cada instante acumula el
+    valor de k posiciones atrás con peso decay**k, de modo que se necesitan
+    log2(T) operaciones vectorizadas (menos aún, porque se detiene cuando
+    decay**k ya no afecta el resultado).
+    
+    Args:
+        values (np.ndarray): Arreglo cuyo último eje es el tiempo
+        decay (np.ndarray): Factor de decaimiento, transmisible (broadcast) sobre values
+    
+    Returns:
+        np.ndarray: Valores filtrados con la misma forma que values
+    """
+    result = np.array(values, dtype=np.float64)
+    n_time = result.shape[-1]
+    weight = np.asarray(decay, dtype=np.float64)
+    step = 1
+    while step < n_time and weight.max() > EMA_WEIGHT_EPSILON:
+        result[..., step:] += weight * result[..., :-step]
+        step *= 2
+        weight = weight * weight
+    return result
+
+
+def _exponential_filter(values, spans):
+    """
+    Aplica la media exponencial ajustada a lo largo del último eje, con un
+    período distinto para cada elemento del primer eje.
+    
+    El numerador se obtiene con _recursive_scan y el denominador tiene forma cerrada.
+    
+    Args:
+        values (np.ndarray): Arreglo (períodos x series x tiempo)
+        spans (list): Período de cada elemento del primer eje
+    
+    Returns:
+        np.ndarray: Medias exponenciales con la misma forma que values
+    """
+    if any(span < 1 for span in spans):
+        raise ValueError("El período debe ser mayor o igual a 1")
+    n_time = values.shape[-1]
+    decay = 1.0 - 2.0 / (np.asarray(spans, dtype=np.float64) + 1.0)
+    decay = decay.reshape((-1,) + (1,) * (values.ndim - 1))
+    
+    numerator = _recursive_scan(values, decay)
+    
+    # Suma de pesos 1 + decay + ... + decay**t (t + 1 cuando el período es 1)
+    exponents = np.arange(1, n_time + 1)
+    safe_decay = np.where(decay < 1.0, decay, 0.0)
+    denominator = np.where(decay > 0.0, (1.0 - safe_decay ** exponents) / (1.0 - safe_decay), 1.0)
+    return numerator / denominator
+
+
+def batch_ema(data, spans):
+    """
+    Calcula la media móvil exponencial de muchas series y varios períodos en cada
+    instante, equivalente a pandas.Series.ewm(span=span).mean() (adjust=True).
+    
+    Args:
+        data (array): Matriz (series x tiempo), o una sola serie
+        spans (list): Períodos de la media exponencial
+    
+    Returns:
+        np.ndarray: Matriz (períodos x series x tiempo)
+    """
+    matrix = _as_matrix(data)
+    values = np.broadcast_to(matrix, (len(spans),) + matrix.shape)
+    return _exponential_filter(values, spans)
+
+
+def batch_macd(data, periods=((12, 26, 9),)):
+    """
+    Calcula el MACD de muchas series y varias combinaciones de períodos en cada
+    instante, equivalente a aplicar calculate_macd a cada prefijo de cada serie.
+    
+    Args:
+        data (array): Matriz (series x tiempo), o una sola serie
+        periods (list): Tuplas (rápido, lento, señal) de períodos
+    
+    Returns:
+        tuple: (macd_line, signal_line, histogram), cada una de forma
+            (combinaciones x series x tiempo)
+    """
+    spans = sorted({span for fast, slow, _ in periods for span in (fast, slow)})
+    emas = batch_ema(data, spans)
+    index = {span: i for i, span in enumerate(spans)}
+    
+    macd_line = np.stack([emas[index[fast]] - emas[index[slow]] for fast, slow, _ in periods])
+    signal_line = _exponential_filter(macd_line, [signal for _, _, signal in periods])
+    return macd_line, signal_line, macd_line - signal_line
+
+
+def _rolling_moments(matrix, window, ddof):
+    """
+    Calcula la media y la desviación estándar móviles de cada serie con sumas acumuladas.
+    
+    Args:
+        matrix (np.ndarray): Matriz (series x tiempo)
+        window (int): Tamaño de la ventana
+        ddof (int): Grados de libertad de la desviación
+    
+    Returns:
+        tuple: (media, desviación), matrices (series x tiempo) con NaN donde la ventana no está completa
+    """
+    if window <= ddof:
+        raise ValueError("El período debe ser mayor que ddof")
+    n_series, n_time = matrix.shape
+    mean = np.full((n_series, n_time), np.nan)
+    std = np.full((n_series, n_time), np.nan)
+    if window > n_time:
+        return mean, std
+    
+    # Centrar cada serie reduce la cancelación al restar sumas de cuadrados
+    offset = matrix[:, :1]
+    centered = matrix - offset
+    sums = np.zeros((n_series, n_time + 1))
+    squares = np.zeros((n_series, n_time + 1))
+    np.cumsum(centered, axis=1, out=sums[:, 1:])
+    np.cumsum(centered * centered, axis=1, out=squares[:, 1:])
+    
+    window_sum = sums[:, window:] - sums[:, :-window]
+    window_squares = squares[:, window:] - squares[:, :-window]
+    window_mean = window_sum / window
+    variance = (window_squares - window_sum * window_mean) / (window - ddof)
+    
+    mean[:, window - 1:] = window_mean + offset
+    std[:, window - 1:] = np.sqrt(np.maximum(variance, 0.0))
+    return mean, std
+
+
+def batch_bollinger(data, window=20, num_std=2.0, ddof=0):
+    """
+    Calcula las bandas de Bollinger de muchas series en cada instante.
+    
+    Args:
+        data (array): Matriz (series x tiempo), o una sola serie
+        window (int): Tamaño de la ventana
+        num_std (float): Desviaciones estándar entre la media y cada banda
+        ddof (int): Grados de libertad de la desviación (0 = poblacional)
+    
+    Returns:
+        tuple: (middle, upper, lower), matrices (series x tiempo)
+    """
+    mean, std = _rolling_moments(_as_matrix(data), window, ddof)
+    return mean, mean + num_std * std, mean - num_std * std
+
+
+def batch_rsi(data, period=14):
+    """
+    Calcula el RSI de Wilder de muchas series en cada instante, equivalente a StreamingRSI.
+    
+    Las primeras period variaciones se promedian y desde ahí las ganancias y
+    pérdidas se suavizan con alpha = 1 / period mediante el filtro recursivo.
+    
+    Args:
+        data (array): Matriz (series x tiempo), o una sola serie
+        period (int): Período de suavizado
+    
+    Returns:
+        np.ndarray: Matriz (series x tiempo) con valores de 0 a 100; NaN en los primeros period instantes
+    """
+    if period < 1:
+        raise ValueError("El período debe ser mayor o igual a 1")
+    matrix = _as_matrix(data)
+    rsi = np.full(matrix.shape, np.nan)
+    if matrix.shape[1] <= period:
+        return rsi
+    
+    changes = np.diff(matrix, axis=1)
+    averages = []
+    for moves in (np.maximum(changes, 0.0), np.maximum(-changes, 0.0)):
+        smoothed = moves[:, period - 1:] / period
+        smoothed[:, 0] = moves[:, :period].mean(axis=1)
+        averages.append(_recursive_scan(smoothed, 1.0 - 1.0 / period))
+    avg_gain, avg_loss = averages
+    
+    total = avg_gain + avg_loss
+    rsi[:, period:] = np.divide(100.0 * avg_gain, total, out=np.full(total.shape, 50.0), where=total > 0)
+    return rsi
+
+
+def batch_volatility(data, window=20, annualization=252):
+    """
+    Calcula la volatilidad realizada anualizada (en porcentaje) de muchas series en cada instante.
+    
+    Args:
+        data (array): Matriz (series x tiempo) de valores positivos, o una sola serie
+        window (int): Número de retornos logarítmicos de la ventana
+        annualization (int): Observaciones por año para anualizar (252 días hábiles)
+    
+    Returns:
+        np.ndarray: Matriz (series x tiempo); NaN donde la ventana no está completa
+    """
+    matrix = _as_matrix(data)
+    volatility = np.full(matrix.shape, np.nan)
+    if matrix.shape[1] < 2:
+        return volatility
+    
+    _, std = _rolling_moments(np.diff(np.log(matrix), axis=1), window, ddof=1)
+    volatility[:, 1:] = std * math.sqrt(annualization) * 100
+    return volatility
+
+
+def batch_zscore(data, window=20, ddof=1):
+    """
+    Calcula la distancia de cada valor a su SMA, en desviaciones estándar, en cada instante.
+    
+    Args:
+        data (array): Matriz (series x tiempo), o una sola serie
+        window (int): Tamaño de la ventana de la media y la desviación
+        ddof (int): Grados de libertad de la desviación
+    
+    Returns:
+        np.ndarray: Matriz (series x tiempo); NaN donde la ventana no está completa
+    """
+    matrix = _as_matrix(data)
+    mean, std = _rolling_moments(matrix, window, ddof)
+    deviation = matrix - mean
+    # Una ventana sin variación tiene z-score 0 (como StreamingZScore)
+    return np.divide(deviation, std, out=np.where(np.isnan(std), np.nan, 0.0), where=std > 0)
+
+
+def batch_roc(data, period=20):
+    """
+    Calcula la tasa de cambio (en porcentaje) de muchas series en cada instante.
+    
+    Args:
+        data (array): Matriz (series x tiempo), o una sola serie
+        period (int): Número de pasos hacia atrás
+    
+    Returns:
+        np.ndarray: Matriz (series x tiempo); NaN en los primeros period instantes
+    """
+    if period < 1:
+        raise ValueError("El período debe ser mayor o igual a 1")
+    matrix = _as_matrix(data)
+    roc = np.full(matrix.shape, np.nan)
+    roc[:, period:] = (matrix[:, period:] / matrix[:, :-period] - 1) * 100
+    return roc
+
+
+def calculate_signals(data, window=20, rsi_period=14):
+    """
+    Calcula las señales de volatilidad y momentum del último valor de una serie
+    (por ejemplo, el historial de la TRM) en una sola pasada vectorizada.
+    
+    Args:
+        data (list): Lista de valores
+        window (int): Ventana de las bandas de Bollinger, la volatilidad, el z-score y la tasa de cambio
+        rsi_period (int): Período del RSI
+    
+    Returns:
+        dict: rsi, bollinger_upper, bollinger_lower, volatility, zscore y roc;
+            None en las señales sin datos suficientes
+    """
+    matrix = _as_matrix(data)
+    _, upper, lower = batch_bollinger(matrix, window)
+    signals = {
+        "rsi": batch_rsi(matrix, rsi_period),
+        "bollinger_upper": upper,
+        "bollinger_lower": lower,
+        "volatility": batch_volatility(matrix, window),
+        "zscore": batch_zscore(matrix, window),
+        "roc": batch_roc(matrix, window)
+    }
+    
+    result = {}
+    for name, values in signals.items():
+        last = values[0, -1] if values.shape[1] else np.nan
+        result[name] = None if np.isnan(last) else float(last)
+    return result
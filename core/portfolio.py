@@ -2,18 +2,661 @@
 """
 Portfolio management module for Global Yield Optimizer v3.0
 """
+import atexit
+import functools
+import queue
 import sqlite3
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 
 
+# Ajustes de SQLite aplicados a cada conexión: WAL permite que el dashboard lea
+# mientras el simulador escribe, y con synchronous=NORMAL solo se sincroniza
+# el disco en los checkpoints del WAL en lugar de en cada commit
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 256 * 1024 * 1024,   # 256 MB de E/S mapeada en memoria
+    "cache_size": -16000,             # ~16 MB de caché de páginas (negativo = KiB)
+    "temp_store": "MEMORY"
+}
+
+# Agregados de inversiones mantenidos por triggers: expresión de cada columna
+# para una fila de investments (NEW u OLD)
+SUMMARY_COLUMNS = {
+    "total_amount": "IFNULL({row}.amount, 0)",
+    "investment_count": "1",
+    "active_count": "(IFNULL({row}.status, '') = 'active')",
+    "active_amount": "CASE WHEN {row}.status = 'active' THEN IFNULL({row}.amount, 0) ELSE 0 END",
+    "weighted_real_rate": "IFNULL({row}.amount * {row}.real_rate, 0)",   # Σ monto × tasa real
+    "rated_amount": "CASE WHEN {row}.real_rate IS NOT NULL THEN IFNULL({row}.amount, 0) ELSE 0 END"
+}
+
+# Tablas de agregados y sus claves: totales por moneda y por (mes, moneda)
+SUMMARY_TABLES = {
+    "investment_summary": {"currency": "IFNULL({row}.currency, '')"},
+    "investment_monthly_summary": {"month": "IFNULL({row}.month, 0)", "currency": "IFNULL({row}.currency, '')"}
+}
+
+
+def _summary_table_sql(table):
+    """
+    Genera el CREATE TABLE de una tabla de agregados de inversiones.
+    
+    Args:
+        table (str): Nombre de la tabla en SUMMARY_TABLES
+    
+    Returns:
+        str: Sentencia SQL
+    """
+    keys = SUMMARY_TABLES[table]
+    key_columns = [f"{key} {'INTEGER' if key == 'month' else 'TEXT'} NOT NULL" for key in keys]
+    value_columns = [
+        f"{column} {'INTEGER' if column.endswith('count') else 'REAL'} NOT NULL DEFAULT 0"
+        for column in SUMMARY_COLUMNS
+    ]
+    return (
+        f"CREATE TABLE IF NOT EXISTS {table} ("
+        f"{', '.join(key_columns + value_columns)}, PRIMARY KEY ({', '.join(keys)}))"
+    )
+
+
+def _summary_backfill_sql(table):
+    """
+    Genera la sentencia que calcula una tabla de agregados a partir de las inversiones existentes.
+    
+    Args:
+        table (str): Nombre de la tabla en SUMMARY_TABLES
+    
+    Returns:
+        str: Sentencia SQL
+    """
+    keys = SUMMARY_TABLES[table]
+    key_expressions = [expression.format(row="investments") for expression in keys.values()]
+    sums = [f"SUM({expression.format(row='investments')})" for expression in SUMMARY_COLUMNS.values()]
+    return (
+        f"INSERT INTO {table} ({', '.join(list(keys) + list(SUMMARY_COLUMNS))}) "
+        f"SELECT {', '.join(key_expressions + sums)} FROM investments GROUP BY {', '.join(key_expressions)}"
+    )
+
+
+def _summary_delta_sql(row, sign):
+    """
+    Genera las sentencias que suman (o restan) una fila de investments a las tablas de agregados.
+    
+    Args:
+        row (str): Fila del trigger ("NEW" u "OLD")
+        sign (int): 1 para sumar, -1 para restar
+    
+    Returns:
+        str: Sentencias SQL separadas por punto y coma
+    """
+    statements = []
+    for table, keys in SUMMARY_TABLES.items():
+        key_values = [expression.format(row=row) for expression in keys.values()]
+        deltas = [f"{sign} * {expression.format(row=row)}" for expression in SUMMARY_COLUMNS.values()]
+        updates = [f"{column} = {column} + excluded.{column}" for column in SUMMARY_COLUMNS]
+        statements.append(
+            f"INSERT INTO {table} ({', '.join(list(keys) + list(SUMMARY_COLUMNS))}) "
+            f"VALUES ({', '.join(key_values + deltas)}) "
+            f"ON CONFLICT ({', '.join(keys)}) DO UPDATE SET {', '.join(updates)};"
+        )
+    return " ".join(statements)
+
+
+def parse_instrument(name):
+    """
+    Descompone el nombre de un instrumento de bank_rates en sus dimensiones.
+    
+    Los nombres siguen las convenciones del simulador: "País:ETF:Símbolo"
+    para ETFs, "País:Banco" para CDTs y solo "Banco" para las tasas de bancos.
+    
+    Args:
+        name (str): Nombre del instrumento
+    
+    Returns:
+        tuple: (tipo, banco, país); banco y país son None si no aplican
+    """
+    parts = name.split(":")
+    if len(parts) == 3 and parts[1] == "ETF":
+        return "etf", None, parts[0]
+    if len(parts) == 2:
+        return "cdt", parts[1], parts[0]
+    return "bank", name, None
+
+
+def _intern_name(conn, table, name):
+    """
+    Obtiene el id de un nombre en una tabla de dimensión, insertándolo si no existe.
+    
+    Args:
+        conn (sqlite3.Connection): Conexión a la base de datos
+        table (str): Tabla de dimensión (banks, countries o currencies)
+        name (str): Nombre a resolver
+    
+    Returns:
+        int: Clave sustituta del nombre
+    """
+    conn.execute(f"INSERT INTO {table} (name) VALUES (?) ON CONFLICT (name) DO NOTHING", (name,))
+    return conn.execute(f"SELECT id FROM {table} WHERE name = ?", (name,)).fetchone()[0]
+
+
+def _intern_instrument(conn, name):
+    """
+    Obtiene el id de un instrumento, registrándolo junto con su banco y país si no existe.
+    
+    Args:
+        conn (sqlite3.Connection): Conexión a la base de datos
+        name (str): Nombre del instrumento (ver parse_instrument)
+    
+    Returns:
+        int: Clave sustituta del instrumento
+    """
+    kind, bank, country = parse_instrument(name)
+    conn.execute('''
+        INSERT INTO instruments (name, kind, bank_id, country_id)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT (name) DO NOTHING
+    ''', (
+        name,
+        kind,
+        _intern_name(conn, "banks", bank) if bank else None,
+        _intern_name(conn, "countries", country) if country else None
+    ))
+    return conn.execute("SELECT id FROM instruments WHERE name = ?", (name,)).fetchone()[0]
+
+
+def _copy_legacy_bank_rates(conn):
+    """
+    Copia las tasas de la tabla bank_rates anterior (con textos) a la tabla de hechos con claves enteras.
+    
+    La clave primaria de la nueva tabla no admite NULL, así que un banco o una
+    moneda NULL se copian como el nombre '' y un mes NULL como 0; en la vista
+    bank_rates_named esas filas aparecen con '' en lugar de NULL.
+    
+    Args:
+        conn (sqlite3.Connection): Conexión a la base de datos, dentro de la migración
+    """
+    conn.execute("CREATE TEMP TABLE instrument_keys (name TEXT PRIMARY KEY, id INTEGER)")
+    conn.execute("CREATE TEMP TABLE currency_keys (name TEXT PRIMARY KEY, id INTEGER)")
+    
+    # Un solo lookup por nombre distinto; la copia de las filas se hace en SQL
+    instruments = [row[0] for row in conn.execute("SELECT DISTINCT IFNULL(bank, '') FROM bank_rates_legacy")]
+    currencies = [row[0] for row in conn.execute("SELECT DISTINCT IFNULL(currency, '') FROM bank_rates_legacy")]
+    conn.executemany(
+        "INSERT INTO temp.instrument_keys VALUES (?, ?)",
+        [(name, _intern_instrument(conn, name)) for name in instruments]
+    )
+    conn.executemany(
+        "INSERT INTO temp.currency_keys VALUES (?, ?)",
+        [(name, _intern_name(conn, "currencies", name)) for name in currencies]
+    )
+    conn.execute('''
+        INSERT OR REPLACE INTO bank_rates (month, instrument_id, currency_id, nominal_rate)
+        SELECT IFNULL(l.month, 0), i.id, c.id, l.nominal_rate
+        FROM bank_rates_legacy l
+        JOIN temp.instrument_keys i ON i.name = IFNULL(l.bank, '')
+        JOIN temp.currency_keys c ON c.name = IFNULL(l.currency, '')
+        ORDER BY l.id
+    ''')
+    
+    conn.execute("DROP TABLE temp.instrument_keys")
+    conn.execute("DROP TABLE temp.currency_keys")
+
+
+# Migraciones del esquema, en orden: la migración i lleva la base a la versión
+# i + 1 (guardada en PRAGMA user_version). Cada paso es una sentencia SQL o una
+# función que recibe la conexión. Nunca se modifican las existentes; los
+# cambios nuevos se agregan al final
+SCHEMA_MIGRATIONS = [
+    # 1: índices para las consultas por mes, estado, banco y fecha; unicidad
+    # (eliminando antes los duplicados, conservando el último registro) para
+    # que las escrituras sean upserts; estadísticas para el planificador
+    [
+        "DELETE FROM bank_rates WHERE id NOT IN (SELECT MAX(id) FROM bank_rates GROUP BY bank, currency, month)",
+        "DELETE FROM inflation_rates WHERE id NOT IN (SELECT MAX(id) FROM inflation_rates GROUP BY country, month)",
+        "DELETE FROM trm_history WHERE id NOT IN (SELECT MAX(id) FROM trm_history GROUP BY date)",
+        "CREATE INDEX IF NOT EXISTS idx_investments_month ON investments (month)",
+        "CREATE INDEX IF NOT EXISTS idx_investments_status ON investments (status)",
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_bank_rates_bank_currency_month ON bank_rates (bank, currency, month)",
+        "CREATE INDEX IF NOT EXISTS idx_bank_rates_month ON bank_rates (month)",
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_inflation_rates_country_month ON inflation_rates (country, month)",
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_trm_history_date ON trm_history (date)",
+        "ANALYZE"
+    ],
+    # 2: agregados por moneda y por mes mantenidos por triggers, para leer
+    # las métricas del dashboard sin recorrer las inversiones
+    [
+        _summary_table_sql("investment_summary"),
+        _summary_table_sql("investment_monthly_summary"),
+        _summary_backfill_sql("investment_summary"),
+        _summary_backfill_sql("investment_monthly_summary"),
+        f"""CREATE TRIGGER IF NOT EXISTS trg_investments_summary_insert AFTER INSERT ON investments
+            BEGIN {_summary_delta_sql("NEW", 1)} END""",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_investments_summary_delete AFTER DELETE ON investments
+            BEGIN {_summary_delta_sql("OLD", -1)} END""",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_investments_summary_update
+            AFTER UPDATE OF month, amount, currency, real_rate, status ON investments
+            BEGIN {_summary_delta_sql("OLD", -1)} {_summary_delta_sql("NEW", 1)} END"""
+    ],
+    # 3: dimensiones con claves enteras para instrumentos, bancos, países y
+    # monedas; bank_rates pasa a guardar solo claves y la tasa (sin rowid y
+    # agrupada por mes, que es el orden en que se escribe y se consulta) y la
+    # vista bank_rates_named conserva las columnas de texto para consultas ad hoc.
+    # Las claves de la nueva tabla no admiten NULL: al copiar, un banco o una
+    # moneda NULL pasan a '' y un mes NULL pasa a 0
+    [
+        "CREATE TABLE IF NOT EXISTS countries (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)",
+        "CREATE TABLE IF NOT EXISTS currencies (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)",
+        "CREATE TABLE IF NOT EXISTS banks (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)",
+        """CREATE TABLE IF NOT EXISTS instruments (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE,
+            kind TEXT NOT NULL,
+            bank_id INTEGER REFERENCES banks (id),
+            country_id INTEGER REFERENCES countries (id)
+        )""",
+        "ALTER TABLE bank_rates RENAME TO bank_rates_legacy",
+        """CREATE TABLE bank_rates (
+            month INTEGER NOT NULL,
+            instrument_id INTEGER NOT NULL REFERENCES instruments (id),
+            currency_id INTEGER NOT NULL REFERENCES currencies (id),
+            nominal_rate REAL,
+            PRIMARY KEY (month, instrument_id, currency_id)
+        ) WITHOUT ROWID""",
+        _copy_legacy_bank_rates,
+        "DROP TABLE bank_rates_legacy",
+        """CREATE VIEW IF NOT EXISTS bank_rates_named AS
+            SELECT r.month, i.name AS bank, c.name AS currency, r.nominal_rate
+            FROM bank_rates r
+            JOIN instruments i ON i.id = r.instrument_id
+            JOIN currencies c ON c.id = r.currency_id""",
+        "ANALYZE"
+    ],
+    # 4: la TRM de cada mes simulado va a su propia tabla, para que sus valores
+    # (simulados si no hay conexión y con fechas futuras) no se mezclen con el
+    # historial real de trm_history; las filas con fecha futura que ya había
+    # escrito el simulador se trasladan a la nueva tabla
+    [
+        "CREATE TABLE IF NOT EXISTS simulation_trm (date TEXT PRIMARY KEY, trm_value REAL)",
+        """INSERT INTO simulation_trm (date, trm_value)
+            SELECT date, trm_value FROM trm_history WHERE date > date('now', 'localtime')
+            ON CONFLICT (date) DO UPDATE SET trm_value = excluded.trm_value""",
+        "DELETE FROM trm_history WHERE date > date('now', 'localtime')"
+    ]
+]
+SCHEMA_VERSION = len(SCHEMA_MIGRATIONS)
+
+# Columnas de la tabla investments y su tipo NumPy, para proyecciones y cargas columnares
+INVESTMENT_COLUMNS = {
+    "id": "int64",
+    "month": "int64",
+    "amount": "float64",
+    "currency": "object",
+    "instrument": "object",
+    "nominal_rate": "float64",
+    "real_rate": "float64",
+    "start_date": "object",
+    "end_date": "object",
+    "status": "object"
+}
+
+# Segundos que una conexión espera un bloqueo de escritura antes de fallar
+BUSY_TIMEOUT = 5.0
+
+# Sentencias preparadas que conserva cada conexión
+STATEMENT_CACHE_SIZE = 128
+
+# Modo write-behind: unidades de escritura pendientes antes de que record_*
+# bloquee al llamador, y unidades que el escritor agrupa por transacción
+WRITE_QUEUE_SIZE = 1024
+WRITE_BATCH_SIZE = 256
+
+
+def _write_behind(method):
+    """
+    Marca un método de escritura: en modo write-behind se encola en lugar de ejecutarse.
+    
+    Dentro de transaction() las escrituras se acumulan y se encolan juntas al
+    salir del bloque, para que el escritor las confirme en la misma transacción.
+    
+    Cuando el método se ejecuta directamente y falla fuera de transaction(), se
+    revierte su transacción: la conexión del hilo es persistente y, si no, se
+    quedaría con la transacción abierta y el bloqueo de escritura tomado.
+    
+    Args:
+        method (callable): Método record_* a envolver
+    
+    Returns:
+        callable: Método envuelto
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self._write_queue is None or threading.current_thread() is self._writer:
+            try:
+                return method(self, *args, **kwargs)
+            except BaseException:
+                if not getattr(self._local, "depth", 0):
+                    self._rollback(self._connect())
+                raise
+        
+        operation = (method, args, kwargs)
+        buffer = getattr(self._local, "write_buffer", None)
+        if buffer is not None:
+            buffer.append(operation)
+        else:
+            self._enqueue([operation])
+    return wrapper
+
+
+def _reads_own_writes(method):
+    """
+    Marca un método de lectura: en modo write-behind espera antes a que se escriba lo encolado.
+    
+    Las escrituras de un bloque transaction() abierto aún no están encoladas,
+    así que una lectura dentro del bloque no las ve.
+    
+    Args:
+        method (callable): Método get_* a envolver
+    
+    Returns:
+        callable: Método envuelto
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        self.flush()
+        return method(self, *args, **kwargs)
+    return wrapper
+
+
 class Portfolio:
-    def __init__(self, db_path="rag_memory/sqlite_db.db"):
+    def __init__(self, db_path="rag_memory/sqlite_db.db", write_behind=False, queue_size=WRITE_QUEUE_SIZE):
+        """
+        Args:
+            db_path (str): Ruta de la base de datos SQLite
+            write_behind (bool): Si True, las escrituras se encolan y las confirma
+                un hilo escritor en transacciones agrupadas (ver flush y close)
+            queue_size (int): Unidades de escritura pendientes antes de bloquear (solo write-behind)
+        """
         self.db_path = db_path
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        # Caché de claves de dimensiones confirmadas: (tabla, nombre) → id
+        self._dimension_ids = {}
+        self._write_queue = None
+        self._writer = None
+        # Primer error del hilo escritor aún no informado al llamador
+        self._write_error = None
+        self._write_error_lock = threading.Lock()
         self._init_db()
+        if write_behind:
+            self._start_writer(queue_size)
+    
+    def _connect(self):
+        """
+        Obtiene la conexión persistente del hilo actual, creándola si no existe.
+        
+        Cada hilo reutiliza su propia conexión (y sus sentencias preparadas)
+        durante toda la vida del portfolio, en lugar de abrir y cerrar una
+        conexión por operación.
+        
+        Returns:
+            sqlite3.Connection: Conexión del hilo actual
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            return conn
+        
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=BUSY_TIMEOUT,
+            cached_statements=STATEMENT_CACHE_SIZE,
+            check_same_thread=False
+        )
+        for pragma, value in SQLITE_PRAGMAS.items():
+            conn.execute(f"PRAGMA {pragma} = {value}")
+        
+        self._local.conn = conn
+        with self._connections_lock:
+            self._connections.append(conn)
+        return conn
+    
+    def _start_writer(self, queue_size):
+        """
+        Inicia el hilo escritor del modo write-behind.
+        
+        Args:
+            queue_size (int): Capacidad de la cola de escrituras
+        """
+        self._write_queue = queue.Queue(maxsize=queue_size)
+        self._writer = threading.Thread(target=self._write_loop, name="portfolio-writer", daemon=True)
+        self._writer.start()
+        # Si el proceso termina sin close(), lo encolado se escribe igualmente
+        atexit.register(self.close)
+    
+    def _enqueue(self, unit):
+        """
+        Encola una unidad de escritura; si la cola está llena, espera a que el escritor libere espacio.
+        
+        Args:
+            unit (list): Operaciones (método, args, kwargs) que se confirman juntas
+        """
+        self._raise_write_error()
+        self._write_queue.put(unit)
+    
+    def _raise_write_error(self):
+        """Relanza en el hilo llamador el error pendiente del hilo escritor, si lo hay."""
+        with self._write_error_lock:
+            error, self._write_error = self._write_error, None
+        if error is not None:
+            raise error
+    
+    def _write_loop(self):
+        """Hilo escritor: agrupa las unidades encoladas y confirma cada grupo en una sola transacción."""
+        while True:
+            batch = [self._write_queue.get()]
+            while len(batch) < WRITE_BATCH_SIZE:
+                try:
+                    batch.append(self._write_queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            units = [unit for unit in batch if unit is not None]
+            try:
+                self._apply_units(units)
+            except Exception:
+                # Reintentar unidad por unidad para no perder las demás por una que falle
+                for unit in units:
+                    try:
+                        self._apply_units([unit])
+                    except Exception as e:
+                        print(f"Error al escribir en segundo plano en el portfolio: {e}")
+                        # Se relanza en el siguiente flush(), close() o escritura encolada
+                        with self._write_error_lock:
+                            if self._write_error is None:
+                                self._write_error = e
+            finally:
+                for _ in batch:
+                    self._write_queue.task_done()
+            
+            # None es la señal de cierre que encola close()
+            if None in batch:
+                return
+    
+    def _apply_units(self, units):
+        """
+        Ejecuta unidades de escritura en el hilo escritor dentro de una transacción.
+        
+        Args:
+            units (list): Unidades de escritura a confirmar
+        """
+        with self.transaction():
+            for unit in units:
+                for method, args, kwargs in unit:
+                    method(self, *args, **kwargs)
+    
+    def flush(self):
+        """
+        Espera a que el hilo escritor confirme todas las escrituras encoladas.
+        
+        No tiene efecto si el portfolio no usa write-behind. Las escrituras
+        acumuladas en un bloque transaction() abierto se encolan al cerrarlo.
+        Si alguna escritura en segundo plano falló desde la última llamada, se
+        relanza aquí su excepción (la primera, si fallaron varias).
+        """
+        if self._write_queue is not None and threading.current_thread() is not self._writer:
+            self._write_queue.join()
+            self._raise_write_error()
+    
+    def close(self):
+        """
+        Cierra las conexiones de todos los hilos, actualizando antes las estadísticas del planificador.
+        
+        En modo write-behind primero se escriben todas las unidades encoladas
+        y se detiene el hilo escritor; si alguna escritura en segundo plano
+        falló, su excepción se relanza después de cerrar las conexiones.
+        """
+        if self._writer is not None:
+            self._write_queue.put(None)
+            self._writer.join()
+            self._writer = None
+            self._write_queue = None
+            atexit.unregister(self.close)
+        
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.execute("PRAGMA optimize")
+            except sqlite3.Error as e:
+                print(f"Error al optimizar la base de datos del portfolio: {e}")
+            conn.close()
+        self._local = threading.local()
+        self._raise_write_error()
+    
+    @contextmanager
+    def transaction(self):
+        """
+        Agrupa varias escrituras en una sola transacción (unidad de trabajo).
+        
+        Dentro del bloque los métodos record_* no confirman por su cuenta: todo
+        se confirma al salir del bloque externo, o se revierte si ocurre una
+        excepción. Los bloques anidados se integran en la transacción externa.
+        
+        En modo write-behind las escrituras del bloque se encolan como una sola
+        unidad al salir del bloque externo (o se descartan si hay una excepción).
+        Hasta entonces no están en la base de datos: los métodos get_* llamados
+        dentro del bloque no ven las escrituras del propio bloque, a diferencia
+        del modo normal. Si hace falta leerlas, cerrar el bloque antes de leer.
+        
+        Returns:
+            sqlite3.Connection: Conexión del hilo actual
+        """
+        conn = self._connect()
+        depth = getattr(self._local, "depth", 0)
+        
+        if self._write_queue is not None and threading.current_thread() is not self._writer:
+            if depth == 0:
+                self._local.write_buffer = []
+            self._local.depth = depth + 1
+            try:
+                yield conn
+                if depth == 0 and self._local.write_buffer:
+                    self._enqueue(self._local.write_buffer)
+            finally:
+                self._local.depth = depth
+                if depth == 0:
+                    self._local.write_buffer = None
+            return
+        
+        self._local.depth = depth + 1
+        try:
+            yield conn
+        except BaseException:
+            if depth == 0:
+                self._rollback(conn)
+            raise
+        else:
+            if depth == 0:
+                conn.commit()
+                self._publish_dimension_ids()
+        finally:
+            self._local.depth = depth
+    
+    def _commit(self, conn):
+        """
+        Confirma las escrituras, salvo dentro de transaction() donde se confirman al final del bloque.
+        
+        Args:
+            conn (sqlite3.Connection): Conexión del hilo actual
+        """
+        if not getattr(self._local, "depth", 0):
+            conn.commit()
+            self._publish_dimension_ids()
+    
+    def _rollback(self, conn):
+        """
+        Revierte la transacción abierta y descarta las claves de dimensiones que creó.
+        
+        Args:
+            conn (sqlite3.Connection): Conexión del hilo actual
+        """
+        conn.rollback()
+        self._pending_dimension_ids().clear()
+    
+    def _pending_dimension_ids(self):
+        """
+        Obtiene las claves de dimensiones creadas por el hilo actual y aún no confirmadas.
+        
+        Returns:
+            dict: (tabla, nombre) → id
+        """
+        pending = getattr(self._local, "pending_dimension_ids", None)
+        if pending is None:
+            pending = self._local.pending_dimension_ids = {}
+        return pending
+    
+    def _publish_dimension_ids(self):
+        """Pasa a la caché compartida las claves de dimensiones que acaban de confirmarse."""
+        pending = self._pending_dimension_ids()
+        if pending:
+            self._dimension_ids.update(pending)
+            pending.clear()
+    
+    def _dimension_id(self, conn, table, name):
+        """
+        Resuelve un nombre a su clave en una tabla de dimensión sin consultar la base si ya es conocido.
+        
+        Las claves nuevas solo se comparten con otros hilos cuando se confirma
+        la transacción que las creó, para que un rollback no deje en la caché
+        ids inexistentes.
+        
+        Args:
+            conn (sqlite3.Connection): Conexión del hilo actual
+            table (str): Tabla de dimensión (instruments, banks, countries o currencies)
+            name (str): Nombre a resolver
+        
+        Returns:
+            int: Clave sustituta del nombre
+        """
+        key = (table, name)
+        dimension_id = self._dimension_ids.get(key)
+        if dimension_id is None:
+            pending = self._pending_dimension_ids()
+            dimension_id = pending.get(key)
+            if dimension_id is None:
+                if table == "instruments":
+                    dimension_id = _intern_instrument(conn, name)
+                else:
+                    dimension_id = _intern_name(conn, table, name)
+                pending[key] = dimension_id
+        return dimension_id
     
     def _init_db(self):
         """Inicializa la base de datos SQLite para el portfolio."""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         # Crear tabla de inversiones si no existe
@@ -63,11 +706,48 @@ class Portfolio:
         ''')
         
         conn.commit()
-        conn.close()
+        self._migrate(conn)
+    
+    def _migrate(self, conn):
+        """
+        Aplica las migraciones pendientes del esquema, cada una en su propia transacción.
+        
+        Args:
+            conn (sqlite3.Connection): Conexión del hilo actual
+        """
+        current = conn.execute("PRAGMA user_version").fetchone()[0]
+        for version, statements in enumerate(SCHEMA_MIGRATIONS, start=1):
+            if version <= current:
+                continue
+            
+            # BEGIN IMMEDIATE impide que otro proceso aplique la misma migración a la vez
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if conn.execute("PRAGMA user_version").fetchone()[0] < version:
+                    for statement in statements:
+                        if callable(statement):
+                            statement(conn)
+                        else:
+                            conn.execute(statement)
+                    conn.execute(f"PRAGMA user_version = {version}")
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+    
+    def get_schema_version(self):
+        """
+        Obtiene la versión del esquema de la base de datos.
+        
+        Returns:
+            int: Número de migraciones aplicadas
+        """
+        return self._connect().execute("PRAGMA user_version").fetchone()[0]
     
+    @_write_behind
     def record_investment(self, month, amount, currency, instrument, nominal_rate, real_rate, start_date, end_date):
         """Registra una inversión en la base de datos."""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -76,12 +756,12 @@ class Portfolio:
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
         ''', (month, amount, currency, instrument, nominal_rate, real_rate, start_date, end_date, 'active'))
         
-        conn.commit()
-        conn.close()
+        self._commit(conn)
     
+    @_write_behind
     def update_investment_result(self, investment_id, real_return, status='completed'):
         """Actualiza el resultado real de una inversión."""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -90,12 +770,12 @@ class Portfolio:
             WHERE id = ?
         ''', (real_return, status, investment_id))
         
-        conn.commit()
-        conn.close()
+        self._commit(conn)
     
+    @_reads_own_writes
     def get_historical_investments(self, month=None):
         """Obtiene inversiones históricas, opcionalmente filtradas por mes."""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         if month:
@@ -104,44 +784,466 @@ class Portfolio:
             cursor.execute('SELECT * FROM investments')
             
         investments = cursor.fetchall()
-        conn.close()
         return investments
     
+    def _investment_filters(self, month=None, status=None):
+        """
+        Construye la cláusula WHERE de las consultas de inversiones.
+        
+        Args:
+            month (int): Mes a filtrar (opcional)
+            status (str): Estado a filtrar (opcional)
+        
+        Returns:
+            tuple: (lista de condiciones, lista de parámetros)
+        """
+        conditions, params = [], []
+        if month is not None:
+            conditions.append("month = ?")
+            params.append(month)
+        if status is not None:
+            conditions.append("status = ?")
+            params.append(status)
+        return conditions, params
+    
+    def _investment_columns(self, columns):
+        """
+        Valida una proyección de columnas de la tabla investments.
+        
+        Args:
+            columns (list): Columnas solicitadas; None para todas
+        
+        Returns:
+            list: Columnas validadas
+        """
+        if columns is None:
+            return list(INVESTMENT_COLUMNS)
+        unknown = [column for column in columns if column not in INVESTMENT_COLUMNS]
+        if unknown:
+            raise ValueError(f"Columnas desconocidas en investments: {', '.join(unknown)}")
+        return list(columns)
+    
+    @_reads_own_writes
+    def get_investments_page(self, after_id=None, limit=100, columns=None, month=None, status=None,
+                             descending=False):
+        """
+        Obtiene una página de inversiones con paginación por clave (keyset).
+        
+        En lugar de OFFSET, cada página continúa desde el último id de la
+        anterior, de modo que el costo no crece con el número de página.
+        
+        Args:
+            after_id (int): Cursor devuelto por la página anterior (None para la primera)
+            limit (int): Tamaño de la página (mayor que cero)
+            columns (list): Columnas a obtener (por defecto todas, en el orden de la tabla)
+            month (int): Mes a filtrar (opcional)
+            status (str): Estado a filtrar (opcional)
+            descending (bool): Si True, recorre de la inversión más reciente a la más antigua
+        
+        Returns:
+            tuple: (filas, cursor de la página siguiente o None si no hay más)
+        """
+        if limit <= 0:
+            raise ValueError(f"El tamaño de página debe ser mayor que cero: {limit}")
+        
+        columns = self._investment_columns(columns)
+        conditions, params = self._investment_filters(month, status)
+        if after_id is not None:
+            conditions.append("id < ?" if descending else "id > ?")
+            params.append(after_id)
+        
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        order = "DESC" if descending else "ASC"
+        rows = self._connect().execute(
+            f"SELECT id, {', '.join(columns)} FROM investments {where} ORDER BY id {order} LIMIT ?",
+            params + [limit]
+        ).fetchall()
+        
+        next_after = rows[-1][0] if len(rows) == limit else None
+        return [row[1:] for row in rows], next_after
+    
+    def iter_investments(self, columns=None, month=None, status=None, descending=False, batch_size=1000):
+        """
+        Recorre las inversiones sin cargarlas todas en memoria.
+        
+        Lee por páginas de batch_size filas, de modo que no mantiene abierta
+        una transacción de lectura mientras el consumidor procesa las filas.
+        
+        Args:
+            columns (list): Columnas a obtener (por defecto todas)
+            month (int): Mes a filtrar (opcional)
+            status (str): Estado a filtrar (opcional)
+            descending (bool): Si True, recorre de la más reciente a la más antigua
+            batch_size (int): Filas leídas por consulta
+        
+        Returns:
+            Iterator[tuple]: Filas con las columnas solicitadas
+        """
+        after_id = None
+        while True:
+            rows, after_id = self.get_investments_page(
+                after_id, batch_size, columns, month, status, descending
+            )
+            yield from rows
+            if after_id is None:
+                return
+    
+    def _summary_metrics(self, row):
+        """
+        Convierte una fila de una tabla de agregados en métricas.
+        
+        Args:
+            row (tuple): Valores de las columnas de SUMMARY_COLUMNS, en orden
+        
+        Returns:
+            dict: total_amount, investment_count, active_count, active_amount y
+                avg_real_rate (promedio de la tasa real ponderado por monto, o None)
+        """
+        values = dict(zip(SUMMARY_COLUMNS, row))
+        rated_amount = values.pop("rated_amount")
+        weighted_real_rate = values.pop("weighted_real_rate")
+        values["avg_real_rate"] = weighted_real_rate / rated_amount if rated_amount else None
+        return values
+    
+    @_reads_own_writes
+    def get_summary(self):
+        """
+        Obtiene las métricas agregadas de todas las inversiones, por moneda.
+        
+        Se leen de la tabla investment_summary que mantienen los triggers, por lo
+        que el costo no depende del número de inversiones.
+        
+        Returns:
+            dict: Métricas por moneda (ver _summary_metrics)
+        """
+        rows = self._connect().execute(
+            f"SELECT currency, {', '.join(SUMMARY_COLUMNS)} FROM investment_summary WHERE investment_count > 0"
+        ).fetchall()
+        return {row[0]: self._summary_metrics(row[1:]) for row in rows}
+    
+    @_reads_own_writes
+    def get_monthly_summary(self, currency=None, last=None):
+        """
+        Obtiene las métricas agregadas por mes.
+        
+        Args:
+            currency (str): Moneda a filtrar (opcional)
+            last (int): Si se indica, solo los últimos meses con inversiones
+        
+        Returns:
+            list: Tuplas (mes, moneda, métricas) en orden cronológico
+        """
+        conditions = ["investment_count > 0"]
+        params = []
+        if currency is not None:
+            conditions.append("currency = ?")
+            params.append(currency)
+        
+        query = (
+            f"SELECT month, currency, {', '.join(SUMMARY_COLUMNS)} FROM investment_monthly_summary "
+            f"WHERE {' AND '.join(conditions)} ORDER BY month DESC"
+        )
+        if last is not None:
+            query += " LIMIT ?"
+            params.append(last)
+        
+        rows = self._connect().execute(query, params).fetchall()
+        return [(row[0], row[1], self._summary_metrics(row[2:])) for row in reversed(rows)]
+    
+    @_reads_own_writes
+    def get_investment_months(self):
+        """
+        Obtiene los meses que tienen inversiones registradas.
+        
+        Returns:
+            list: Meses en orden ascendente
+        """
+        rows = self._connect().execute('SELECT DISTINCT month FROM investments ORDER BY month').fetchall()
+        return [row[0] for row in rows]
+    
+    @_reads_own_writes
+    def load_investment_columns(self, columns=None, month=None, status=None):
+        """
+        Carga columnas de inversiones directamente en arreglos NumPy.
+        
+        Cada columna se lee con su propia consulta y se vuelca con np.fromiter
+        sin construir listas de filas; todas se leen dentro de una misma
+        transacción para que correspondan a las mismas inversiones.
+        
+        Args:
+            columns (list): Columnas a cargar (por defecto todas)
+            month (int): Mes a filtrar (opcional)
+            status (str): Estado a filtrar (opcional)
+        
+        Returns:
+            dict: Arreglo NumPy por columna (int64, float64 u object según el tipo)
+        """
+        import numpy as np
+        
+        columns = self._investment_columns(columns)
+        conditions, params = self._investment_filters(month, status)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        
+        conn = self._connect()
+        cursor = conn.cursor()
+        owns_transaction = not conn.in_transaction
+        if owns_transaction:
+            conn.execute("BEGIN")
+        try:
+            count = conn.execute(f"SELECT COUNT(*) FROM investments {where}", params).fetchone()[0]
+            arrays = {}
+            for column in columns:
+                # Cada fila se entrega como escalar (NULL como NaN en columnas reales)
+                if INVESTMENT_COLUMNS[column] == "float64":
+                    cursor.row_factory = lambda _, row: float("nan") if row[0] is None else row[0]
+                else:
+                    cursor.row_factory = lambda _, row: row[0]
+                cursor.execute(f"SELECT {column} FROM investments {where} ORDER BY id", params)
+                arrays[column] = np.fromiter(cursor, dtype=INVESTMENT_COLUMNS[column], count=count)
+        finally:
+            if owns_transaction:
+                conn.commit()
+        return arrays
+    
+    def load_investments_frame(self, columns=None, month=None, status=None):
+        """
+        Carga inversiones en un DataFrame de pandas a partir de load_investment_columns.
+        
+        Args:
+            columns (list): Columnas a cargar (por defecto todas)
+            month (int): Mes a filtrar (opcional)
+            status (str): Estado a filtrar (opcional)
+        
+        Returns:
+            pd.DataFrame: Inversiones, una columna por campo
+        """
+        import pandas as pd
+        
+        return pd.DataFrame(self.load_investment_columns(columns, month, status))
+    
+    @_write_behind
     def record_bank_rate(self, month, bank, currency, nominal_rate):
         """Registra la tasa de un banco para un mes específico."""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         cursor.execute('''
-            INSERT INTO bank_rates (month, bank, currency, nominal_rate)
+            INSERT INTO bank_rates (month, instrument_id, currency_id, nominal_rate)
             VALUES (?, ?, ?, ?)
-        ''', (month, bank, currency, nominal_rate))
+            ON CONFLICT (instrument_id, currency_id, month) DO UPDATE SET nominal_rate = excluded.nominal_rate
+        ''', (
+            month,
+            self._dimension_id(conn, "instruments", bank),
+            self._dimension_id(conn, "currencies", currency),
+            nominal_rate
+        ))
         
-        conn.commit()
-        conn.close()
+        self._commit(conn)
+    
+    @_write_behind
+    def record_bank_rates_bulk(self, rows):
+        """
+        Registra en bloque tasas de bancos.
+        
+        Args:
+            rows (list): Lista de tuplas (mes, banco, moneda, tasa_nominal)
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        cursor.executemany('''
+            INSERT INTO bank_rates (month, instrument_id, currency_id, nominal_rate)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT (instrument_id, currency_id, month) DO UPDATE SET nominal_rate = excluded.nominal_rate
+        ''', [
+            (
+                month,
+                self._dimension_id(conn, "instruments", bank),
+                self._dimension_id(conn, "currencies", currency),
+                nominal_rate
+            )
+            for month, bank, currency, nominal_rate in rows
+        ])
+        
+        self._commit(conn)
     
+    @_reads_own_writes
+    def get_bank_rates(self, month=None, currency=None):
+        """
+        Obtiene las tasas registradas con los nombres de instrumento y moneda.
+        
+        Args:
+            month (int): Mes a filtrar (opcional)
+            currency (str): Moneda a filtrar (opcional)
+        
+        Returns:
+            list: Tuplas (mes, banco, moneda, tasa_nominal) ordenadas por mes y banco
+        """
+        conditions, params = [], []
+        if month is not None:
+            conditions.append("month = ?")
+            params.append(month)
+        if currency is not None:
+            conditions.append("currency = ?")
+            params.append(currency)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        
+        cursor = self._connect().cursor()
+        cursor.execute(f"SELECT * FROM bank_rates_named {where} ORDER BY month, bank", params)
+        return cursor.fetchall()
+    
+    @_write_behind
     def record_inflation_rate(self, month, country, inflation_rate):
         """Registra la tasa de inflación de un país para un mes específico."""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         cursor.execute('''
             INSERT INTO inflation_rates (month, country, inflation_rate)
             VALUES (?, ?, ?)
+            ON CONFLICT (country, month) DO UPDATE SET inflation_rate = excluded.inflation_rate
         ''', (month, country, inflation_rate))
         
-        conn.commit()
-        conn.close()
+        self._commit(conn)
     
+    @_write_behind
+    def record_inflation_rates_bulk(self, rows):
+        """
+        Registra en bloque tasas de inflación.
+        
+        Args:
+            rows (list): Lista de tuplas (mes, país, tasa_inflación)
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        cursor.executemany('''
+            INSERT INTO inflation_rates (month, country, inflation_rate)
+            VALUES (?, ?, ?)
+            ON CONFLICT (country, month) DO UPDATE SET inflation_rate = excluded.inflation_rate
+        ''', rows)
+        
+        self._commit(conn)
+    
+    @_write_behind
     def record_trm(self, date, trm_value):
         """Registra el valor de la TRM para una fecha específica."""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         cursor.execute('''
             INSERT INTO trm_history (date, trm_value)
             VALUES (?, ?)
+            ON CONFLICT (date) DO UPDATE SET trm_value = excluded.trm_value
         ''', (date, trm_value))
         
-        conn.commit()
-        conn.close()
\ No newline at end of file
+        self._commit(conn)
+    
+    @_write_behind
+    def record_simulation_trm(self, date, trm_value):
+        """
+        Registra la TRM usada en un mes simulado, fuera del historial real de trm_history.
+        
+        Args:
+            date (str): Fecha simulada (YYYY-MM-DD)
+            trm_value (float): TRM usada por el simulador
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            INSERT INTO simulation_trm (date, trm_value)
+            VALUES (?, ?)
+            ON CONFLICT (date) DO UPDATE SET trm_value = excluded.trm_value
+        ''', (date, trm_value))
+        
+        self._commit(conn)
+    
+    @_write_behind
+    def record_trm_bulk(self, rows):
+        """
+        Registra en bloque valores de TRM.
+        
+        Args:
+            rows (list): Lista de tuplas (fecha, valor_trm)
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        cursor.executemany('''
+            INSERT INTO trm_history (date, trm_value)
+            VALUES (?, ?)
+            ON CONFLICT (date) DO UPDATE SET trm_value = excluded.trm_value
+        ''', rows)
+        
+        self._commit(conn)
+    
+    @_reads_own_writes
+    def get_trm_date_range(self, until=None):
+        """
+        Obtiene la primera y la última fecha almacenadas en el historial de TRM.
+        
+        Args:
+            until (str): Ignora fechas posteriores a esta (YYYY-MM-DD, opcional)
+        
+        Returns:
+            tuple: (fecha_minima, fecha_maxima) o (None, None) si no hay datos
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        # Subconsultas separadas: SQLite solo resuelve MIN o MAX con el índice si van solos
+        cursor.execute('''
+            SELECT
+                (SELECT MIN(date) FROM trm_history WHERE date <= ?1),
+                (SELECT MAX(date) FROM trm_history WHERE date <= ?1)
+        ''', (until or '9999-12-31',))
+        
+        date_range = cursor.fetchone()
+        return date_range
+    
+    @_write_behind
+    def upsert_trm_history(self, rows):
+        """
+        Inserta o actualiza en bloque valores de TRM por fecha.
+        
+        Args:
+            rows (list): Lista de tuplas (fecha, valor_trm)
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        cursor.executemany('''
+            INSERT INTO trm_history (date, trm_value)
+            VALUES (?, ?)
+            ON CONFLICT (date) DO UPDATE SET trm_value = excluded.trm_value
+        ''', rows)
+        
+        self._commit(conn)
+    
+    @_reads_own_writes
+    def get_trm_values(self, limit, until=None):
+        """
+        Obtiene los últimos valores de TRM almacenados, en orden cronológico.
+        
+        Args:
+            limit (int): Número de valores a obtener
+            until (str): Ignora fechas posteriores a esta (YYYY-MM-DD, opcional)
+        
+        Returns:
+            list: Valores de TRM del más antiguo al más reciente
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT trm_value FROM (
+                SELECT date, trm_value FROM trm_history
+                WHERE date <= ?
+                ORDER BY date DESC
+                LIMIT ?
+            ) ORDER BY date
+        ''', (until or '9999-12-31', limit))
+        
+        values = [row[0] for row in cursor.fetchall()]
+        return values
@@ -2,10 +2,43 @@
 """
 Investment strategy module for Global Yield Optimizer v3.0
 """
-from .rag_agent import RAGInvestmentAgent
+from typing import TYPE_CHECKING
 
+if TYPE_CHECKING:
+    # Solo para anotaciones: importar el agente carga chromadb y sentence_transformers
+    from .rag_agent import RAGInvestmentAgent
 
-def get_investment_recommendation(current_trm, sma_45, inf_co, best_rate_co, month, rag_agent: RAGInvestmentAgent):
+
+# Umbrales de las señales que indican una TRM sobreextendida al alza
+OVERBOUGHT_RSI = 70
+OVERBOUGHT_ZSCORE = 2.0
+
+
+def _describe_signals(signals):
+    """
+    Convierte las señales de la TRM en texto para el contexto del agente RAG.
+    
+    Args:
+        signals (dict): Señales calculadas con calculate_signals
+    
+    Returns:
+        str: Señales disponibles separadas por comas
+    """
+    labels = {
+        "rsi": "RSI",
+        "zscore": "Z-score",
+        "volatility": "Volatilidad",
+        "roc": "ROC",
+        "bollinger_upper": "Bollinger sup",
+        "bollinger_lower": "Bollinger inf"
+    }
+    return ", ".join(
+        f"{label}: {signals[name]:.2f}" for name, label in labels.items() if signals.get(name) is not None
+    )
+
+
+def get_investment_recommendation(current_trm, sma_45, inf_co, best_rate_co, month, rag_agent: "RAGInvestmentAgent",
+                                  signals=None):
     """
     Genera una recomendación de inversión basada en indicadores actuales y memoria RAG.
     
@@ -16,12 +49,18 @@ def get_investment_recommendation(current_trm, sma_45, inf_co, best_rate_co, mon
         best_rate_co (float): Mejor tasa de interés en Colombia
         month (int): Mes actual
         rag_agent (RAGInvestmentAgent): Agente RAG para consulta de memoria
+        signals (dict): Señales de volatilidad y momentum de la TRM (opcional, ver calculate_signals)
     
     Returns:
         str: Recomendación de inversión
     """
+    signals = signals or {}
+    
     # Contexto actual
     current_context = f"TRM: {current_trm}, SMA45: {sma_45}, Inflación CO: {inf_co}, Mejor tasa CO: {best_rate_co}"
+    described = _describe_signals(signals)
+    if described:
+        current_context += f", {described}"
     
     # Recuperar decisiones pasadas similares
     similar_docs, metadatas = rag_agent.retrieve_similar_decisions(current_context)
@@ -32,12 +71,36 @@ def get_investment_recommendation(current_trm, sma_45, inf_co, best_rate_co, mon
         return improved_rec
     else:
         # Regla simple por defecto si no hay memoria suficiente
-        if current_trm > sma_45 * 1.025:  # Si TRM está 2.5% sobre su media
+        rsi = signals.get("rsi")
+        zscore = signals.get("zscore")
+        overbought = rsi is not None and zscore is not None and rsi >= OVERBOUGHT_RSI and zscore >= OVERBOUGHT_ZSCORE
+        if current_trm > sma_45 * 1.025 or overbought:  # Si TRM está 2.5% sobre su media o sobreextendida
             return f"Recomendación: Invertir en instrumentos en COP con mejor tasa ({best_rate_co}%)"
         else:
             return "Recomendación: Mantener liquidez en USD hasta mejores condiciones"
 
 
+def get_snapshot_recommendation(snapshot, sma_45, month, rag_agent: "RAGInvestmentAgent", signals=None):
+    """
+    Genera una recomendación de inversión a partir de una fotografía del mercado.
+    
+    Args:
+        snapshot (MarketSnapshot): Fotografía inmutable del mercado del mes
+        sma_45 (float): Media móvil de 45 días de la TRM
+        month (int): Mes actual
+        rag_agent (RAGInvestmentAgent): Agente RAG para consulta de memoria
+        signals (dict): Señales de volatilidad y momentum de la TRM (opcional)
+    
+    Returns:
+        str: Recomendación de inversión
+    """
+    _, best_rate_co = snapshot.best_bank_rate("COP")
+    return get_investment_recommendation(
+        snapshot.trm, sma_45, snapshot.inflation_rates["Colombia"], best_rate_co,
+        month, rag_agent, signals
+    )
+
+
 def calculate_real_return(nominal_rate, inflation):
     """
     Calcula la rentabilidad real de una inversión.
@@ -5,7 +5,41 @@ Dashboard for Global Yield Optimizer v3.0
 import streamlit as st
 import pandas as pd
 from core.portfolio import Portfolio
-from data.financial_data_provider import get_financial_data, get_best_investments
+from data.market_snapshot import get_market_snapshot
+
+
+# Nombre de cada columna de la tabla investments en el dashboard
+INVESTMENT_LABELS = {
+    "id": "ID",
+    "month": "Mes",
+    "amount": "Monto",
+    "currency": "Moneda",
+    "instrument": "Instrumento",
+    "nominal_rate": "Tasa Nominal",
+    "real_rate": "Tasa Real",
+    "start_date": "Fecha Inicio",
+    "end_date": "Fecha Fin",
+    "status": "Estado"
+}
+
+# Inversiones por página en el historial
+HISTORY_PAGE_SIZE = 50
+
+# Moneda de las métricas clave (el simulador invierte en COP)
+METRICS_CURRENCY = "COP"
+
+
+def investments_frame(rows):
+    """
+    Convierte filas completas de la tabla investments en un DataFrame para mostrar.
+    
+    Args:
+        rows (list): Filas con todas las columnas, en el orden de la tabla
+    
+    Returns:
+        pd.DataFrame: Inversiones con los nombres de columna del dashboard
+    """
+    return pd.DataFrame(rows, columns=list(INVESTMENT_LABELS.values()))
 
 
 def main():
@@ -42,28 +76,45 @@ def show_dashboard(portfolio):
     
     # Mostrar últimas inversiones
     st.subheader("Últimas Inversiones")
-    investments = portfolio.get_historical_investments()
+    # Solo las 10 más recientes, sin leer el historial completo
+    investments, _ = portfolio.get_investments_page(limit=10, descending=True)
     
     if investments:
-        # Convertir a DataFrame para mejor visualización
-        df = pd.DataFrame(investments, columns=[
-            "ID", "Mes", "Monto", "Moneda", "Instrumento", 
-            "Tasa Nominal", "Tasa Real", "Fecha Inicio", "Fecha Fin", "Estado"
-        ])
-        st.dataframe(df.tail(10))
+        st.dataframe(investments_frame(investments[::-1]))
     else:
         st.info("No hay inversiones registradas aún.")
     
-    # Mostrar métricas clave
+    # Mostrar métricas clave (leídas de los agregados que mantiene el portfolio)
     st.subheader(" Métricas Clave")
-    col1, col2, col3 = st.columns(3)
+    summary = portfolio.get_summary().get(METRICS_CURRENCY)
+    recent_months = portfolio.get_monthly_summary(currency=METRICS_CURRENCY, last=2)
     
-    with col1:
-        st.metric("Total Invertido", "$10.5M", "+$1.2M")
-    with col2:
-        st.metric("Rentabilidad Promedio", "4.2%", "+0.3%")
-    with col3:
-        st.metric("Inversiones Activas", "8", "2")
+    if summary is None or not recent_months:
+        st.info(f"No hay inversiones en {METRICS_CURRENCY} para calcular métricas.")
+    else:
+        last_month = recent_months[-1][2]
+        previous_month = recent_months[-2][2] if len(recent_months) > 1 else None
+        avg_real_rate = summary["avg_real_rate"]
+        rate_delta = None
+        if previous_month and last_month["avg_real_rate"] is not None and previous_month["avg_real_rate"] is not None:
+            rate_delta = f"{last_month['avg_real_rate'] - previous_month['avg_real_rate']:+.1f}%"
+        
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            st.metric(
+                "Total Invertido",
+                f"${summary['total_amount'] / 1e6:,.1f}M",
+                f"+${last_month['total_amount'] / 1e6:,.1f}M"
+            )
+        with col2:
+            st.metric(
+                "Rentabilidad Promedio",
+                f"{avg_real_rate:.1f}%" if avg_real_rate is not None else "N/D",
+                rate_delta
+            )
+        with col3:
+            st.metric("Inversiones Activas", str(summary["active_count"]), str(last_month["investment_count"]))
     
     # Mostrar inflación de países relevantes
     st.subheader("Inflación por País")
@@ -80,25 +131,38 @@ def show_dashboard(portfolio):
 def show_investment_history(portfolio):
     st.header("🕒 Historial de Inversiones")
     
-    investments = portfolio.get_historical_investments()
-    
-    if investments:
-        # Convertir a DataFrame para mejor visualización
-        df = pd.DataFrame(investments, columns=[
-            "ID", "Mes", "Monto", "Moneda", "Instrumento", 
-            "Tasa Nominal", "Tasa Real", "Fecha Inicio", "Fecha Fin", "Estado"
-        ])
-        st.dataframe(df)
-        
-        # Filtros
-        st.subheader("Filtros")
-        month_filter = st.selectbox("Filtrar por mes:", ["Todos"] + sorted(df["Mes"].unique()))
-        
-        if month_filter != "Todos":
-            df = df[df["Mes"] == month_filter]
-            st.dataframe(df)
-    else:
+    months = portfolio.get_investment_months()
+    if not months:
         st.info("No hay inversiones registradas aún.")
+        return
+    
+    # Filtros
+    st.subheader("Filtros")
+    month_filter = st.selectbox("Filtrar por mes:", ["Todos"] + months)
+    month = None if month_filter == "Todos" else month_filter
+    
+    # Paginación por clave: se guardan los cursores de las páginas visitadas
+    # y se reinician al cambiar el filtro
+    state = st.session_state
+    if state.get("history_month", "Todos") != month_filter or "history_cursors" not in state:
+        state.history_month = month_filter
+        state.history_cursors = [None]
+    
+    investments, next_after = portfolio.get_investments_page(
+        state.history_cursors[-1], HISTORY_PAGE_SIZE, month=month, descending=True
+    )
+    st.dataframe(investments_frame(investments))
+    st.caption(f"Página {len(state.history_cursors)} (de la más reciente a la más antigua)")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        if len(state.history_cursors) > 1 and st.button("← Más recientes"):
+            state.history_cursors.pop()
+            st.rerun()
+    with col2:
+        if next_after is not None and st.button("Más antiguas →"):
+            state.history_cursors.append(next_after)
+            st.rerun()
 
 
 def show_rag_memory():
@@ -128,24 +192,24 @@ def show_simulation():
 def show_financial_data():
     st.header("💰 Datos Financieros")
     
-    # Obtener datos financieros
-    financial_data = get_financial_data()
-    best_investments = get_best_investments()
+    # Obtener una única fotografía del mercado
+    snapshot = get_market_snapshot()
+    best_investments = snapshot.best_investments
     
     # Mostrar TRM
     st.subheader("Tasa de Cambio (TRM)")
-    st.metric("TRM Actual", f"${financial_data['trm']:,.2f} COP/USD")
+    st.metric("TRM Actual", f"${snapshot.trm:,.2f} COP/USD")
     
     # Mostrar inflación por país
     st.subheader("Inflación por País")
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        st.metric("Colombia", f"{financial_data['inflation_rates']['Colombia']}%")
+        st.metric("Colombia", f"{snapshot.inflation_rates['Colombia']}%")
     with col2:
-        st.metric("EE.UU.", f"{financial_data['inflation_rates']['USA']}%")
+        st.metric("EE.UU.", f"{snapshot.inflation_rates['USA']}%")
     with col3:
-        st.metric("Panamá", f"{financial_data['inflation_rates']['Panama']}%")
+        st.metric("Panamá", f"{snapshot.inflation_rates['Panama']}%")
     
     # Mostrar mejores inversiones
     st.subheader("Mejores Opciones de Inversión")
@@ -4,16 +4,250 @@ API integration module for Banco de la República de Colombia
 """
 import requests
 import json
+import threading
+import time
 from datetime import datetime, timedelta
+from .banrep_cache import BanRepCache, make_range_key
+from .series_stream import STREAM_CHUNK_SIZE, ChunkCounter, parse_series_stream
+from .timeseries_store import records_to_arrays, from_day_ordinal
+from .http_client import (
+    create_session,
+    conditional_get,
+    conditional_headers,
+    record_transfer,
+    parse_json,
+    DEFAULT_TIMEOUT,
+    DEFAULT_POOL_SIZE,
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_BACKOFF_FACTOR
+)
+
+
+BANREP_BASE_URL = "https://tutorials.banrep.gov.co/api/v1"
+
+# Los rangos leídos por streaming solo se guardan en la caché JSON hasta este tamaño;
+# los más largos no se guardan en ningún lado y cada consulta los descarga de nuevo
+# (el almacén columnar, TimeSeriesStore, lo alimenta RefreshDaemon, no este cliente)
+ARRAY_CACHE_MAX_ROWS = 10000
+
+
+class OfflineCacheMiss(requests.RequestException):
+    """Se lanza en modo offline cuando la serie solicitada no está en la caché."""
 
 
 class BanRepAPI:
     """Clase para manejar la integración con las APIs del Banco de la República."""
     
-    def __init__(self):
-        """Inicializa el cliente de la API del Banco de la República."""
-        self.base_url = "https://tutorials.banrep.gov.co/api/v1"
-        self.session = requests.Session()
+    def __init__(self, base_url=BANREP_BASE_URL, session=None, timeout=DEFAULT_TIMEOUT,
+                 pool_size=DEFAULT_POOL_SIZE, max_retries=DEFAULT_MAX_RETRIES,
+                 backoff_factor=DEFAULT_BACKOFF_FACTOR, cache=None, offline=False):
+        """
+        Inicializa el cliente de la API del Banco de la República.
+        
+        Args:
+            base_url (str): URL base de la API
+            session (requests.Session): Sesión HTTP a reutilizar (opcional)
+            timeout (tuple): Timeouts (conexión, lectura) en segundos
+            pool_size (int): Conexiones keep-alive por host
+            max_retries (int): Reintentos máximos por solicitud
+            backoff_factor (float): Factor base del backoff exponencial
+            cache (BanRepCache): Caché persistente de series (opcional)
+            offline (bool): Si True, solo se sirven datos desde la caché
+        """
+        self.base_url = base_url
+        self.timeout = timeout
+        self.session = session or create_session(pool_size, max_retries, backoff_factor)
+        self.cache = cache
+        self.offline = offline
+    
+    def _get(self, url, params=None, etag=None, last_modified=None):
+        """
+        Ejecuta una solicitud GET (condicional si hay validadores) y decodifica el JSON.
+        
+        Args:
+            url (str): URL a consultar
+            params (dict): Parámetros de la consulta (opcional)
+            etag (str): ETag de la copia en caché (opcional)
+            last_modified (str): Last-Modified de la copia en caché (opcional)
+        
+        Returns:
+            tuple: (respuesta decodificada o None si el servidor respondió 304,
+                etag, last_modified)
+        """
+        response = conditional_get(self.session, url, params, self.timeout, etag, last_modified)
+        if response.status_code == 304:
+            return None, etag, last_modified
+        try:
+            data = parse_json(response.content)
+        except ValueError as e:
+            raise requests.RequestException(f"Respuesta JSON inválida: {e}") from e
+        return (
+            data,
+            response.headers.get("ETag"),
+            response.headers.get("Last-Modified")
+        )
+    
+    def _get_series(self, series, path="", params=None):
+        """
+        Obtiene una serie pasando primero por la caché persistente (read-through).
+        
+        Las entradas vencidas se revalidan con una solicitud condicional; si el
+        servidor responde 304 se renueva la entrada sin descargar el cuerpo.
+        
+        Args:
+            series (str): ID de la serie (TRM, IPC, TI, ...)
+            path (str): Ruta relativa dentro de la serie (ej: "/latest")
+            params (dict): Parámetros de la consulta (opcional)
+        
+        Returns:
+            dict: Respuesta decodificada
+        """
+        range_key = make_range_key(path, params)
+        
+        if self.cache is not None:
+            cached = self.cache.get(series, range_key, allow_stale=self.offline)
+            if cached is not None:
+                return cached
+        
+        if self.offline:
+            raise OfflineCacheMiss(f"Serie {series}{range_key} no disponible en caché (modo offline)")
+        
+        url = f"{self.base_url}/series/{series}{path}"
+        etag, last_modified = self.cache.get_validators(series, range_key) if self.cache is not None else (None, None)
+        try:
+            data, etag, last_modified = self._get(url, params, etag, last_modified)
+            if data is None:
+                data = self.cache.revalidate(series, range_key)
+                if data is not None:
+                    return data
+                # La entrada desapareció entre la consulta y el 304: descargar completa
+                data, etag, last_modified = self._get(url, params)
+        except requests.RequestException:
+            # Si la API falla, preferir una entrada vencida antes que datos simulados
+            if self.cache is not None:
+                cached = self.cache.get(series, range_key, allow_stale=True)
+                if cached is not None:
+                    return cached
+            raise
+        
+        if self.cache is not None:
+            self.cache.put(series, range_key, data, etag, last_modified)
+        return data
+    
+    def _stream_arrays(self, url, params=None, etag=None, last_modified=None):
+        """
+        Descarga una serie por bloques y la decodifica directamente en columnas NumPy.
+        
+        Args:
+            url (str): URL a consultar
+            params (dict): Parámetros de la consulta (opcional)
+            etag (str): ETag de la copia en caché (opcional)
+            last_modified (str): Last-Modified de la copia en caché (opcional)
+        
+        Returns:
+            tuple: (fechas, valores, campos de primer nivel, etag, last_modified),
+                o None si el servidor respondió 304
+        """
+        response = self.session.get(
+            url,
+            params=params,
+            timeout=self.timeout,
+            headers=conditional_headers(etag, last_modified),
+            stream=True
+        )
+        try:
+            if response.status_code == 304:
+                record_transfer(304, 0)
+                return None
+            response.raise_for_status()
+            
+            chunks = ChunkCounter(response.iter_content(STREAM_CHUNK_SIZE))
+            meta = {}
+            started = time.perf_counter()
+            try:
+                dates, values = parse_series_stream(
+                    chunks,
+                    size_hint=int(response.headers.get("Content-Length") or 0),
+                    meta=meta
+                )
+            except ValueError as e:
+                raise requests.RequestException(f"Respuesta JSON inválida: {e}") from e
+            finally:
+                record_transfer(
+                    response.status_code,
+                    chunks.bytes,
+                    time.perf_counter() - started - chunks.wait_seconds
+                )
+            return dates, values, meta, response.headers.get("ETag"), response.headers.get("Last-Modified")
+        finally:
+            response.close()
+    
+    def _get_series_arrays(self, series, path="", params=None):
+        """
+        Obtiene una serie como columnas NumPy (fechas, valores), leyendo la
+        respuesta por bloques en lugar de construir el árbol JSON completo.
+        
+        Usa la misma caché y las mismas solicitudes condicionales que _get_series,
+        pero solo guarda en caché los rangos de hasta ARRAY_CACHE_MAX_ROWS filas;
+        los más largos se descargan completos en cada consulta.
+        
+        Args:
+            series (str): ID de la serie (TRM, IPC, TI, ...)
+            path (str): Ruta relativa dentro de la serie (ej: "/history")
+            params (dict): Parámetros de la consulta (opcional)
+        
+        Returns:
+            tuple: (fechas como ordinales de día int32, valores float64)
+        """
+        range_key = make_range_key(path, params)
+        
+        if self.cache is not None:
+            cached = self.cache.get(series, range_key, allow_stale=self.offline)
+            if cached is not None:
+                return records_to_arrays(cached.get('data', []))
+        
+        if self.offline:
+            raise OfflineCacheMiss(f"Serie {series}{range_key} no disponible en caché (modo offline)")
+        
+        url = f"{self.base_url}/series/{series}{path}"
+        etag, last_modified = self.cache.get_validators(series, range_key) if self.cache is not None else (None, None)
+        try:
+            result = self._stream_arrays(url, params, etag, last_modified)
+            if result is None:
+                cached = self.cache.revalidate(series, range_key)
+                if cached is not None:
+                    return records_to_arrays(cached.get('data', []))
+                # La entrada desapareció entre la consulta y el 304: descargar completa
+                result = self._stream_arrays(url, params)
+        except requests.RequestException:
+            # Si la API falla, preferir una entrada vencida antes que datos simulados
+            if self.cache is not None:
+                cached = self.cache.get(series, range_key, allow_stale=True)
+                if cached is not None:
+                    return records_to_arrays(cached.get('data', []))
+            raise
+        
+        dates, values, meta, etag, last_modified = result
+        if self.cache is not None and len(dates) <= ARRAY_CACHE_MAX_ROWS:
+            meta['data'] = [
+                {"date": from_day_ordinal(ordinal), "value": float(value)}
+                for ordinal, value in zip(dates, values)
+            ]
+            self.cache.put(series, range_key, meta, etag, last_modified)
+        return dates, values
+    
+    def cache_stats(self):
+        """
+        Obtiene los contadores de la caché persistente.
+        
+        Returns:
+            dict: Estadísticas de la caché (vacío si no hay caché)
+        """
+        return self.cache.stats() if self.cache is not None else {}
+    
+    def close(self):
+        """Cierra las conexiones abiertas del pool."""
+        self.session.close()
         
     def get_trm(self, date=None):
         """
@@ -27,13 +261,11 @@ class BanRepAPI:
         """
         try:
             if date:
-                url = f"{self.base_url}/series/TRM/date/{date}"
+                path = f"/date/{date}"
             else:
-                url = f"{self.base_url}/series/TRM/latest"
+                path = "/latest"
                 
-            response = self.session.get(url)
-            response.raise_for_status()
-            return response.json()
+            return self._get_series("TRM", path)
         except requests.RequestException as e:
             print(f"Error al obtener TRM: {e}")
             return None
@@ -51,7 +283,6 @@ class BanRepAPI:
             dict: Historial de TRM
         """
         try:
-            url = f"{self.base_url}/series/TRM/history"
             params = {}
             
             if start_date:
@@ -61,9 +292,34 @@ class BanRepAPI:
             if not start_date and not end_date:
                 params['days'] = days
                 
-            response = self.session.get(url, params=params)
-            response.raise_for_status()
-            return response.json()
+            return self._get_series("TRM", "/history", params)
+        except requests.RequestException as e:
+            print(f"Error al obtener historial de TRM: {e}")
+            return None
+    
+    def get_trm_history_arrays(self, start_date=None, end_date=None, days=45):
+        """
+        Obtiene el historial de TRM como columnas NumPy, leyendo la respuesta por bloques.
+        
+        Args:
+            start_date (str): Fecha de inicio en formato YYYY-MM-DD
+            end_date (str): Fecha de fin en formato YYYY-MM-DD
+            days (int): Número de días hacia atrás si no se especifican fechas
+        
+        Returns:
+            tuple: (fechas como ordinales de día, valores), o None si hay error
+        """
+        try:
+            params = {}
+            
+            if start_date:
+                params['start_date'] = start_date
+            if end_date:
+                params['end_date'] = end_date
+            if not start_date and not end_date:
+                params['days'] = days
+            
+            return self._get_series_arrays("TRM", "/history", params)
         except requests.RequestException as e:
             print(f"Error al obtener historial de TRM: {e}")
             return None
@@ -81,19 +337,41 @@ class BanRepAPI:
         """
         try:
             if year and month:
-                url = f"{self.base_url}/series/IPC/{year}/{month}"
+                path = f"/{year}/{month}"
             elif year:
-                url = f"{self.base_url}/series/IPC/{year}"
+                path = f"/{year}"
             else:
-                url = f"{self.base_url}/series/IPC/latest"
+                path = "/latest"
                 
-            response = self.session.get(url)
-            response.raise_for_status()
-            return response.json()
+            return self._get_series("IPC", path)
         except requests.RequestException as e:
             print(f"Error al obtener inflación: {e}")
             return None
     
+    def get_inflation_history_arrays(self, start_date=None, end_date=None):
+        """
+        Obtiene el historial de inflación como columnas NumPy, leyendo la respuesta por bloques.
+        
+        Args:
+            start_date (str): Fecha de inicio en formato YYYY-MM-DD (opcional)
+            end_date (str): Fecha de fin en formato YYYY-MM-DD (opcional)
+        
+        Returns:
+            tuple: (fechas como ordinales de día, valores), o None si hay error
+        """
+        try:
+            params = {}
+            
+            if start_date:
+                params['start_date'] = start_date
+            if end_date:
+                params['end_date'] = end_date
+            
+            return self._get_series_arrays("IPC", "/history", params)
+        except requests.RequestException as e:
+            print(f"Error al obtener historial de inflación: {e}")
+            return None
+    
     def get_interest_rate(self, date=None):
         """
         Obtiene la Tasa de Intervención del Banco de la República.
@@ -106,13 +384,11 @@ class BanRepAPI:
         """
         try:
             if date:
-                url = f"{self.base_url}/series/TI/date/{date}"
+                path = f"/date/{date}"
             else:
-                url = f"{self.base_url}/series/TI/latest"
+                path = "/latest"
                 
-            response = self.session.get(url)
-            response.raise_for_status()
-            return response.json()
+            return self._get_series("TI", path)
         except requests.RequestException as e:
             print(f"Error al obtener tasa de interés: {e}")
             return None
@@ -130,7 +406,6 @@ class BanRepAPI:
             dict: Datos del indicador
         """
         try:
-            url = f"{self.base_url}/series/{indicator_id}"
             params = {}
             
             if start_date:
@@ -138,14 +413,64 @@ class BanRepAPI:
             if end_date:
                 params['end_date'] = end_date
                 
-            response = self.session.get(url, params=params)
-            response.raise_for_status()
-            return response.json()
+            return self._get_series(indicator_id, "", params)
         except requests.RequestException as e:
             print(f"Error al obtener indicador {indicator_id}: {e}")
             return None
 
 
+# Cliente compartido por todo el proceso
+_shared_api = None
+_shared_api_lock = threading.Lock()
+
+
+def get_shared_api():
+    """
+    Obtiene el cliente BanRep compartido por el proceso, creándolo si no existe.
+    
+    Returns:
+        BanRepAPI: Cliente con pool de conexiones compartido
+    """
+    global _shared_api
+    if _shared_api is None:
+        with _shared_api_lock:
+            if _shared_api is None:
+                _shared_api = BanRepAPI(cache=BanRepCache())
+    return _shared_api
+
+
+def configure_shared_api(**kwargs):
+    """
+    Reemplaza el cliente BanRep compartido por uno con la configuración indicada.
+    
+    Args:
+        **kwargs: Parámetros de BanRepAPI (base_url, timeout, pool_size, offline, ...)
+    
+    Returns:
+        BanRepAPI: Nuevo cliente compartido
+    """
+    global _shared_api
+    with _shared_api_lock:
+        if "cache" not in kwargs:
+            # Conservar la caché persistente del cliente anterior
+            kwargs["cache"] = _shared_api.cache if _shared_api is not None else BanRepCache()
+        previous = _shared_api
+        _shared_api = BanRepAPI(**kwargs)
+    if previous is not None:
+        previous.close()
+    return _shared_api
+
+
+def get_cache_stats():
+    """
+    Obtiene los contadores de aciertos y fallos de la caché del cliente compartido.
+    
+    Returns:
+        dict: Estadísticas de la caché
+    """
+    return get_shared_api().cache_stats()
+
+
 # Funciones de conveniencia
 def get_banrep_data(indicator_id, **kwargs):
     """
@@ -158,7 +483,7 @@ def get_banrep_data(indicator_id, **kwargs):
     Returns:
         dict: Datos del indicador
     """
-    api = BanRepAPI()
+    api = get_shared_api()
     return api.get_indicator(indicator_id, **kwargs)
 
 
@@ -172,7 +497,7 @@ def get_colombian_trm(date=None):
     Returns:
         float: Valor del TRM
     """
-    api = BanRepAPI()
+    api = get_shared_api()
     data = api.get_trm(date)
     if data and 'value' in data:
         return float(data['value'])
@@ -190,7 +515,7 @@ def get_colombian_inflation(year=None, month=None):
     Returns:
         float: Tasa de inflación
     """
-    api = BanRepAPI()
+    api = get_shared_api()
     data = api.get_inflation(year, month)
     if data and 'value' in data:
         return float(data['value'])
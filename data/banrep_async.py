@@ -0,0 +1,315 @@
+# banrep_async.py
+"""
+Asyncio API integration module for Banco de la República de Colombia
+"""
+import asyncio
+import aiohttp
+from .banrep_api import BANREP_BASE_URL, OfflineCacheMiss
+from .banrep_cache import make_range_key
+from .http_client import (
+    DEFAULT_TIMEOUT,
+    DEFAULT_POOL_SIZE,
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_BACKOFF_FACTOR,
+    RETRY_STATUS_CODES,
+    conditional_headers,
+    record_response,
+    parse_json
+)
+
+
+# Número máximo de solicitudes simultáneas en vuelo por cliente
+DEFAULT_MAX_CONCURRENCY = 20
+
+# Errores que se tratan igual que requests.RequestException en el cliente síncrono
+# (ValueError: cuerpo que no es JSON válido)
+FETCH_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError, OfflineCacheMiss, ValueError)
+
+
+class AsyncBanRepAPI:
+    """Cliente asyncio para las APIs del Banco de la República."""
+    
+    def __init__(self, base_url=BANREP_BASE_URL, timeout=DEFAULT_TIMEOUT,
+                 pool_size=DEFAULT_POOL_SIZE, max_concurrency=DEFAULT_MAX_CONCURRENCY,
+                 max_retries=DEFAULT_MAX_RETRIES, backoff_factor=DEFAULT_BACKOFF_FACTOR,
+                 cache=None, offline=False):
+        """
+        Inicializa el cliente asyncio de la API del Banco de la República.
+        
+        Args:
+            base_url (str): URL base de la API
+            timeout (tuple): Timeouts (conexión, lectura) en segundos
+            pool_size (int): Conexiones keep-alive por host
+            max_concurrency (int): Solicitudes simultáneas máximas
+            max_retries (int): Reintentos máximos por solicitud
+            backoff_factor (float): Factor base del backoff exponencial
+            cache (BanRepCache): Caché persistente de series (opcional)
+            offline (bool): Si True, solo se sirven datos desde la caché
+        """
+        self.base_url = base_url
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.cache = cache
+        self.offline = offline
+        self._session = None
+        self._semaphore = None
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+    
+    def _get_session(self):
+        """
+        Obtiene la sesión aiohttp compartida, creándola en el loop actual si no existe.
+        
+        Returns:
+            aiohttp.ClientSession: Sesión con pool de conexiones
+        """
+        if self._session is None or self._session.closed:
+            connect_timeout, read_timeout = self.timeout
+            connector = aiohttp.TCPConnector(limit=self.pool_size, limit_per_host=self.pool_size)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+    
+    async def _get(self, url, params=None, etag=None, last_modified=None):
+        """
+        Ejecuta una solicitud GET (condicional si hay validadores) con reintentos
+        y decodifica el JSON de la respuesta.
+        
+        Args:
+            url (str): URL a consultar
+            params (dict): Parámetros de la consulta (opcional)
+            etag (str): ETag de la copia en caché (opcional)
+            last_modified (str): Last-Modified de la copia en caché (opcional)
+        
+        Returns:
+            tuple: (respuesta decodificada o None si el servidor respondió 304,
+                etag, last_modified)
+        """
+        session = self._get_session()
+        if params:
+            params = {key: str(value) for key, value in params.items()}
+        headers = conditional_headers(etag, last_modified)
+        
+        attempt = 0
+        while True:
+            try:
+                async with self._semaphore:
+                    async with session.get(url, params=params, headers=headers) as response:
+                        if response.status in RETRY_STATUS_CODES and attempt < self.max_retries:
+                            raise aiohttp.ClientResponseError(
+                                response.request_info, response.history, status=response.status
+                            )
+                        response.raise_for_status()
+                        body = await response.read()
+                        record_response(response.status, body)
+                        if response.status == 304:
+                            return None, etag, last_modified
+                        try:
+                            data = parse_json(body)
+                        except ValueError as e:
+                            raise aiohttp.ClientPayloadError(f"Respuesta JSON inválida: {e}") from e
+                        return (
+                            data,
+                            response.headers.get("ETag"),
+                            response.headers.get("Last-Modified")
+                        )
+            except (aiohttp.ClientConnectionError, aiohttp.ClientResponseError, asyncio.TimeoutError) as e:
+                retryable = not isinstance(e, aiohttp.ClientResponseError) or e.status in RETRY_STATUS_CODES
+                if not retryable or attempt >= self.max_retries:
+                    raise
+                await asyncio.sleep(self.backoff_factor * (2 ** attempt))
+                attempt += 1
+    
+    async def _get_series(self, series, path="", params=None):
+        """
+        Obtiene una serie pasando primero por la caché persistente (read-through);
+        las entradas vencidas se revalidan con una solicitud condicional.
+        
+        Args:
+            series (str): ID de la serie (TRM, IPC, TI, ...)
+            path (str): Ruta relativa dentro de la serie (ej: "/latest")
+            params (dict): Parámetros de la consulta (opcional)
+        
+        Returns:
+            dict: Respuesta decodificada
+        """
+        loop = asyncio.get_running_loop()
+        range_key = make_range_key(path, params)
+        
+        if self.cache is not None:
+            cached = await loop.run_in_executor(None, self.cache.get, series, range_key, self.offline)
+            if cached is not None:
+                return cached
+        
+        if self.offline:
+            raise OfflineCacheMiss(f"Serie {series}{range_key} no disponible en caché (modo offline)")
+        
+        url = f"{self.base_url}/series/{series}{path}"
+        etag, last_modified = None, None
+        if self.cache is not None:
+            etag, last_modified = await loop.run_in_executor(None, self.cache.get_validators, series, range_key)
+        try:
+            data, etag, last_modified = await self._get(url, params, etag, last_modified)
+            if data is None:
+                data = await loop.run_in_executor(None, self.cache.revalidate, series, range_key)
+                if data is not None:
+                    return data
+                # La entrada desapareció entre la consulta y el 304: descargar completa
+                data, etag, last_modified = await self._get(url, params)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            # Si la API falla, preferir una entrada vencida antes que datos simulados
+            if self.cache is not None:
+                cached = await loop.run_in_executor(None, self.cache.get, series, range_key, True)
+                if cached is not None:
+                    return cached
+            raise
+        
+        if self.cache is not None:
+            await loop.run_in_executor(None, self.cache.put, series, range_key, data, etag, last_modified)
+        return data
+    
+    async def get_trm(self, date=None):
+        """
+        Obtiene el TRM (Tasa de Cambio Representativa del Mercado).
+        
+        Args:
+            date (str): Fecha específica en formato YYYY-MM-DD (opcional)
+        
+        Returns:
+            dict: Datos del TRM
+        """
+        try:
+            path = f"/date/{date}" if date else "/latest"
+            return await self._get_series("TRM", path)
+        except FETCH_ERRORS as e:
+            print(f"Error al obtener TRM: {e}")
+            return None
+    
+    async def get_trm_history(self, start_date=None, end_date=None, days=45):
+        """
+        Obtiene el historial de TRM.
+        
+        Args:
+            start_date (str): Fecha de inicio en formato YYYY-MM-DD
+            end_date (str): Fecha de fin en formato YYYY-MM-DD
+            days (int): Número de días hacia atrás si no se especifican fechas
+        
+        Returns:
+            dict: Historial de TRM
+        """
+        try:
+            params = {}
+            if start_date:
+                params['start_date'] = start_date
+            if end_date:
+                params['end_date'] = end_date
+            if not start_date and not end_date:
+                params['days'] = days
+            
+            return await self._get_series("TRM", "/history", params)
+        except FETCH_ERRORS as e:
+            print(f"Error al obtener historial de TRM: {e}")
+            return None
+    
+    async def get_inflation(self, year=None, month=None):
+        """
+        Obtiene datos de inflación (IPC - Índice de Precios al Consumidor).
+        
+        Args:
+            year (int): Año específico (opcional)
+            month (int): Mes específico (opcional)
+        
+        Returns:
+            dict: Datos de inflación
+        """
+        try:
+            if year and month:
+                path = f"/{year}/{month}"
+            elif year:
+                path = f"/{year}"
+            else:
+                path = "/latest"
+            
+            return await self._get_series("IPC", path)
+        except FETCH_ERRORS as e:
+            print(f"Error al obtener inflación: {e}")
+            return None
+    
+    async def get_interest_rate(self, date=None):
+        """
+        Obtiene la Tasa de Intervención del Banco de la República.
+        
+        Args:
+            date (str): Fecha específica en formato YYYY-MM-DD (opcional)
+        
+        Returns:
+            dict: Datos de la tasa de interés
+        """
+        try:
+            path = f"/date/{date}" if date else "/latest"
+            return await self._get_series("TI", path)
+        except FETCH_ERRORS as e:
+            print(f"Error al obtener tasa de interés: {e}")
+            return None
+    
+    async def get_indicator(self, indicator_id, start_date=None, end_date=None):
+        """
+        Obtiene un indicador económico específico.
+        
+        Args:
+            indicator_id (str): ID del indicador
+            start_date (str): Fecha de inicio en formato YYYY-MM-DD (opcional)
+            end_date (str): Fecha de fin en formato YYYY-MM-DD (opcional)
+        
+        Returns:
+            dict: Datos del indicador
+        """
+        try:
+            params = {}
+            if start_date:
+                params['start_date'] = start_date
+            if end_date:
+                params['end_date'] = end_date
+            
+            return await self._get_series(indicator_id, "", params)
+        except FETCH_ERRORS as e:
+            print(f"Error al obtener indicador {indicator_id}: {e}")
+            return None
+    
+    async def close(self):
+        """Cierra la sesión y las conexiones abiertas del pool."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+# Funciones de conveniencia
+async def fetch_trm_on_dates(dates, api=None):
+    """
+    Obtiene el TRM de varias fechas de forma concurrente.
+    
+    Args:
+        dates (list): Fechas en formato YYYY-MM-DD
+        api (AsyncBanRepAPI): Cliente a reutilizar (opcional)
+    
+    Returns:
+        dict: Datos del TRM por fecha (None si la fecha no pudo obtenerse)
+    """
+    owns_api = api is None
+    api = api or AsyncBanRepAPI()
+    try:
+        results = await asyncio.gather(*(api.get_trm(date) for date in dates))
+        return dict(zip(dates, results))
+    finally:
+        if owns_api:
+            await api.close()
@@ -0,0 +1,240 @@
+# banrep_cache.py
+"""
+Persistent cache module for Banco de la República series
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+DEFAULT_CACHE_PATH = "rag_memory/banrep_cache.db"
+
+# Tiempo de vida (segundos) por serie según su frecuencia de publicación
+SERIES_TTL = {
+    "TRM": 24 * 3600,        # Se publica una vez al día
+    "IPC": 30 * 24 * 3600,   # Se publica una vez al mes
+    "TI": 24 * 3600          # Cambia en las juntas del Banco, se revisa a diario
+}
+DEFAULT_TTL = 24 * 3600
+
+
+def make_range_key(path, params=None):
+    """
+    Construye la clave de caché de una consulta a partir de su ruta y parámetros.
+    
+    Args:
+        path (str): Ruta relativa dentro de la serie (ej: "/history")
+        params (dict): Parámetros de la consulta (opcional)
+    
+    Returns:
+        str: Clave canónica del rango consultado
+    """
+    if not params:
+        return path
+    return path + "?" + "&".join(f"{key}={params[key]}" for key in sorted(params))
+
+
+class BanRepCache:
+    """Caché persistente en SQLite para respuestas de series del Banco de la República."""
+    
+    def __init__(self, db_path=DEFAULT_CACHE_PATH, ttl=None):
+        """
+        Inicializa la caché.
+        
+        Args:
+            db_path (str): Ruta del archivo SQLite de la caché
+            ttl (dict): TTL en segundos por serie, sobrescribe SERIES_TTL (opcional)
+        """
+        self.db_path = db_path
+        self.ttl = dict(SERIES_TTL)
+        if ttl:
+            self.ttl.update(ttl)
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.revalidated = 0
+        self._lock = threading.Lock()
+        
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._init_db()
+    
+    def _init_db(self):
+        """Crea la tabla de la caché si no existe y agrega las columnas de validadores HTTP."""
+        with self._lock:
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS series_cache (
+                    series TEXT,
+                    range_key TEXT,
+                    payload TEXT,
+                    fetched_at REAL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    PRIMARY KEY (series, range_key)
+                )
+            ''')
+            
+            # Cachés creadas antes de soportar solicitudes condicionales
+            columns = {row[1] for row in self._conn.execute('PRAGMA table_info(series_cache)')}
+            for column in ("etag", "last_modified"):
+                if column not in columns:
+                    self._conn.execute(f'ALTER TABLE series_cache ADD COLUMN {column} TEXT')
+            self._conn.commit()
+    
+    def get_ttl(self, series):
+        """
+        Obtiene el TTL configurado para una serie.
+        
+        Args:
+            series (str): ID de la serie (TRM, IPC, TI, ...)
+        
+        Returns:
+            float: TTL en segundos
+        """
+        return self.ttl.get(series, DEFAULT_TTL)
+    
+    def get(self, series, range_key, allow_stale=False):
+        """
+        Busca una respuesta en la caché.
+        
+        Args:
+            series (str): ID de la serie
+            range_key (str): Clave del rango consultado (ruta y parámetros)
+            allow_stale (bool): Si True, devuelve entradas vencidas
+        
+        Returns:
+            dict: Respuesta almacenada, o None si no hay entrada válida
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT payload, fetched_at FROM series_cache WHERE series = ? AND range_key = ?',
+                (series, range_key)
+            ).fetchone()
+            
+            if row is None:
+                self.misses += 1
+                return None
+            
+            payload, fetched_at = row
+            if time.time() - fetched_at <= self.get_ttl(series):
+                self.hits += 1
+            elif allow_stale:
+                self.stale_hits += 1
+            else:
+                self.misses += 1
+                return None
+        
+        return json.loads(payload)
+    
+    def get_validators(self, series, range_key):
+        """
+        Obtiene los validadores HTTP guardados con una respuesta, aunque esté vencida.
+        
+        Args:
+            series (str): ID de la serie
+            range_key (str): Clave del rango consultado
+        
+        Returns:
+            tuple: (etag, last_modified), con None donde no hay validador
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT etag, last_modified FROM series_cache WHERE series = ? AND range_key = ?',
+                (series, range_key)
+            ).fetchone()
+        return row if row is not None else (None, None)
+    
+    def revalidate(self, series, range_key):
+        """
+        Renueva una entrada que el servidor confirmó sin cambios (HTTP 304).
+        
+        Args:
+            series (str): ID de la serie
+            range_key (str): Clave del rango consultado
+        
+        Returns:
+            dict: Respuesta almacenada, o None si la entrada ya no existe
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT payload FROM series_cache WHERE series = ? AND range_key = ?',
+                (series, range_key)
+            ).fetchone()
+            if row is None:
+                return None
+            
+            self._conn.execute(
+                'UPDATE series_cache SET fetched_at = ? WHERE series = ? AND range_key = ?',
+                (time.time(), series, range_key)
+            )
+            self._conn.commit()
+            self.revalidated += 1
+        
+        return json.loads(row[0])
+    
+    def put(self, series, range_key, payload, etag=None, last_modified=None):
+        """
+        Almacena una respuesta en la caché.
+        
+        Args:
+            series (str): ID de la serie
+            range_key (str): Clave del rango consultado
+            payload (dict): Respuesta a almacenar
+            etag (str): ETag de la respuesta (opcional)
+            last_modified (str): Last-Modified de la respuesta (opcional)
+        """
+        with self._lock:
+            self._conn.execute('''
+                INSERT OR REPLACE INTO series_cache (series, range_key, payload, fetched_at, etag, last_modified)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (series, range_key, json.dumps(payload), time.time(), etag, last_modified))
+            self._conn.commit()
+    
+    def clear(self, series=None):
+        """
+        Elimina entradas de la caché.
+        
+        Args:
+            series (str): Serie a eliminar; si es None se vacía toda la caché
+        """
+        with self._lock:
+            if series:
+                self._conn.execute('DELETE FROM series_cache WHERE series = ?', (series,))
+            else:
+                self._conn.execute('DELETE FROM series_cache')
+            self._conn.commit()
+    
+    def stats(self):
+        """
+        Obtiene los contadores de aciertos y fallos de la caché.
+        
+        Returns:
+            dict: hits, stale_hits, misses, revalidated (respuestas 304) y hit_ratio
+        """
+        with self._lock:
+            # Una entrada revalidada se contó primero como fallo; el 304 la convierte en acierto
+            total = self.hits + self.stale_hits + self.misses
+            return {
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "revalidated": self.revalidated,
+                "hit_ratio": (self.hits + self.stale_hits + self.revalidated) / total if total else 0.0
+            }
+    
+    def reset_stats(self):
+        """Reinicia los contadores de la caché."""
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.stale_hits = 0
+            self.revalidated = 0
+    
+    def close(self):
+        """Cierra la conexión a la base de datos de la caché."""
+        with self._lock:
+            self._conn.close()
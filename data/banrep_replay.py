@@ -0,0 +1,267 @@
+# banrep_replay.py
+"""
+Record/replay fixtures and local stand-in server for Banco de la República APIs
+"""
+import gzip
+import hashlib
+import json
+import random
+import threading
+import time
+from datetime import datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+
+def _interaction_key(path, query=""):
+    """
+    Construye la clave canónica de una interacción (ruta + query ordenada).
+    
+    Args:
+        path (str): Ruta relativa a la URL base (ej: "/series/TRM/latest")
+        query (str): Query string de la solicitud
+    
+    Returns:
+        str: Clave canónica
+    """
+    params = sorted(parse_qsl(query, keep_blank_values=True))
+    return f"{path}?{urlencode(params)}" if params else path
+
+
+def save_fixture(fixture_path, interactions, base_url=None):
+    """
+    Guarda interacciones grabadas en un archivo de fixtures comprimido (gzip + JSON).
+    
+    Args:
+        fixture_path (str): Ruta del archivo (ej: "fixtures/banrep.json.gz")
+        interactions (dict): Interacciones por clave canónica
+        base_url (str): URL base contra la que se grabó (opcional)
+    """
+    fixture = {
+        "base_url": base_url,
+        "recorded_at": datetime.now().isoformat(),
+        "interactions": interactions
+    }
+    with gzip.open(fixture_path, "wt", encoding="utf-8") as f:
+        json.dump(fixture, f)
+
+
+def load_fixture(fixture_path):
+    """
+    Carga un archivo de fixtures comprimido.
+    
+    Args:
+        fixture_path (str): Ruta del archivo de fixtures
+    
+    Returns:
+        dict: Interacciones por clave canónica
+    """
+    with gzip.open(fixture_path, "rt", encoding="utf-8") as f:
+        return json.load(f)["interactions"]
+
+
+class _RecordingSession:
+    """Envoltura de requests.Session que graba cada respuesta obtenida."""
+    
+    def __init__(self, session, recorder):
+        self._session = session
+        self._recorder = recorder
+    
+    def get(self, url, **kwargs):
+        response = self._session.get(url, **kwargs)
+        self._recorder._record(response)
+        return response
+    
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+
+class BanRepRecorder:
+    """Graba las respuestas de un cliente BanRepAPI para reproducirlas sin conexión."""
+    
+    def __init__(self, api):
+        """
+        Inicializa el grabador e intercepta la sesión HTTP del cliente.
+        
+        Args:
+            api (BanRepAPI): Cliente cuyas respuestas se graban
+        """
+        self.api = api
+        self.interactions = {}
+        self._base_path = urlsplit(api.base_url).path.rstrip("/")
+        self._original_session = api.session
+        self._lock = threading.Lock()
+        api.session = _RecordingSession(api.session, self)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+    
+    def _record(self, response):
+        """
+        Registra una respuesta HTTP.
+        
+        Args:
+            response (requests.Response): Respuesta a grabar
+        """
+        parts = urlsplit(response.url)
+        path = parts.path
+        if path.startswith(self._base_path):
+            path = path[len(self._base_path):]
+        
+        with self._lock:
+            self.interactions[_interaction_key(path, parts.query)] = {
+                "status": response.status_code,
+                "content_type": response.headers.get("Content-Type", "application/json"),
+                "body": response.text
+            }
+    
+    def save(self, fixture_path):
+        """
+        Guarda las interacciones grabadas en un archivo de fixtures.
+        
+        Args:
+            fixture_path (str): Ruta del archivo de fixtures
+        """
+        with self._lock:
+            save_fixture(fixture_path, dict(self.interactions), self.api.base_url)
+    
+    def stop(self):
+        """Deja de grabar y restaura la sesión original del cliente."""
+        self.api.session = self._original_session
+
+
+class BanRepStandInServer:
+    """Servidor HTTP local que reproduce fixtures grabados de la API del Banco de la República."""
+    
+    def __init__(self, fixture_path=None, interactions=None, latency=0.0, jitter=0.0,
+                 error_rate=0.0, seed=None, match_query=True, conditional=True,
+                 host="127.0.0.1", port=0):
+        """
+        Inicializa el servidor de reemplazo.
+        
+        Args:
+            fixture_path (str): Archivo de fixtures a reproducir (opcional)
+            interactions (dict): Interacciones ya cargadas (opcional)
+            latency (float): Latencia media inyectada por respuesta, en segundos
+            jitter (float): Desviación estándar de la latencia inyectada, en segundos
+            error_rate (float): Proporción de respuestas que fallan con HTTP 503
+            seed (int): Semilla para que latencias y errores sean deterministas
+            match_query (bool): Si False, una ruta sin coincidencia exacta de parámetros
+                se responde con la primera grabación de la misma ruta
+            conditional (bool): Si True, las respuestas llevan ETag y una solicitud
+                con If-None-Match vigente se responde 304 sin cuerpo
+            host (str): Dirección donde escuchar
+            port (int): Puerto donde escuchar (0 para uno libre)
+        """
+        self.interactions = dict(interactions or {})
+        if fixture_path:
+            self.interactions.update(load_fixture(fixture_path))
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.match_query = match_query
+        self.conditional = conditional
+        self.requests_served = 0
+        self.errors_injected = 0
+        self.not_modified_served = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._by_path = {}
+        for key, interaction in self.interactions.items():
+            self._by_path.setdefault(key.split("?", 1)[0], interaction)
+        
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+    
+    @property
+    def url(self):
+        """URL base a usar como base_url de BanRepAPI."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+    
+    def _next_response(self, raw_path):
+        """
+        Decide la respuesta (y la latencia) para una solicitud.
+        
+        Args:
+            raw_path (str): Ruta con query string recibida
+        
+        Returns:
+            tuple: (latencia, estado, content_type, cuerpo)
+        """
+        parts = urlsplit(raw_path)
+        interaction = self.interactions.get(_interaction_key(parts.path, parts.query))
+        if interaction is None and not self.match_query:
+            interaction = self._by_path.get(parts.path)
+        
+        with self._lock:
+            self.requests_served += 1
+            delay = max(0.0, self._random.gauss(self.latency, self.jitter)) if self.jitter else self.latency
+            if self._random.random() < self.error_rate:
+                self.errors_injected += 1
+                return delay, 503, "application/json", '{"error": "injected"}'
+        
+        if interaction is None:
+            return delay, 404, "application/json", '{"error": "not recorded"}'
+        return delay, interaction["status"], interaction["content_type"], interaction["body"]
+    
+    def _make_handler(self):
+        stand_in = self
+        
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Escribir encabezados y cuerpo en un solo paquete (evita esperas de Nagle)
+            wbufsize = -1
+            
+            def do_GET(self):
+                delay, status, content_type, body = stand_in._next_response(self.path)
+                if delay:
+                    time.sleep(delay)
+                payload = body.encode("utf-8")
+                
+                etag = None
+                if stand_in.conditional and status == 200:
+                    etag = '"' + hashlib.sha1(payload).hexdigest()[:16] + '"'
+                    if self.headers.get("If-None-Match") == etag:
+                        with stand_in._lock:
+                            stand_in.not_modified_served += 1
+                        status, payload = 304, b""
+                
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(payload)))
+                if etag:
+                    self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(payload)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        return _Handler
+    
+    def start(self):
+        """
+        Inicia el servidor en un hilo en segundo plano.
+        
+        Returns:
+            BanRepStandInServer: El propio servidor
+        """
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        """Detiene el servidor y libera el puerto."""
+        self._server.shutdown()
+        self._server.server_close()
@@ -2,10 +2,11 @@
 """
 CDT scraper module for Global Yield Optimizer v3.0
 """
-import random
 import requests
 from datetime import datetime
 from typing import Dict, List
+from .market_generator import get_market_generator, CDT_RATE_RANGES, DEFAULT_CDT_RATE_RANGE
+from .rate_sources import RateSource, get_rate_registry
 
 
 class CDTScraper:
@@ -87,25 +88,48 @@ class CDTScraper:
         
         return panama_cdt_rates
     
-    def get_cdt_rates(self, country: str) -> Dict[str, float]:
+    def get_cdt_rates(self, country: str, strict: bool = False) -> Dict[str, float]:
         """
         Obtiene tasas de CDTs para un país específico.
         
+        Las fuentes registradas para el país se consultan en paralelo y sus
+        resultados se combinan; las que tienen el circuito abierto se omiten.
+        
         Args:
             country (str): Nombre del país
+            strict (bool): Si True, lanza ValueError en lugar de devolver tasas simuladas
             
         Returns:
             Dict[str, float]: Diccionario con bancos y sus tasas de CDT
         """
-        if country.lower() == "colombia":
-            return self.get_colombia_cdt_rates()
-        elif country.lower() == "usa" or country.lower() == "estados unidos":
-            return self.get_usa_cdt_rates()
-        elif country.lower() == "panama":
-            return self.get_panama_cdt_rates()
-        else:
-            # Devolver datos simulados para otros países
-            return self._generate_simulated_cdt_rates(country)
+        rates = get_rate_registry().fetch("cdt", country)
+        if rates:
+            return rates
+        if strict:
+            raise ValueError(f"ninguna fuente de CDTs respondió para {country}")
+        
+        # Devolver datos simulados para países sin fuentes o si ninguna fuente respondió
+        return self._generate_simulated_cdt_rates(country)
+    
+    def get_all_cdt_rates(self, countries: List[str], strict: bool = False) -> Dict[str, Dict[str, float]]:
+        """
+        Obtiene tasas de CDTs de varios países consultando todas sus fuentes en paralelo.
+        
+        Args:
+            countries (List[str]): Nombres de los países
+            strict (bool): Si True, los países sin respuesta quedan en None en lugar
+                de completarse con tasas simuladas
+        
+        Returns:
+            Dict[str, Dict[str, float]]: Tasas por país
+        """
+        results = get_rate_registry().fetch_many(("cdt", country) for country in countries)
+        if strict:
+            return {country: results[("cdt", country)] or None for country in countries}
+        return {
+            country: results[("cdt", country)] or self._generate_simulated_cdt_rates(country)
+            for country in countries
+        }
     
     def _generate_simulated_cdt_rates(self, country: str) -> Dict[str, float]:
         """
@@ -117,41 +141,59 @@ class CDTScraper:
         Returns:
             Dict[str, float]: Diccionario con bancos simulados y sus tasas
         """
-        # Definir rangos típicos por país
-        country_ranges = {
-            "colombia": (8.0, 12.0),
-            "usa": (1.0, 4.0),
-            "panama": (2.0, 5.0),
-            "chile": (4.0, 8.0),
-            "mexico": (6.0, 10.0)
-        }
+        # Obtener rango típico para el país o usar valores por defecto
+        min_rate, max_rate = CDT_RATE_RANGES.get(country.lower(), DEFAULT_CDT_RATE_RANGE)
         
-        # Obtener rango para el país o usar valores por defecto
-        min_rate, max_rate = country_ranges.get(country.lower(), (2.0, 8.0))
-        
-        # Generar datos simulados
+        # Generar todas las tasas simuladas en una sola llamada
         banks = [f"Banco {i+1}" for i in range(8)]
-        rates = {}
+        rates = get_market_generator(f"cdt.simulated.{country.lower()}").uniform(min_rate, max_rate, size=len(banks))
         
-        for bank in banks:
-            rates[bank] = round(random.uniform(min_rate, max_rate), 2)
-            
-        return rates
+        return dict(zip(banks, rates.tolist()))
 
 
 # Funciones de conveniencia
-def get_cdt_rates(country: str) -> Dict[str, float]:
+def get_cdt_rates(country: str, strict: bool = False) -> Dict[str, float]:
     """
     Obtiene tasas de CDTs para un país.
     
     Args:
         country (str): Nombre del país
+        strict (bool): Si True, lanza ValueError en lugar de devolver tasas simuladas
         
     Returns:
         Dict[str, float]: Diccionario con bancos y sus tasas de CDT
     """
     scraper = CDTScraper()
-    return scraper.get_cdt_rates(country)
+    return scraper.get_cdt_rates(country, strict=strict)
+
+
+def get_all_cdt_rates(countries: List[str], strict: bool = False) -> Dict[str, Dict[str, float]]:
+    """
+    Obtiene tasas de CDTs de varios países en paralelo.
+    
+    Args:
+        countries (List[str]): Nombres de los países
+        strict (bool): Si True, los países sin respuesta quedan en None
+    
+    Returns:
+        Dict[str, Dict[str, float]]: Tasas por país
+    """
+    scraper = CDTScraper()
+    return scraper.get_all_cdt_rates(countries, strict=strict)
+
+
+def get_simulated_cdt_rates(country: str) -> Dict[str, float]:
+    """
+    Obtiene tasas de CDTs simuladas para un país (datos de respaldo).
+    
+    Args:
+        country (str): Nombre del país
+    
+    Returns:
+        Dict[str, float]: Diccionario con bancos simulados y sus tasas
+    """
+    scraper = CDTScraper()
+    return scraper._generate_simulated_cdt_rates(country)
 
 
 def get_best_cdt_rate(country: str) -> tuple:
@@ -169,4 +211,25 @@ def get_best_cdt_rate(country: str) -> tuple:
         return None, 0.0
     
     best_bank = max(rates, key=rates.get)
-    return best_bank, rates[best_bank]
\ No newline at end of file
+    return best_bank, rates[best_bank]
+
+
+def register_cdt_sources(registry=None):
+    """
+    Registra una fuente de tasas de CDTs por país en el registro de fuentes.
+    
+    Args:
+        registry (RateSourceRegistry): Registro a usar (por defecto, el compartido)
+    """
+    registry = registry or get_rate_registry()
+    scraper = CDTScraper()
+    sources = {
+        "Colombia": scraper.get_colombia_cdt_rates,
+        "USA": scraper.get_usa_cdt_rates,
+        "Panama": scraper.get_panama_cdt_rates
+    }
+    for country, fetch in sources.items():
+        registry.register(RateSource(f"cdt.{country.lower()}", "cdt", country, fetch))
+
+
+register_cdt_sources()
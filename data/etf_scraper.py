@@ -2,10 +2,18 @@
 """
 ETF scraper module for Global Yield Optimizer v3.0
 """
-import random
 import requests
+import numpy as np
 from datetime import datetime
 from typing import Dict, List
+from .market_generator import (
+    get_market_generator,
+    ETF_EQUITY_RANGES,
+    ETF_FIXED_INCOME_RANGES,
+    DEFAULT_ETF_EQUITY_RANGE,
+    DEFAULT_ETF_FIXED_INCOME_RANGE
+)
+from .rate_sources import RateSource, get_rate_registry
 
 
 class ETFScraper:
@@ -44,15 +52,12 @@ class ETFScraper:
         # Por ahora, devolvemos datos simulados basados en rendimientos típicos
         
         colombia_etf_rates = {}
-        for etf in self.etfs["Colombia"]:
+        etfs = self.etfs["Colombia"]
+        # Generar rendimientos simulados (pueden ser positivos o negativos) en un solo sorteo
+        # Para renta fija, rendimiento más estable
+        rates = self._draw_etf_rates("Colombia", [etf["type"] == "Renta Fija" for etf in etfs], "etf.colombia")
+        for etf, rate in zip(etfs, rates):
             symbol = etf["symbol"]
-            # Generar rendimiento simulado (puede ser positivo o negativo)
-            # Para renta fija, rendimiento más estable
-            if etf["type"] == "Renta Fija":
-                rate = round(random.uniform(5.0, 9.0), 2)
-            else:
-                rate = round(random.uniform(-5.0, 15.0), 2)
-            
             colombia_etf_rates[symbol] = {
                 "name": etf["name"],
                 "type": etf["type"],
@@ -73,15 +78,12 @@ class ETFScraper:
         # Por ahora, devolvemos datos simulados basados en rendimientos típicos
         
         usa_etf_rates = {}
-        for etf in self.etfs["USA"]:
+        etfs = self.etfs["USA"]
+        # Generar rendimientos simulados (pueden ser positivos o negativos) en un solo sorteo
+        # Para renta fija, rendimiento más estable
+        rates = self._draw_etf_rates("USA", [etf["type"] == "Renta Fija" for etf in etfs], "etf.usa")
+        for etf, rate in zip(etfs, rates):
             symbol = etf["symbol"]
-            # Generar rendimiento simulado (puede ser positivo o negativo)
-            # Para renta fija, rendimiento más estable
-            if etf["type"] == "Renta Fija":
-                rate = round(random.uniform(2.0, 5.0), 2)
-            else:
-                rate = round(random.uniform(-10.0, 20.0), 2)
-            
             usa_etf_rates[symbol] = {
                 "name": etf["name"],
                 "type": etf["type"],
@@ -102,15 +104,12 @@ class ETFScraper:
         # Por ahora, devolvemos datos simulados basados en rendimientos típicos
         
         panama_etf_rates = {}
-        for etf in self.etfs["Panama"]:
+        etfs = self.etfs["Panama"]
+        # Generar rendimientos simulados (pueden ser positivos o negativos) en un solo sorteo
+        # Para renta fija, rendimiento más estable
+        rates = self._draw_etf_rates("Panama", [etf["type"] == "Renta Fija" for etf in etfs], "etf.panama")
+        for etf, rate in zip(etfs, rates):
             symbol = etf["symbol"]
-            # Generar rendimiento simulado (puede ser positivo o negativo)
-            # Para renta fija, rendimiento más estable
-            if etf["type"] == "Renta Fija":
-                rate = round(random.uniform(3.0, 6.0), 2)
-            else:
-                rate = round(random.uniform(-3.0, 12.0), 2)
-            
             panama_etf_rates[symbol] = {
                 "name": etf["name"],
                 "type": etf["type"],
@@ -120,25 +119,48 @@ class ETFScraper:
         
         return panama_etf_rates
     
-    def get_etf_rates(self, country: str) -> Dict[str, Dict]:
+    def get_etf_rates(self, country: str, strict: bool = False) -> Dict[str, Dict]:
         """
         Obtiene tasas de rendimiento de ETFs para un país específico.
         
+        Las fuentes registradas para el país se consultan en paralelo y sus
+        resultados se combinan; las que tienen el circuito abierto se omiten.
+        
         Args:
             country (str): Nombre del país
+            strict (bool): Si True, lanza ValueError en lugar de devolver tasas simuladas
             
         Returns:
             Dict[str, Dict]: Diccionario con ETFs y sus tasas de rendimiento
         """
-        if country.lower() == "colombia":
-            return self.get_colombia_etf_rates()
-        elif country.lower() == "usa" or country.lower() == "estados unidos":
-            return self.get_usa_etf_rates()
-        elif country.lower() == "panama":
-            return self.get_panama_etf_rates()
-        else:
-            # Devolver datos simulados para otros países
-            return self._generate_simulated_etf_rates(country)
+        rates = get_rate_registry().fetch("etf", country)
+        if rates:
+            return rates
+        if strict:
+            raise ValueError(f"ninguna fuente de ETFs respondió para {country}")
+        
+        # Devolver datos simulados para países sin fuentes o si ninguna fuente respondió
+        return self._generate_simulated_etf_rates(country)
+    
+    def get_all_etf_rates(self, countries: List[str], strict: bool = False) -> Dict[str, Dict[str, Dict]]:
+        """
+        Obtiene tasas de ETFs de varios países consultando todas sus fuentes en paralelo.
+        
+        Args:
+            countries (List[str]): Nombres de los países
+            strict (bool): Si True, los países sin respuesta quedan en None en lugar
+                de completarse con tasas simuladas
+        
+        Returns:
+            Dict[str, Dict[str, Dict]]: Tasas por país
+        """
+        results = get_rate_registry().fetch_many(("etf", country) for country in countries)
+        if strict:
+            return {country: results[("etf", country)] or None for country in countries}
+        return {
+            country: results[("etf", country)] or self._generate_simulated_etf_rates(country)
+            for country in countries
+        }
     
     def _generate_simulated_etf_rates(self, country: str) -> Dict[str, Dict]:
         """
@@ -150,37 +172,13 @@ class ETFScraper:
         Returns:
             Dict[str, Dict]: Diccionario con ETFs simulados y sus tasas
         """
-        # Definir rangos típicos por país
-        equity_ranges = {
-            "colombia": (-5.0, 15.0),
-            "usa": (-10.0, 20.0),
-            "panama": (-3.0, 12.0),
-            "chile": (-8.0, 18.0),
-            "mexico": (-6.0, 16.0)
-        }
-        
-        fixed_income_ranges = {
-            "colombia": (5.0, 9.0),
-            "usa": (2.0, 5.0),
-            "panama": (3.0, 6.0),
-            "chile": (4.0, 8.0),
-            "mexico": (6.0, 10.0)
-        }
-        
-        # Obtener rangos para el país o usar valores por defecto
-        equity_min, equity_max = equity_ranges.get(country.lower(), (-5.0, 15.0))
-        fixed_min, fixed_max = fixed_income_ranges.get(country.lower(), (2.0, 8.0))
-        
-        # Generar datos simulados
+        # Generar datos simulados, todos los rendimientos en un solo sorteo
         etfs = {}
-        for i in range(5):
+        fixed_income = [i % 2 == 0 for i in range(5)]
+        rates = self._draw_etf_rates(country, fixed_income, f"etf.simulated.{country.lower()}")
+        for i, rate in enumerate(rates):
             symbol = f"ETF{i+1}"
-            etf_type = "Renta Fija" if i % 2 == 0 else "Renta Variable"
-            
-            if etf_type == "Renta Fija":
-                rate = round(random.uniform(fixed_min, fixed_max), 2)
-            else:
-                rate = round(random.uniform(equity_min, equity_max), 2)
+            etf_type = "Renta Fija" if fixed_income[i] else "Renta Variable"
             
             etfs[symbol] = {
                 "name": f"{symbol} {country} {etf_type}",
@@ -190,21 +188,72 @@ class ETFScraper:
             }
             
         return etfs
+    
+    def _draw_etf_rates(self, country: str, fixed_income: List[bool], stream: str) -> List[float]:
+        """
+        Genera en un solo sorteo vectorizado los rendimientos de un panel de ETFs.
+        
+        Args:
+            country (str): Nombre del país (define los rangos de rendimiento)
+            fixed_income (List[bool]): Si cada ETF es de renta fija
+            stream (str): Flujo del generador de mercado a usar
+        
+        Returns:
+            List[float]: Rendimientos en el mismo orden que fixed_income
+        """
+        # Obtener rangos típicos para el país o usar valores por defecto
+        equity_min, equity_max = ETF_EQUITY_RANGES.get(country.lower(), DEFAULT_ETF_EQUITY_RANGE)
+        fixed_min, fixed_max = ETF_FIXED_INCOME_RANGES.get(country.lower(), DEFAULT_ETF_FIXED_INCOME_RANGE)
+        
+        fixed_income = np.asarray(fixed_income)
+        low = np.where(fixed_income, fixed_min, equity_min)
+        high = np.where(fixed_income, fixed_max, equity_max)
+        return get_market_generator(stream).uniform(low, high, size=len(fixed_income)).tolist()
 
 
 # Funciones de conveniencia
-def get_etf_rates(country: str) -> Dict[str, Dict]:
+def get_etf_rates(country: str, strict: bool = False) -> Dict[str, Dict]:
     """
     Obtiene tasas de rendimiento de ETFs para un país.
     
     Args:
         country (str): Nombre del país
+        strict (bool): Si True, lanza ValueError en lugar de devolver tasas simuladas
         
     Returns:
         Dict[str, Dict]: Diccionario con ETFs y sus tasas de rendimiento
     """
     scraper = ETFScraper()
-    return scraper.get_etf_rates(country)
+    return scraper.get_etf_rates(country, strict=strict)
+
+
+def get_all_etf_rates(countries: List[str], strict: bool = False) -> Dict[str, Dict[str, Dict]]:
+    """
+    Obtiene tasas de ETFs de varios países en paralelo.
+    
+    Args:
+        countries (List[str]): Nombres de los países
+        strict (bool): Si True, los países sin respuesta quedan en None
+    
+    Returns:
+        Dict[str, Dict[str, Dict]]: Tasas por país
+    """
+    scraper = ETFScraper()
+    return scraper.get_all_etf_rates(countries, strict=strict)
+
+
+def get_simulated_etf_rates(country: str) -> Dict[str, Dict]:
+    """
+    Obtiene tasas de rendimiento de ETFs simuladas para un país (datos de respaldo).
+    
+    Args:
+        country (str): Nombre del país
+    
+    Returns:
+        Dict[str, Dict]: Diccionario con ETFs simulados y sus tasas
+    """
+    scraper = ETFScraper()
+    return scraper._generate_simulated_etf_rates(country)
 
 
 def get_best_etf_rate(country: str) -> tuple:
@@ -223,4 +272,25 @@ def get_best_etf_rate(country: str) -> tuple:
     
     # Encontrar el ETF con mejor rendimiento
     best_etf = max(etfs, key=lambda x: etfs[x]["rate"])
-    return best_etf, etfs[best_etf]
\ No newline at end of file
+    return best_etf, etfs[best_etf]
+
+
+def register_etf_sources(registry=None):
+    """
+    Registra una fuente de tasas de ETFs por país en el registro de fuentes.
+    
+    Args:
+        registry (RateSourceRegistry): Registro a usar (por defecto, el compartido)
+    """
+    registry = registry or get_rate_registry()
+    scraper = ETFScraper()
+    sources = {
+        "Colombia": scraper.get_colombia_etf_rates,
+        "USA": scraper.get_usa_etf_rates,
+        "Panama": scraper.get_panama_etf_rates
+    }
+    for country, fetch in sources.items():
+        registry.register(RateSource(f"etf.{country.lower()}", "etf", country, fetch))
+
+
+register_etf_sources()
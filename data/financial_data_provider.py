@@ -2,20 +2,96 @@
 """
 Financial data provider module for Global Yield Optimizer v3.0
 """
+import copy
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from typing import Dict, List, Tuple
-from .cdt_scraper import get_cdt_rates, get_best_cdt_rate
-from .etf_scraper import get_etf_rates, get_best_etf_rate
-from .inflation_tracker import get_current_inflation
-from .trm_handler import get_current_trm
+from .cdt_scraper import get_cdt_rates, get_all_cdt_rates, get_best_cdt_rate, get_simulated_cdt_rates
+from .etf_scraper import get_etf_rates, get_all_etf_rates, get_best_etf_rate, get_simulated_etf_rates
+from .inflation_tracker import get_current_inflation, get_simulated_inflation_for_country
+from .trm_handler import get_current_trm, get_simulated_trm
 from .rate_scraper import scrape_bank_rates
+from .single_flight import SingleFlight
+
+
+# Tiempo máximo (segundos) que se espera a cada fuente antes de usar datos de respaldo
+SOURCE_DEADLINES = {
+    "trm": 5.0,
+    "inflation": 5.0,
+    "cdt": 3.0,
+    "etf": 3.0
+}
+
+# Hilos del pool compartido para consultas concurrentes
+MAX_FETCH_WORKERS = 16
+
+_executor = None
+_executor_lock = threading.Lock()
+
+# Último valor válido por (fuente, país), usado cuando una fuente no responde a tiempo
+_last_good_values = {}
+_last_good_lock = threading.Lock()
+
+# Datos financieros completos: se reutilizan 1 minuto y, vencidos, se sirven hasta
+# una hora mientras se refrescan en segundo plano
+FINANCIAL_DATA_FRESH_TTL = 60.0
+FINANCIAL_DATA_MAX_STALE = 3600.0
+
+_financial_data_flight = SingleFlight(fresh_ttl=FINANCIAL_DATA_FRESH_TTL, max_stale=FINANCIAL_DATA_MAX_STALE)
+
+
+class IncompleteMarketData(Exception):
+    """Alguna fuente no respondió y se completaron los datos con valores de respaldo."""
+    
+    def __init__(self, data: Dict[str, any], sources: List[str]):
+        """
+        Args:
+            data (Dict[str, any]): Datos financieros completados con respaldos
+            sources (List[str]): Fuentes que usaron valores de respaldo
+        """
+        super().__init__(f"fuentes con datos de respaldo: {', '.join(sources)}")
+        self.data = data
+        self.sources = sources
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """
+    Obtiene el pool de hilos compartido para consultas concurrentes.
+    
+    Returns:
+        ThreadPoolExecutor: Pool acotado a MAX_FETCH_WORKERS hilos
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=MAX_FETCH_WORKERS,
+                    thread_name_prefix="market-data"
+                )
+    return _executor
 
 
 class FinancialDataProvider:
     """Proveedor unificado de datos financieros para el Global Yield Optimizer."""
     
-    def __init__(self):
-        """Inicializa el proveedor de datos financieros."""
+    def __init__(self, concurrent: bool = False, deadlines: Dict[str, float] = None):
+        """
+        Inicializa el proveedor de datos financieros.
+        
+        Args:
+            concurrent (bool): Si True, consulta todas las fuentes en paralelo
+            deadlines (Dict[str, float]): Tiempo máximo por fuente, sobrescribe SOURCE_DEADLINES
+        """
         self.countries = ["Colombia", "USA", "Panama"]
+        self.concurrent = concurrent
+        self.deadlines = dict(SOURCE_DEADLINES)
+        if deadlines:
+            self.deadlines.update(deadlines)
+        # Fuentes que usaron valores de respaldo en la última consulta concurrente
+        self.fallback_sources = []
     
     def get_all_cdt_rates(self) -> Dict[str, Dict[str, float]]:
         """
@@ -24,10 +100,8 @@ class FinancialDataProvider:
         Returns:
             Dict[str, Dict[str, float]]: Tasas de CDTs por país
         """
-        cdt_rates = {}
-        for country in self.countries:
-            cdt_rates[country] = get_cdt_rates(country)
-        return cdt_rates
+        # Todas las fuentes de todos los países se consultan en paralelo
+        return get_all_cdt_rates(self.countries)
     
     def get_all_etf_rates(self) -> Dict[str, Dict[str, Dict]]:
         """
@@ -36,10 +110,8 @@ class FinancialDataProvider:
         Returns:
             Dict[str, Dict[str, Dict]]: Tasas de ETFs por país
         """
-        etf_rates = {}
-        for country in self.countries:
-            etf_rates[country] = get_etf_rates(country)
-        return etf_rates
+        # Todas las fuentes de todos los países se consultan en paralelo
+        return get_all_etf_rates(self.countries)
     
     def get_all_inflation_rates(self) -> Dict[str, float]:
         """
@@ -53,10 +125,15 @@ class FinancialDataProvider:
             inflation_rates[country] = get_current_inflation(country)
         return inflation_rates
     
-    def get_best_investment_options(self) -> Dict[str, Dict]:
+    def get_best_investment_options(self, cdt_rates: Dict[str, Dict[str, float]] = None,
+                                    etf_rates: Dict[str, Dict[str, Dict]] = None) -> Dict[str, Dict]:
         """
         Obtiene las mejores opciones de inversión por país.
         
+        Args:
+            cdt_rates (Dict[str, Dict[str, float]]): Tasas de CDTs ya obtenidas (opcional)
+            etf_rates (Dict[str, Dict[str, Dict]]): Tasas de ETFs ya obtenidas (opcional)
+        
         Returns:
             Dict[str, Dict]: Mejores opciones de inversión por país
         """
@@ -64,8 +141,15 @@ class FinancialDataProvider:
         
         # Obtener mejores CDTs
         for country in self.countries:
-            best_cdt_bank, best_cdt_rate = get_best_cdt_rate(country)
-            best_etf_symbol, best_etf_details = get_best_etf_rate(country)
+            if cdt_rates is not None and country in cdt_rates:
+                best_cdt_bank, best_cdt_rate = _select_best_cdt(cdt_rates[country])
+            else:
+                best_cdt_bank, best_cdt_rate = get_best_cdt_rate(country)
+            
+            if etf_rates is not None and country in etf_rates:
+                best_etf_symbol, best_etf_details = _select_best_etf(etf_rates[country])
+            else:
+                best_etf_symbol, best_etf_details = get_best_etf_rate(country)
             
             best_options[country] = {
                 "best_cdt": {
@@ -87,25 +171,174 @@ class FinancialDataProvider:
         Returns:
             Dict[str, any]: Datos macroeconómicos
         """
+        if self.concurrent:
+            return self._get_macro_data_concurrently()
+        
+        # Las mejores opciones se eligen sobre las mismas tablas que se devuelven
+        cdt_rates = self.get_all_cdt_rates()
+        etf_rates = self.get_all_etf_rates()
+        
         return {
             "trm": get_current_trm(),
             "inflation_rates": self.get_all_inflation_rates(),
-            "cdt_rates": self.get_all_cdt_rates(),
-            "etf_rates": self.get_all_etf_rates(),
-            "best_investment_options": self.get_best_investment_options()
+            "cdt_rates": cdt_rates,
+            "etf_rates": etf_rates,
+            "best_investment_options": self.get_best_investment_options(cdt_rates, etf_rates)
         }
+    
+    def _get_macro_data_concurrently(self) -> Dict[str, any]:
+        """
+        Obtiene los datos macroeconómicos lanzando todas las consultas a la vez.
+        
+        Cada fuente tiene su propio tiempo máximo; si no responde a tiempo (o
+        falla) se usa su último valor válido o, en su defecto, datos simulados,
+        y la fuente queda registrada en fallback_sources.
+        
+        Returns:
+            Dict[str, any]: Datos macroeconómicos
+        """
+        # Variantes estrictas: un fallo de la API o de las fuentes de tasas llega aquí
+        # en lugar de convertirse en un valor simulado
+        tasks = {("trm", None): (functools.partial(get_current_trm, strict=True), ())}
+        for country in self.countries:
+            tasks[("inflation", country)] = (functools.partial(get_current_inflation, strict=True), (country,))
+            tasks[("cdt", country)] = (functools.partial(get_cdt_rates, strict=True), (country,))
+            tasks[("etf", country)] = (functools.partial(get_etf_rates, strict=True), (country,))
+        
+        executor = _get_executor()
+        started = time.monotonic()
+        futures = {key: executor.submit(fn, *args) for key, (fn, args) in tasks.items()}
+        
+        results = {}
+        self.fallback_sources = []
+        for key, future in futures.items():
+            source, country = key
+            remaining = started + self.deadlines.get(source, 5.0) - time.monotonic()
+            try:
+                results[key] = future.result(timeout=max(remaining, 0))
+                with _last_good_lock:
+                    _last_good_values[key] = results[key]
+            except FutureTimeoutError:
+                print(f"La fuente {source} ({country or 'global'}) no respondió a tiempo, usando respaldo")
+                results[key] = _get_fallback_value(source, country)
+                self.fallback_sources.append(f"{source} ({country or 'global'})")
+            except Exception as e:
+                print(f"Error al obtener {source} ({country or 'global'}): {e}")
+                results[key] = _get_fallback_value(source, country)
+                self.fallback_sources.append(f"{source} ({country or 'global'})")
+        
+        cdt_rates = {country: results[("cdt", country)] for country in self.countries}
+        etf_rates = {country: results[("etf", country)] for country in self.countries}
+        
+        return {
+            "trm": results[("trm", None)],
+            "inflation_rates": {country: results[("inflation", country)] for country in self.countries},
+            "cdt_rates": cdt_rates,
+            "etf_rates": etf_rates,
+            "best_investment_options": self.get_best_investment_options(cdt_rates, etf_rates)
+        }
+
+
+def _select_best_cdt(rates: Dict[str, float]) -> Tuple[str, float]:
+    """
+    Selecciona el CDT con mejor tasa de una tabla ya obtenida.
+    
+    Args:
+        rates (Dict[str, float]): Bancos y sus tasas de CDT
+    
+    Returns:
+        Tuple[str, float]: (nombre_banco, tasa)
+    """
+    if not rates:
+        return None, 0.0
+    best_bank = max(rates, key=rates.get)
+    return best_bank, rates[best_bank]
+
+
+def _select_best_etf(etfs: Dict[str, Dict]) -> Tuple[str, Dict]:
+    """
+    Selecciona el ETF con mejor rendimiento de una tabla ya obtenida.
+    
+    Args:
+        etfs (Dict[str, Dict]): ETFs y sus detalles
+    
+    Returns:
+        Tuple[str, Dict]: (símbolo_etf, detalles)
+    """
+    if not etfs:
+        return None, {}
+    best_etf = max(etfs, key=lambda x: etfs[x]["rate"])
+    return best_etf, etfs[best_etf]
+
+
+def _get_fallback_value(source: str, country: str = None):
+    """
+    Obtiene el valor de respaldo de una fuente: el último válido o uno simulado.
+    
+    Args:
+        source (str): Fuente de datos (trm, inflation, cdt, etf)
+        country (str): País consultado (None para fuentes globales)
+    
+    Returns:
+        Valor de respaldo con el mismo formato que la fuente
+    """
+    with _last_good_lock:
+        if (source, country) in _last_good_values:
+            return _last_good_values[(source, country)]
+    
+    if source == "trm":
+        return get_simulated_trm()
+    elif source == "inflation":
+        return get_simulated_inflation_for_country(country)
+    elif source == "cdt":
+        return get_simulated_cdt_rates(country)
+    else:
+        return get_simulated_etf_rates(country)
 
 
 # Funciones de conveniencia
 def get_financial_data() -> Dict[str, any]:
     """
-    Obtiene todos los datos financieros relevantes.
+    Obtiene todos los datos financieros relevantes, consultando las fuentes en paralelo.
+    
+    Las llamadas concurrentes (por ejemplo, varias sesiones del dashboard)
+    comparten una sola consulta a las fuentes; cada llamador recibe su propia copia.
+    Solo se reutilizan datos completos: si alguna fuente usó valores de respaldo,
+    se devuelven esos datos pero no se guardan.
     
     Returns:
         Dict[str, any]: Datos financieros
     """
-    provider = FinancialDataProvider()
-    return provider.get_macro_data()
+    try:
+        data = _financial_data_flight.get("macro_data", _fetch_financial_data)
+    except IncompleteMarketData as e:
+        data = e.data
+    return copy.deepcopy(data)
+
+
+def _fetch_financial_data() -> Dict[str, any]:
+    """
+    Consulta todas las fuentes de datos financieros, salvo que el servicio de
+    refresco haya publicado una fotografía reciente del mercado.
+    
+    Si alguna fuente usó valores de respaldo lanza IncompleteMarketData con
+    los datos completados, para que no se guarden como un valor válido.
+    
+    Returns:
+        Dict[str, any]: Datos financieros
+    """
+    # Importación diferida: market_snapshot depende de este módulo
+    from .market_snapshot import load_published_snapshot
+    
+    published = load_published_snapshot()
+    if published is not None:
+        return published.to_dict()
+    
+    provider = FinancialDataProvider(concurrent=True)
+    data = provider.get_macro_data()
+    if provider.fallback_sources:
+        raise IncompleteMarketData(data, provider.fallback_sources)
+    return data
 
 
 def get_best_investments() -> Dict[str, Dict]:
@@ -116,4 +349,4 @@ def get_best_investments() -> Dict[str, Dict]:
         Dict[str, Dict]: Mejores opciones de inversión por país
     """
     provider = FinancialDataProvider()
-    return provider.get_best_investment_options()
\ No newline at end of file
+    return provider.get_best_investment_options()
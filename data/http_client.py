@@ -0,0 +1,223 @@
+# http_client.py
+"""
+Shared HTTP client utilities for Global Yield Optimizer v3.0
+"""
+import json
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+# Timeouts por defecto (conexión, lectura) en segundos
+DEFAULT_TIMEOUT = (3.05, 10.0)
+
+# Conexiones keep-alive que se mantienen abiertas por host
+DEFAULT_POOL_SIZE = 10
+
+# Reintentos con backoff exponencial: backoff_factor * 2^(intento - 1) segundos
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_FACTOR = 0.3
+
+# Códigos de estado que justifican un reintento
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+def create_session(pool_size=DEFAULT_POOL_SIZE, max_retries=DEFAULT_MAX_RETRIES,
+                   backoff_factor=DEFAULT_BACKOFF_FACTOR):
+    """
+    Crea una sesión HTTP con pool de conexiones persistentes y reintentos acotados.
+    
+    Args:
+        pool_size (int): Número máximo de conexiones keep-alive por host
+        max_retries (int): Número máximo de reintentos por solicitud
+        backoff_factor (float): Factor base del backoff exponencial entre reintentos
+    
+    Returns:
+        requests.Session: Sesión configurada
+    """
+    retry = Retry(
+        total=max_retries,
+        connect=max_retries,
+        read=max_retries,
+        status=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=retry
+    )
+    
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["Connection"] = "keep-alive"
+    return session
+
+
+class TransferStats:
+    """Contadores de tráfico HTTP: solicitudes, respuestas 304, bytes recibidos y tiempo de parseo."""
+    
+    def __init__(self):
+        """Inicializa los contadores en cero."""
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        """Reinicia los contadores."""
+        with self._lock:
+            self.requests = 0
+            self.not_modified = 0
+            self.bytes_received = 0
+            self.parse_seconds = 0.0
+    
+    def record_response(self, status, n_bytes):
+        """
+        Registra una respuesta recibida.
+        
+        Args:
+            status (int): Código de estado HTTP
+            n_bytes (int): Bytes del cuerpo recibido
+        """
+        with self._lock:
+            self.requests += 1
+            self.bytes_received += n_bytes
+            if status == 304:
+                self.not_modified += 1
+    
+    def record_parse(self, seconds):
+        """
+        Registra el tiempo dedicado a decodificar una respuesta.
+        
+        Args:
+            seconds (float): Duración del parseo en segundos
+        """
+        with self._lock:
+            self.parse_seconds += seconds
+    
+    def snapshot(self):
+        """
+        Obtiene una copia de los contadores.
+        
+        Returns:
+            dict: requests, not_modified, bytes_received y parse_seconds
+        """
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "not_modified": self.not_modified,
+                "bytes_received": self.bytes_received,
+                "parse_seconds": self.parse_seconds
+            }
+
+
+# Contadores compartidos por todos los clientes HTTP de la capa de datos
+_transfer_stats = TransferStats()
+
+
+def conditional_headers(etag=None, last_modified=None):
+    """
+    Construye los encabezados de una solicitud condicional.
+    
+    Args:
+        etag (str): ETag de la copia almacenada (opcional)
+        last_modified (str): Last-Modified de la copia almacenada (opcional)
+    
+    Returns:
+        dict: Encabezados If-None-Match / If-Modified-Since
+    """
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    return headers
+
+
+def record_response(status, body):
+    """
+    Registra una respuesta en los contadores compartidos.
+    
+    Args:
+        status (int): Código de estado HTTP
+        body (bytes): Cuerpo recibido
+    """
+    _transfer_stats.record_response(status, len(body or b""))
+
+
+def record_transfer(status, n_bytes, parse_seconds=0.0):
+    """
+    Registra una respuesta leída por bloques en los contadores compartidos.
+    
+    Args:
+        status (int): Código de estado HTTP
+        n_bytes (int): Bytes del cuerpo recibido
+        parse_seconds (float): Tiempo dedicado a decodificar el cuerpo
+    """
+    _transfer_stats.record_response(status, n_bytes)
+    _transfer_stats.record_parse(parse_seconds)
+
+
+def parse_json(body):
+    """
+    Decodifica un cuerpo JSON registrando el tiempo de parseo.
+    
+    Args:
+        body (bytes): Cuerpo de la respuesta
+    
+    Returns:
+        Objeto decodificado
+    """
+    started = time.perf_counter()
+    try:
+        return json.loads(body)
+    finally:
+        _transfer_stats.record_parse(time.perf_counter() - started)
+
+
+def conditional_get(session, url, params=None, timeout=DEFAULT_TIMEOUT, etag=None, last_modified=None):
+    """
+    Ejecuta un GET condicional con una sesión de requests.
+    
+    Args:
+        session (requests.Session): Sesión a usar
+        url (str): URL a consultar
+        params (dict): Parámetros de la consulta (opcional)
+        timeout (tuple): Timeouts (conexión, lectura) en segundos
+        etag (str): ETag de la copia almacenada (opcional)
+        last_modified (str): Last-Modified de la copia almacenada (opcional)
+    
+    Returns:
+        requests.Response: Respuesta (estado 304 si la copia almacenada sigue vigente)
+    """
+    response = session.get(
+        url,
+        params=params,
+        timeout=timeout,
+        headers=conditional_headers(etag, last_modified)
+    )
+    record_response(response.status_code, response.content)
+    if response.status_code != 304:
+        response.raise_for_status()
+    return response
+
+
+# Funciones de conveniencia
+def get_transfer_stats():
+    """
+    Obtiene los contadores de tráfico HTTP de la capa de datos.
+    
+    Returns:
+        dict: requests, not_modified, bytes_received y parse_seconds
+    """
+    return _transfer_stats.snapshot()
+
+
+def reset_transfer_stats():
+    """Reinicia los contadores de tráfico HTTP de la capa de datos."""
+    _transfer_stats.reset()
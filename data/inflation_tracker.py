@@ -2,10 +2,11 @@
 """
 Inflation tracker module for Global Yield Optimizer v3.0
 """
-import random  # Para simulación de datos
 import requests
 from datetime import datetime, timedelta
-from .banrep_api import BanRepAPI
+from .banrep_api import get_shared_api
+from .market_generator import get_market_generator, INFLATION_RANGES, DEFAULT_INFLATION_RANGE
+from .single_flight import SingleFlight
 
 
 # Códigos de países para inflación
@@ -18,13 +19,36 @@ COUNTRY_INFLATION_CODES = {
     "Mexico": "MEX"
 }
 
+# El IPC se publica una vez al mes: se reutiliza una hora y, vencido, se sirve
+# hasta 30 días mientras se refresca en segundo plano
+INFLATION_FRESH_TTL = 3600.0
+INFLATION_MAX_STALE = 30 * 86400.0
 
-def get_current_inflation(country="Colombia"):
+_inflation_flight = SingleFlight(fresh_ttl=INFLATION_FRESH_TTL, max_stale=INFLATION_MAX_STALE)
+
+
+def _fetch_colombian_inflation():
+    """
+    Consulta la inflación actual de Colombia al Banco de la República.
+    
+    Returns:
+        float: Tasa de inflación anual
+    """
+    api = get_shared_api()
+    inflation_data = api.get_inflation()
+    if inflation_data and 'value' in inflation_data:
+        return float(inflation_data['value'])
+    raise ValueError("respuesta sin valor de inflación")
+
+
+def get_current_inflation(country="Colombia", strict=False):
     """
     Obtiene la inflación actual de un país desde fuentes internacionales.
     
     Args:
         country (str): Nombre del país
+        strict (bool): Si True, propaga el error del Banco de la República (Colombia)
+            en lugar de devolver un valor simulado
     
     Returns:
         float: Tasa de inflación anual
@@ -34,13 +58,12 @@ def get_current_inflation(country="Colombia"):
     
     # Obtener datos reales según el país
     if country == "Colombia":
-        # Obtener datos del Banco de la República
+        # Obtener datos del Banco de la República (una sola consulta para llamadas concurrentes)
         try:
-            api = BanRepAPI()
-            inflation_data = api.get_inflation()
-            if inflation_data and 'value' in inflation_data:
-                return float(inflation_data['value'])
+            return _inflation_flight.get(country, _fetch_colombian_inflation)
         except Exception as e:
+            if strict:
+                raise
             print(f"Error al obtener inflación de Colombia del Banco de la República: {e}")
     elif country == "USA":
         # Para Estados Unidos, podríamos usar la BLS (Bureau of Labor Statistics)
@@ -55,6 +78,22 @@ def get_current_inflation(country="Colombia"):
     return get_simulated_inflation_for_country(country)
 
 
+def refresh_current_inflation(country="Colombia"):
+    """
+    Consulta la inflación actual ignorando el valor reutilizable y la actualiza
+    para los demás llamadores (usado por el servicio de refresco).
+    
+    Args:
+        country (str): Nombre del país
+    
+    Returns:
+        float: Tasa de inflación anual
+    """
+    if country != "Colombia":
+        return get_current_inflation(country)
+    return _inflation_flight.do(country, _fetch_colombian_inflation)
+
+
 def get_historical_inflation(country="Colombia", months=12):
     """
     Obtiene el historial de inflación de un país.
@@ -73,20 +112,20 @@ def get_historical_inflation(country="Colombia", months=12):
     if country == "Colombia":
         # Obtener datos históricos del Banco de la República
         try:
-            api = BanRepAPI()
+            api = get_shared_api()
             # Calcular fechas para obtener datos históricos
             end_date = datetime.now()
             start_date = end_date - timedelta(days=months*30)
             
-            inflation_data = api.get_inflation(
+            history = api.get_inflation_history_arrays(
                 start_date=start_date.strftime("%Y-%m-%d"),
                 end_date=end_date.strftime("%Y-%m-%d")
             )
             
-            if inflation_data and 'data' in inflation_data:
-                # Extraer valores de la respuesta
-                values = [float(item['value']) for item in inflation_data['data'] if 'value' in item]
-                return values[-months:] if len(values) > months else values
+            if history is not None:
+                # La respuesta se decodifica por bloques directamente en arreglos NumPy
+                values = history[1]
+                return values[-months:].tolist()
         except Exception as e:
             print(f"Error al obtener historial de inflación de Colombia del Banco de la República: {e}")
     elif country == "USA":
@@ -97,10 +136,7 @@ def get_historical_inflation(country="Colombia", months=12):
         return get_panama_historical_inflation(months)
     
     # Si hay error o para otros países, generar valores simulados
-    inflation_history = []
-    for _ in range(months):
-        inflation_history.append(get_simulated_inflation_for_country(country))
-    return inflation_history
+    return get_simulated_inflation_history(country, months)
 
 
 def get_us_inflation_from_fred():
@@ -118,7 +154,7 @@ def get_us_inflation_from_fred():
         print(f"Error al obtener inflación de EE.UU. de FRED: {e}")
     
     # Devolver datos simulados si hay error
-    return round(random.uniform(1.0, 4.0), 2)
+    return get_market_generator("inflation.usa").uniform(1.0, 4.0)
 
 
 def get_us_historical_inflation(months=12):
@@ -138,10 +174,7 @@ def get_us_historical_inflation(months=12):
         print(f"Error al obtener historial de inflación de EE.UU. de FRED: {e}")
     
     # Devolver datos simulados si hay error
-    inflation_history = []
-    for _ in range(months):
-        inflation_history.append(round(random.uniform(1.0, 4.0), 2))
-    return inflation_history
+    return get_simulated_inflation_history("USA", months)
 
 
 def get_panama_inflation_from_inec():
@@ -159,7 +192,7 @@ def get_panama_inflation_from_inec():
     
     # Devolver datos simulados si hay error
     # Panamá típicamente tiene inflación similar a EE.UU. por estar dolarizado
-    return round(random.uniform(1.0, 3.0), 2)
+    return get_market_generator("inflation.panama").uniform(1.0, 3.0)
 
 
 def get_panama_historical_inflation(months=12):
@@ -179,10 +212,7 @@ def get_panama_historical_inflation(months=12):
         print(f"Error al obtener historial de inflación de Panamá del INEC: {e}")
     
     # Devolver datos simulados si hay error
-    inflation_history = []
-    for _ in range(months):
-        inflation_history.append(round(random.uniform(1.0, 3.0), 2))
-    return inflation_history
+    return get_simulated_inflation_history("Panama", months)
 
 
 def get_simulated_inflation_for_country(country):
@@ -195,19 +225,23 @@ def get_simulated_inflation_for_country(country):
     Returns:
         float: Tasa de inflación simulada
     """
-    # Rangos típicos de inflación por país
-    inflation_ranges = {
-        "Colombia": (2.0, 5.0),
-        "USA": (1.0, 4.0),
-        "Panama": (1.0, 3.0),  # Similar a EE.UU. por estar dolarizado
-        "Eurozone": (1.5, 3.5),
-        "Chile": (2.5, 5.5),
-        "Mexico": (3.0, 6.0)
-    }
+    # Obtener rango típico para el país o usar valores por defecto
+    min_inf, max_inf = INFLATION_RANGES.get(country, DEFAULT_INFLATION_RANGE)
+    return get_market_generator(f"inflation.{country.lower()}").uniform(min_inf, max_inf)
+    
+
+def get_simulated_inflation_history(country, months=12):
+    """
+    Genera un historial de inflación simulado como una trayectoria persistente.
     
-    # Obtener rango para el país o usar valores por defecto
-    min_inf, max_inf = inflation_ranges.get(country, (1.0, 6.0))
-    return round(random.uniform(min_inf, max_inf), 2)
+    Args:
+        country (str): Nombre del país
+        months (int): Número de meses de historial
+    
+    Returns:
+        list: Lista con tasas de inflación simuladas
+    """
+    return get_market_generator().inflation_paths([country], months)[0, :, 0].tolist()
 
 
 def fetch_colombian_inflation_from_banrep():
@@ -218,7 +252,7 @@ def fetch_colombian_inflation_from_banrep():
         dict: Datos de inflación con fechas y valores
     """
     try:
-        api = BanRepAPI()
+        api = get_shared_api()
         return api.get_inflation()
     except Exception as e:
         print(f"Error al obtener datos del Banco de la República: {e}")
@@ -236,15 +270,16 @@ def generate_simulated_inflation_data():
     # Generar datos simulados para los últimos 24 meses
     data = []
     base_date = datetime.now()
+    generator = get_market_generator()
     
     for i in range(24, 0, -1):
         date = base_date - timedelta(days=i*30)
         # La inflación en Colombia típicamente oscila entre 2% y 5%
         # con ocasionales picos más altos
         if i % 6 == 0:  # Cada 6 meses, hay una probabilidad de pico
-            value = round(random.uniform(4.0, 7.0), 2)
+            value = generator.uniform(4.0, 7.0)
         else:
-            value = round(random.uniform(2.0, 5.0), 2)
+            value = generator.uniform(2.0, 5.0)
         
         data.append({
             "date": date.strftime("%Y-%m-%d"),
@@ -0,0 +1,312 @@
+# market_generator.py
+"""
+Vectorized synthetic market generator for Global Yield Optimizer v3.0
+"""
+import threading
+import zlib
+import numpy as np
+from typing import Dict, List
+
+
+# Parámetros de la TRM simulada (movimiento browniano geométrico diario)
+TRM_START_VALUE = 4000.0
+TRM_ANNUAL_DRIFT = 0.02
+TRM_ANNUAL_VOLATILITY = 0.12
+DAYS_PER_YEAR = 365
+DAYS_PER_MONTH = 30
+
+# Rangos típicos de inflación anual por país
+INFLATION_RANGES = {
+    "Colombia": (2.0, 5.0),
+    "USA": (1.0, 4.0),
+    "Panama": (1.0, 3.0),  # Similar a EE.UU. por estar dolarizado
+    "Eurozone": (1.5, 3.5),
+    "Chile": (2.5, 5.5),
+    "Mexico": (3.0, 6.0)
+}
+DEFAULT_INFLATION_RANGE = (1.0, 6.0)
+
+# Persistencia mensual de la inflación (AR(1)) y su correlación con los choques de la TRM
+INFLATION_PERSISTENCE = 0.8
+TRM_INFLATION_CORRELATION = {
+    "Colombia": 0.35  # Traspaso de la devaluación del peso a precios
+}
+
+# Rangos típicos de tasas de CDT por país
+CDT_RATE_RANGES = {
+    "colombia": (8.0, 12.0),
+    "usa": (1.0, 4.0),
+    "panama": (2.0, 5.0),
+    "chile": (4.0, 8.0),
+    "mexico": (6.0, 10.0)
+}
+DEFAULT_CDT_RATE_RANGE = (2.0, 8.0)
+
+# Rangos típicos de rendimiento de ETFs por país
+ETF_EQUITY_RANGES = {
+    "colombia": (-5.0, 15.0),
+    "usa": (-10.0, 20.0),
+    "panama": (-3.0, 12.0),
+    "chile": (-8.0, 18.0),
+    "mexico": (-6.0, 16.0)
+}
+DEFAULT_ETF_EQUITY_RANGE = (-5.0, 15.0)
+
+ETF_FIXED_INCOME_RANGES = {
+    "colombia": (5.0, 9.0),
+    "usa": (2.0, 5.0),
+    "panama": (3.0, 6.0),
+    "chile": (4.0, 8.0),
+    "mexico": (6.0, 10.0)
+}
+DEFAULT_ETF_FIXED_INCOME_RANGE = (2.0, 8.0)
+
+
+class MarketGenerator:
+    """Generador de datos de mercado sintéticos, reproducible a partir de una semilla."""
+    
+    def __init__(self, seed=None):
+        """
+        Inicializa el generador.
+        
+        Args:
+            seed (int o np.random.SeedSequence): Semilla del generador (None para
+                una semilla aleatoria)
+        """
+        self.seed = seed
+        self._seed_sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        self.rng = np.random.default_rng(self._seed_sequence)
+        # numpy.random.Generator no es seguro entre hilos
+        self._lock = threading.Lock()
+    
+    def child(self, name: str) -> "MarketGenerator":
+        """
+        Crea un generador independiente derivado de la semilla de este y de un nombre.
+        
+        El mismo nombre produce siempre la misma secuencia para una misma semilla,
+        sin importar cuántos valores haya generado este generador.
+        
+        Args:
+            name (str): Nombre del flujo (por ejemplo "etf.colombia")
+        
+        Returns:
+            MarketGenerator: Generador hijo
+        """
+        seed_sequence = np.random.SeedSequence(
+            self._seed_sequence.entropy,
+            spawn_key=self._seed_sequence.spawn_key + (zlib.crc32(name.encode()),)
+        )
+        return MarketGenerator(seed_sequence)
+    
+    def uniform(self, low: float, high: float, size: int = None, decimals: int = 2):
+        """
+        Genera valores uniformes redondeados, como los datos simulados existentes.
+        
+        Args:
+            low (float): Límite inferior
+            high (float): Límite superior
+            size (int): Número de valores (None para un escalar)
+            decimals (int): Decimales de redondeo
+        
+        Returns:
+            float o np.ndarray: Valor(es) generado(s)
+        """
+        with self._lock:
+            values = np.round(self.rng.uniform(low, high, size), decimals)
+        return float(values) if size is None else values
+    
+    def trm_paths(self, n_days: int, n_paths: int = 1, start_value: float = TRM_START_VALUE,
+                  annual_drift: float = TRM_ANNUAL_DRIFT,
+                  annual_volatility: float = TRM_ANNUAL_VOLATILITY) -> np.ndarray:
+        """
+        Genera trayectorias diarias de TRM con un movimiento browniano geométrico.
+        
+        Args:
+            n_days (int): Días por trayectoria
+            n_paths (int): Número de trayectorias
+            start_value (float): TRM inicial
+            annual_drift (float): Tendencia anual (devaluación esperada)
+            annual_volatility (float): Volatilidad anual
+        
+        Returns:
+            np.ndarray: Matriz (n_paths, n_days) de valores de TRM
+        """
+        with self._lock:
+            shocks = self.rng.standard_normal((n_paths, n_days))
+        log_returns = self._log_returns(shocks, annual_drift, annual_volatility)
+        return np.round(start_value * np.exp(log_returns.cumsum(axis=1)), 2)
+    
+    def _log_returns(self, shocks: np.ndarray, annual_drift: float, annual_volatility: float) -> np.ndarray:
+        """
+        Convierte choques normales estándar en retornos logarítmicos diarios.
+        
+        Args:
+            shocks (np.ndarray): Choques N(0, 1)
+            annual_drift (float): Tendencia anual
+            annual_volatility (float): Volatilidad anual
+        
+        Returns:
+            np.ndarray: Retornos logarítmicos diarios
+        """
+        dt = 1.0 / DAYS_PER_YEAR
+        return (annual_drift - 0.5 * annual_volatility ** 2) * dt + annual_volatility * np.sqrt(dt) * shocks
+    
+    def inflation_paths(self, countries: List[str], n_months: int, n_paths: int = 1,
+                        trm_shocks: np.ndarray = None) -> np.ndarray:
+        """
+        Genera trayectorias mensuales de inflación como procesos AR(1) que revierten
+        a la media de cada país, correlacionadas con los choques de la TRM.
+        
+        Args:
+            countries (List[str]): Países
+            n_months (int): Meses por trayectoria
+            n_paths (int): Número de trayectorias
+            trm_shocks (np.ndarray): Choques mensuales estandarizados de la TRM (n_months, n_paths)
+        
+        Returns:
+            np.ndarray: Matriz (países, meses, trayectorias) de inflación anual en %
+        """
+        ranges = np.array([INFLATION_RANGES.get(country, DEFAULT_INFLATION_RANGE) for country in countries])
+        low, high = ranges[:, 0, None], ranges[:, 1, None]
+        mean = (low + high) / 2
+        stationary_std = (high - low) / 4
+        innovation_std = stationary_std * np.sqrt(1 - INFLATION_PERSISTENCE ** 2)
+        correlation = np.array([TRM_INFLATION_CORRELATION.get(country, 0.0) for country in countries])[:, None, None]
+        
+        with self._lock:
+            idiosyncratic = self.rng.standard_normal((len(countries), n_months, n_paths))
+            start = self.rng.uniform(low, high, (len(countries), n_paths))
+            if trm_shocks is None:
+                trm_shocks = self.rng.standard_normal((n_months, n_paths))
+        
+        shocks = correlation * trm_shocks[None] + np.sqrt(1 - correlation ** 2) * idiosyncratic
+        innovations = shocks * innovation_std[:, :, None]
+        
+        paths = np.empty((len(countries), n_months, n_paths))
+        deviation = start - mean
+        for month in range(n_months):
+            deviation = INFLATION_PERSISTENCE * deviation + innovations[:, month]
+            paths[:, month] = deviation
+        
+        width = (high - low)[:, :, None]
+        paths = np.clip(paths + mean[:, :, None], low[:, :, None] - width / 2, high[:, :, None] + width / 2)
+        return np.round(paths, 2)
+    
+    def generate_market(self, countries: List[str], n_months: int, n_paths: int = 1,
+                        banks_per_country: int = 8, etfs_per_country: int = 5) -> Dict[str, np.ndarray]:
+        """
+        Genera en una sola llamada la TRM, la inflación y los paneles de tasas de
+        CDTs y ETFs para N países × M meses × K trayectorias.
+        
+        Las tasas de CDT siguen a la inflación de su país y cada banco mantiene un
+        diferencial propio; los ETFs alternan renta fija (índices pares) y renta
+        variable (índices impares), como los datos simulados existentes.
+        
+        Args:
+            countries (List[str]): Países
+            n_months (int): Meses por trayectoria
+            n_paths (int): Número de trayectorias
+            banks_per_country (int): Bancos por país
+            etfs_per_country (int): ETFs por país
+        
+        Returns:
+            Dict[str, np.ndarray]:
+                trm_daily (K, M*30), trm (M, K),
+                inflation (N, M, K),
+                cdt (N, bancos, M, K),
+                etf (N, etfs, M, K), etf_is_fixed_income (etfs,)
+        """
+        n_days = n_months * DAYS_PER_MONTH
+        with self._lock:
+            daily_shocks = self.rng.standard_normal((n_paths, n_days))
+        
+        log_returns = self._log_returns(daily_shocks, TRM_ANNUAL_DRIFT, TRM_ANNUAL_VOLATILITY)
+        trm_daily = np.round(TRM_START_VALUE * np.exp(log_returns.cumsum(axis=1)), 2)
+        trm_monthly = trm_daily[:, DAYS_PER_MONTH - 1::DAYS_PER_MONTH].T
+        
+        # Choque mensual estandarizado de la TRM, usado para correlacionar la inflación
+        monthly_shocks = daily_shocks.reshape(n_paths, n_months, DAYS_PER_MONTH).sum(axis=2).T / np.sqrt(DAYS_PER_MONTH)
+        inflation = self.inflation_paths(countries, n_months, n_paths, trm_shocks=monthly_shocks)
+        
+        keys = [country.lower() for country in countries]
+        inflation_mean = np.array([sum(INFLATION_RANGES.get(country, DEFAULT_INFLATION_RANGE)) / 2 for country in countries])
+        
+        cdt_ranges = np.array([CDT_RATE_RANGES.get(key, DEFAULT_CDT_RATE_RANGE) for key in keys])
+        cdt_low, cdt_high = cdt_ranges[:, 0, None, None, None], cdt_ranges[:, 1, None, None, None]
+        cdt_mid = (cdt_low + cdt_high) / 2
+        cdt_width = cdt_high - cdt_low
+        
+        fixed_ranges = np.array([ETF_FIXED_INCOME_RANGES.get(key, DEFAULT_ETF_FIXED_INCOME_RANGE) for key in keys])
+        equity_ranges = np.array([ETF_EQUITY_RANGES.get(key, DEFAULT_ETF_EQUITY_RANGE) for key in keys])
+        is_fixed_income = np.arange(etfs_per_country) % 2 == 0
+        etf_low = np.where(is_fixed_income[None, :], fixed_ranges[:, 0, None], equity_ranges[:, 0, None])[:, :, None, None]
+        etf_high = np.where(is_fixed_income[None, :], fixed_ranges[:, 1, None], equity_ranges[:, 1, None])[:, :, None, None]
+        
+        with self._lock:
+            bank_spread = self.rng.uniform(-0.25, 0.25, (len(countries), banks_per_country, 1, n_paths))
+            cdt_noise = self.rng.normal(0.0, 0.05, (len(countries), banks_per_country, n_months, n_paths))
+            etf_noise = self.rng.standard_normal((len(countries), etfs_per_country, n_months, n_paths))
+        
+        inflation_gap = (inflation - inflation_mean[:, None, None])[:, None]
+        cdt = cdt_mid + 0.5 * inflation_gap + (bank_spread + cdt_noise) * cdt_width
+        cdt = np.round(np.clip(cdt, cdt_low, cdt_high), 2)
+        
+        etf = (etf_low + etf_high) / 2 + etf_noise * (etf_high - etf_low) / 4
+        etf = np.round(np.clip(etf, etf_low, etf_high), 2)
+        
+        return {
+            "trm_daily": trm_daily,
+            "trm": trm_monthly,
+            "inflation": inflation,
+            "cdt": cdt,
+            "etf": etf,
+            "etf_is_fixed_income": is_fixed_income
+        }
+
+
+# Generador compartido por los datos simulados de respaldo y sus flujos por
+# fuente y país, derivados de la misma semilla
+_shared_generator = MarketGenerator()
+_stream_generators = {}
+_streams_lock = threading.Lock()
+
+
+def get_market_generator(stream: str = None) -> MarketGenerator:
+    """
+    Obtiene el generador compartido usado por los datos simulados de respaldo.
+    
+    Los llamadores que se ejecutan en los pools de hilos (proveedor concurrente
+    y registro de fuentes) piden su propio flujo, por ejemplo "etf.colombia":
+    sus valores dependen solo de la semilla y del nombre del flujo, no del
+    orden en que los hilos llegan al generador.
+    
+    Args:
+        stream (str): Nombre del flujo (None para el generador compartido)
+    
+    Returns:
+        MarketGenerator: Generador compartido o el del flujo
+    """
+    if stream is None:
+        return _shared_generator
+    with _streams_lock:
+        generator = _stream_generators.get(stream)
+        if generator is None:
+            generator = _stream_generators[stream] = _shared_generator.child(stream)
+        return generator
+
+
+def seed_market_generator(seed: int) -> MarketGenerator:
+    """
+    Reinicia el generador compartido y sus flujos con una semilla, para simulaciones reproducibles.
+    
+    Args:
+        seed (int): Semilla
+    
+    Returns:
+        MarketGenerator: Nuevo generador compartido
+    """
+    global _shared_generator
+    with _streams_lock:
+        _shared_generator = MarketGenerator(seed)
+        _stream_generators.clear()
+    return _shared_generator
@@ -0,0 +1,269 @@
+# market_snapshot.py
+"""
+Market snapshot module for Global Yield Optimizer v3.0
+"""
+import json
+import os
+import tempfile
+import threading
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from types import MappingProxyType
+from typing import Dict, Mapping, Tuple
+from .financial_data_provider import FinancialDataProvider, IncompleteMarketData
+from .rate_scraper import scrape_bank_rates, get_best_rate
+from .trm_handler import get_trm_history
+
+
+# Archivo donde el servicio de refresco publica la última fotografía del mercado
+DEFAULT_SNAPSHOT_PATH = "rag_memory/market_snapshot.json"
+
+# Antigüedad máxima (segundos) de una fotografía publicada para servirla sin consultar las fuentes
+PUBLISHED_SNAPSHOT_MAX_AGE = 2 * 3600
+
+# Última fotografía publicada leída por este proceso: ruta -> (mtime, fotografía)
+_published_cache = {}
+_published_lock = threading.Lock()
+
+
+def _freeze(value):
+    """
+    Convierte recursivamente diccionarios y listas en estructuras de solo lectura.
+    
+    Args:
+        value: Valor a congelar
+    
+    Returns:
+        Valor inmutable equivalente (MappingProxyType, tuple o el valor original)
+    """
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value):
+    """
+    Convierte una estructura congelada de vuelta a diccionarios y listas.
+    
+    Args:
+        value: Valor congelado
+    
+    Returns:
+        Copia mutable del valor
+    """
+    if isinstance(value, Mapping):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+
+@dataclass(frozen=True)
+class MarketSnapshot:
+    """Fotografía inmutable del mercado, construida una sola vez por ciclo de simulación."""
+    
+    trm: float
+    trm_history: Tuple[float, ...]
+    inflation_rates: Mapping[str, float]
+    cdt_rates: Mapping[str, Mapping[str, float]]
+    etf_rates: Mapping[str, Mapping[str, Mapping]]
+    bank_rates: Mapping[str, Mapping[str, float]]
+    best_investments: Mapping[str, Mapping]
+    best_bank_rates: Mapping[str, Tuple[str, float]]
+    created_at: datetime = field(default_factory=datetime.now)
+    
+    def best_bank_rate(self, currency: str) -> Tuple[str, float]:
+        """
+        Obtiene el banco con mejor tasa para una moneda.
+        
+        Args:
+            currency (str): Moneda ("COP" o "USD")
+        
+        Returns:
+            Tuple[str, float]: (nombre_banco, tasa)
+        """
+        return self.best_bank_rates.get(currency, (None, 0))
+    
+    def to_dict(self) -> Dict[str, any]:
+        """
+        Convierte la fotografía al formato de get_financial_data.
+        
+        Returns:
+            Dict[str, any]: Datos financieros como diccionarios mutables
+        """
+        return {
+            "trm": self.trm,
+            "inflation_rates": _thaw(self.inflation_rates),
+            "cdt_rates": _thaw(self.cdt_rates),
+            "etf_rates": _thaw(self.etf_rates),
+            "best_investment_options": _thaw(self.best_investments)
+        }
+    
+    def to_json(self) -> str:
+        """
+        Serializa la fotografía completa a JSON.
+        
+        Returns:
+            str: Fotografía en formato JSON
+        """
+        return json.dumps({
+            "trm": self.trm,
+            "trm_history": list(self.trm_history),
+            "inflation_rates": _thaw(self.inflation_rates),
+            "cdt_rates": _thaw(self.cdt_rates),
+            "etf_rates": _thaw(self.etf_rates),
+            "bank_rates": _thaw(self.bank_rates),
+            "best_investments": _thaw(self.best_investments),
+            "best_bank_rates": _thaw(self.best_bank_rates),
+            "created_at": self.created_at.isoformat()
+        })
+    
+    @classmethod
+    def from_json(cls, text: str) -> "MarketSnapshot":
+        """
+        Reconstruye una fotografía serializada con to_json.
+        
+        Args:
+            text (str): Fotografía en formato JSON
+        
+        Returns:
+            MarketSnapshot: Fotografía inmutable
+        """
+        data = json.loads(text)
+        return cls(
+            trm=data["trm"],
+            trm_history=tuple(data["trm_history"]),
+            inflation_rates=_freeze(data["inflation_rates"]),
+            cdt_rates=_freeze(data["cdt_rates"]),
+            etf_rates=_freeze(data["etf_rates"]),
+            bank_rates=_freeze(data["bank_rates"]),
+            best_investments=_freeze(data["best_investments"]),
+            best_bank_rates=_freeze(data["best_bank_rates"]),
+            created_at=datetime.fromisoformat(data["created_at"])
+        )
+
+
+def build_market_snapshot(provider: FinancialDataProvider = None, history_days: int = 45,
+                          portfolio=None, strict: bool = False) -> MarketSnapshot:
+    """
+    Construye una fotografía del mercado consultando cada fuente una sola vez.
+    
+    En modo estricto (el que usa el servicio de refresco antes de publicar) una
+    fuente que cae en valores de respaldo (TRM, inflación o tasas de CDTs y
+    ETFs) lanza IncompleteMarketData, y un historial de TRM no disponible lanza
+    ValueError, en lugar de completar la fotografía con datos simulados.
+    
+    Args:
+        provider (FinancialDataProvider): Proveedor de datos (opcional, concurrente por defecto)
+        history_days (int): Días de historial de TRM a incluir
+        portfolio (Portfolio): Portfolio cuya tabla trm_history sirve el historial (opcional)
+        strict (bool): Si True, falla en lugar de usar datos de respaldo o simulados
+    
+    Returns:
+        MarketSnapshot: Fotografía inmutable del mercado
+    """
+    # Solo el proveedor concurrente informa qué fuentes usaron respaldos
+    provider = provider or FinancialDataProvider(concurrent=True)
+    if strict and not provider.concurrent:
+        provider = FinancialDataProvider(concurrent=True, deadlines=provider.deadlines)
+    macro_data = provider.get_macro_data()
+    if strict and provider.fallback_sources:
+        raise IncompleteMarketData(macro_data, provider.fallback_sources)
+    bank_rates = scrape_bank_rates()
+    
+    return MarketSnapshot(
+        trm=macro_data["trm"],
+        trm_history=tuple(get_trm_history(history_days, portfolio=portfolio, strict=strict)),
+        inflation_rates=_freeze(macro_data["inflation_rates"]),
+        cdt_rates=_freeze(macro_data["cdt_rates"]),
+        etf_rates=_freeze(macro_data["etf_rates"]),
+        bank_rates=_freeze(bank_rates),
+        best_investments=_freeze(macro_data["best_investment_options"]),
+        best_bank_rates=_freeze({
+            currency: get_best_rate(bank_rates, currency) for currency in ("COP", "USD")
+        })
+    )
+
+
+def publish_snapshot(snapshot: MarketSnapshot, path: str = DEFAULT_SNAPSHOT_PATH):
+    """
+    Publica una fotografía para otros procesos de forma atómica: se escribe un
+    archivo temporal y se renombra sobre el anterior, de modo que los lectores
+    siempre ven una fotografía completa.
+    
+    Args:
+        snapshot (MarketSnapshot): Fotografía a publicar
+        path (str): Archivo de publicación
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(snapshot.to_json())
+        os.replace(tmp_path, path)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+
+
+def load_published_snapshot(path: str = DEFAULT_SNAPSHOT_PATH,
+                            max_age: float = PUBLISHED_SNAPSHOT_MAX_AGE) -> MarketSnapshot:
+    """
+    Lee la última fotografía publicada; el archivo solo se vuelve a leer si cambió.
+    
+    Args:
+        path (str): Archivo de publicación
+        max_age (float): Antigüedad máxima en segundos (None para no limitarla)
+    
+    Returns:
+        MarketSnapshot: Fotografía publicada, o None si no existe o es muy antigua
+    """
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    
+    with _published_lock:
+        cached = _published_cache.get(path)
+    if cached is not None and cached[0] == mtime:
+        snapshot = cached[1]
+    else:
+        try:
+            with open(path, encoding="utf-8") as f:
+                snapshot = MarketSnapshot.from_json(f.read())
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Error al leer la fotografía publicada del mercado: {e}")
+            return None
+        with _published_lock:
+            _published_cache[path] = (mtime, snapshot)
+    
+    if max_age is not None and (datetime.now() - snapshot.created_at).total_seconds() > max_age:
+        return None
+    return snapshot
+
+
+# Funciones de conveniencia
+def get_market_snapshot(history_days: int = 45, portfolio=None) -> MarketSnapshot:
+    """
+    Obtiene una fotografía actual del mercado.
+    
+    Si el servicio de refresco publicó una fotografía reciente con suficiente
+    historial se sirve sin consultar las fuentes; si no, se construye una nueva.
+    
+    Args:
+        history_days (int): Días de historial de TRM a incluir
+        portfolio (Portfolio): Portfolio cuya tabla trm_history sirve el historial
+            si hay que construir la fotografía (opcional)
+    
+    Returns:
+        MarketSnapshot: Fotografía inmutable del mercado
+    """
+    published = load_published_snapshot()
+    if published is not None and len(published.trm_history) >= history_days:
+        if len(published.trm_history) > history_days:
+            published = replace(published, trm_history=published.trm_history[len(published.trm_history) - history_days:])
+        return published
+    return build_market_snapshot(history_days=history_days, portfolio=portfolio)
@@ -5,7 +5,7 @@ Rate scraper module for Global Yield Optimizer v3.0
 import random  # Para simulación de datos
 import requests
 from datetime import datetime, timedelta
-from .banrep_api import BanRepAPI
+from .banrep_api import get_shared_api
 
 
 def scrape_bank_rates():
@@ -68,7 +68,7 @@ def fetch_banrep_indicator(series_id, start_date=None, end_date=None):
         dict: Datos del indicador
     """
     try:
-        api = BanRepAPI()
+        api = get_shared_api()
         return api.get_indicator(series_id, start_date, end_date)
     except Exception as e:
         print(f"Error al obtener indicador {series_id} del Banco de la República: {e}")
@@ -0,0 +1,427 @@
+# rate_sources.py
+"""
+Rate source registry module for Global Yield Optimizer v3.0
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, Iterable, List, Tuple
+
+
+# Tiempo máximo (segundos) que se espera a cada fuente antes de darla por fallida
+DEFAULT_SOURCE_TIMEOUT = 2.0
+
+# Fallos consecutivos que abren el circuito de una fuente y segundos que permanece abierto
+DEFAULT_FAILURE_THRESHOLD = 3
+DEFAULT_COOLDOWN = 60.0
+
+# Hilos del pool compartido por las fuentes de tasas
+MAX_SOURCE_WORKERS = 16
+
+# Nombres alternativos de países aceptados por los scrapers
+COUNTRY_ALIASES = {
+    "estados unidos": "usa"
+}
+
+
+def normalize_country(country: str) -> str:
+    """
+    Normaliza el nombre de un país para buscar sus fuentes.
+    
+    Args:
+        country (str): Nombre del país
+    
+    Returns:
+        str: Nombre normalizado (minúsculas, sin alias)
+    """
+    country = country.lower()
+    return COUNTRY_ALIASES.get(country, country)
+
+
+class CircuitBreaker:
+    """Circuito que deja de consultar una fuente tras fallos repetidos durante un periodo de espera."""
+    
+    def __init__(self, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD, cooldown: float = DEFAULT_COOLDOWN):
+        """
+        Inicializa el circuito (cerrado).
+        
+        Args:
+            failure_threshold (int): Fallos consecutivos que abren el circuito
+            cooldown (float): Segundos que el circuito permanece abierto antes de
+                permitir una consulta de prueba
+        """
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+    
+    def allow(self) -> bool:
+        """
+        Indica si se puede consultar la fuente.
+        
+        Con el circuito abierto se rechaza de inmediato; vencido el periodo de
+        espera se permite una sola consulta de prueba (semiabierto).
+        
+        Returns:
+            bool: True si la consulta está permitida
+        """
+        with self._lock:
+            if self.state == "open":
+                if time.monotonic() - self._opened_at < self.cooldown:
+                    return False
+                self.state = "half_open"
+                self._probing = False
+            if self.state == "half_open":
+                if self._probing:
+                    return False
+                self._probing = True
+            return True
+    
+    def record_success(self):
+        """Registra una consulta exitosa y cierra el circuito."""
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._probing = False
+    
+    def record_failure(self):
+        """Registra una consulta fallida y abre el circuito si corresponde."""
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self._opened_at = time.monotonic()
+                self._probing = False
+    
+    def abandon_probe(self):
+        """Libera la consulta de prueba que se canceló sin llegar a ejecutarse, para permitir otra."""
+        with self._lock:
+            if self.state == "half_open":
+                self._probing = False
+
+
+class RateSource:
+    """Adaptador de una fuente de tasas (un banco, un feed de ETFs o un país)."""
+    
+    def __init__(self, name: str, kind: str, country: str, fetch: Callable[[], Dict],
+                 timeout: float = DEFAULT_SOURCE_TIMEOUT):
+        """
+        Inicializa la fuente.
+        
+        Args:
+            name (str): Nombre único de la fuente (ej: "cdt.colombia")
+            kind (str): Tipo de tasas que entrega ("cdt" o "etf")
+            country (str): País al que pertenecen las tasas
+            fetch (Callable[[], Dict]): Función que devuelve las tasas de la fuente;
+                los resultados de varias fuentes del mismo país se combinan
+            timeout (float): Tiempo máximo de respuesta en segundos
+        """
+        self.name = name
+        self.kind = kind
+        self.country = country
+        self.fetch = fetch
+        self.timeout = timeout
+
+
+class _Attempt:
+    """Una consulta a una fuente: cuándo se encoló, cuándo empezó a ejecutarse y si ya se registró su resultado."""
+    
+    __slots__ = ("source", "probe", "submitted", "started", "started_event", "recorded", "failed")
+    
+    def __init__(self, source: RateSource, probe: bool = False):
+        self.source = source
+        # Si es la consulta de prueba de un circuito semiabierto
+        self.probe = probe
+        self.submitted = time.monotonic()
+        self.started = None
+        self.started_event = threading.Event()
+        self.recorded = False
+        self.failed = False
+    
+    def start(self):
+        """Marca el inicio real de la consulta (cuando un hilo del pool la toma)."""
+        self.started = time.monotonic()
+        self.started_event.set()
+    
+    @property
+    def start_deadline(self) -> float:
+        """Instante (time.monotonic) hasta el que la consulta puede esperar un hilo libre."""
+        return self.submitted + self.source.timeout
+    
+    @property
+    def deadline(self) -> float:
+        """Instante (time.monotonic) en que vence el tiempo máximo de la fuente."""
+        return self.started + self.source.timeout
+
+
+class RateSourceRegistry:
+    """Registro de fuentes de tasas consultadas en paralelo con un circuito por fuente."""
+    
+    def __init__(self, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD, cooldown: float = DEFAULT_COOLDOWN,
+                 max_workers: int = MAX_SOURCE_WORKERS):
+        """
+        Inicializa el registro.
+        
+        Args:
+            failure_threshold (int): Fallos consecutivos que abren el circuito de una fuente
+            cooldown (float): Segundos que permanece abierto el circuito
+            max_workers (int): Hilos del pool de consultas
+        """
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_workers = max_workers
+        self._sources = {}
+        self._breakers = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._executor = None
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """
+        Obtiene el pool de hilos del registro, creándolo si no existe.
+        
+        Returns:
+            ThreadPoolExecutor: Pool de consultas
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="rate-source"
+                )
+            return self._executor
+    
+    def register(self, source: RateSource):
+        """
+        Registra una fuente; si ya existe una con el mismo nombre se reemplaza.
+        
+        Args:
+            source (RateSource): Fuente a registrar
+        """
+        with self._lock:
+            self._sources[source.name] = source
+            self._breakers[source.name] = CircuitBreaker(self.failure_threshold, self.cooldown)
+            self._stats[source.name] = {
+                "calls": 0,
+                "failures": 0,
+                "short_circuits": 0,
+                "queue_timeouts": 0,
+                "total_latency": 0.0,
+                "last_latency": 0.0,
+                "max_latency": 0.0
+            }
+    
+    def unregister(self, name: str):
+        """
+        Elimina una fuente del registro.
+        
+        Args:
+            name (str): Nombre de la fuente
+        """
+        with self._lock:
+            self._sources.pop(name, None)
+            self._breakers.pop(name, None)
+            self._stats.pop(name, None)
+    
+    def get_sources(self, kind: str, country: str = None) -> List[RateSource]:
+        """
+        Obtiene las fuentes registradas de un tipo y, opcionalmente, de un país.
+        
+        Args:
+            kind (str): Tipo de tasas ("cdt" o "etf")
+            country (str): País (opcional)
+        
+        Returns:
+            List[RateSource]: Fuentes registradas
+        """
+        country = normalize_country(country) if country else None
+        with self._lock:
+            return [
+                source for source in self._sources.values()
+                if source.kind == kind and (country is None or normalize_country(source.country) == country)
+            ]
+    
+    def _run(self, attempt: _Attempt) -> Dict:
+        """
+        Consulta una fuente registrando su latencia y actualizando su circuito.
+        
+        Args:
+            attempt (_Attempt): Consulta a ejecutar
+        
+        Returns:
+            Dict: Tasas entregadas por la fuente
+        """
+        attempt.start()
+        failed = True
+        try:
+            data = attempt.source.fetch()
+            failed = False
+            return data
+        finally:
+            latency = time.monotonic() - attempt.started
+            self._record(attempt, latency, failed=failed or latency > attempt.source.timeout)
+    
+    def _record(self, attempt: _Attempt, latency: float, failed: bool):
+        """
+        Actualiza las estadísticas y el circuito de una fuente, una sola vez por consulta.
+        
+        Lo llaman tanto el hilo que ejecuta la consulta al terminar como
+        fetch_many al vencer el tiempo máximo; solo cuenta el primero.
+        
+        Args:
+            attempt (_Attempt): Consulta terminada o vencida
+            latency (float): Duración de la consulta en segundos
+            failed (bool): Si la consulta falló o excedió el tiempo máximo
+        """
+        source = attempt.source
+        with self._lock:
+            if attempt.recorded:
+                return
+            attempt.recorded = True
+            attempt.failed = failed
+            stats = self._stats.get(source.name)
+            breaker = self._breakers.get(source.name)
+            if stats is None:
+                return
+            stats["calls"] += 1
+            stats["total_latency"] += latency
+            stats["last_latency"] = latency
+            stats["max_latency"] = max(stats["max_latency"], latency)
+            if failed:
+                stats["failures"] += 1
+        
+        if failed:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+    
+    def fetch_many(self, targets: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], Dict]:
+        """
+        Consulta en paralelo todas las fuentes de varios (tipo, país).
+        
+        Las fuentes con el circuito abierto no se consultan; las que fallan o no
+        responden a tiempo se omiten del resultado. El tiempo máximo de cada
+        fuente se cuenta desde que un hilo del pool empieza a consultarla, no
+        desde el inicio del lote. Una consulta que espera un hilo libre más que
+        ese mismo tiempo máximo (el pool se comparte con otras llamadas) se
+        cancela sin contarla como fallo.
+        
+        Args:
+            targets (Iterable[Tuple[str, str]]): Pares (tipo, país) a consultar
+        
+        Returns:
+            Dict[Tuple[str, str], Dict]: Tasas combinadas por (tipo, país), o None
+                si ninguna fuente respondió
+        """
+        executor = self._get_executor()
+        results = {}
+        attempts = []
+        for kind, country in targets:
+            results[(kind, country)] = None
+            for source in self.get_sources(kind, country):
+                with self._lock:
+                    breaker = self._breakers.get(source.name)
+                if breaker is None:
+                    continue
+                if not breaker.allow():
+                    with self._lock:
+                        self._stats[source.name]["short_circuits"] += 1
+                    continue
+                attempt = _Attempt(source, probe=breaker.state == "half_open")
+                attempts.append(((kind, country), attempt, breaker, executor.submit(self._run, attempt)))
+        
+        for key, attempt, breaker, future in attempts:
+            source = attempt.source
+            started = attempt.started_event.wait(timeout=max(attempt.start_deadline - time.monotonic(), 0))
+            if not started and future.cancel():
+                print(f"La fuente {source.name} no obtuvo un hilo libre a tiempo")
+                with self._lock:
+                    if source.name in self._stats:
+                        self._stats[source.name]["queue_timeouts"] += 1
+                # Sin resultado de la prueba el circuito seguiría rechazando la fuente
+                if attempt.probe:
+                    breaker.abandon_probe()
+                continue
+            
+            attempt.started_event.wait()
+            try:
+                data = future.result(timeout=max(attempt.deadline - time.monotonic(), 0))
+            except FutureTimeoutError:
+                future.cancel()
+                print(f"La fuente {source.name} no respondió a tiempo")
+                self._record(attempt, time.monotonic() - attempt.started, failed=True)
+                continue
+            except Exception as e:
+                print(f"Error al consultar la fuente {source.name}: {e}")
+                continue
+            
+            if attempt.failed:
+                # Respondió, pero después de su tiempo máximo
+                print(f"La fuente {source.name} no respondió a tiempo")
+                continue
+            
+            if data:
+                if results[key] is None:
+                    results[key] = {}
+                results[key].update(data)
+        
+        return results
+    
+    def fetch(self, kind: str, country: str) -> Dict:
+        """
+        Consulta en paralelo todas las fuentes de un tipo y país.
+        
+        Args:
+            kind (str): Tipo de tasas ("cdt" o "etf")
+            country (str): País
+        
+        Returns:
+            Dict: Tasas combinadas de las fuentes, o None si ninguna respondió
+        """
+        return self.fetch_many([(kind, country)])[(kind, country)]
+    
+    def get_stats(self) -> Dict[str, Dict]:
+        """
+        Obtiene la latencia y el estado del circuito de cada fuente.
+        
+        Returns:
+            Dict[str, Dict]: Estadísticas por nombre de fuente
+        """
+        with self._lock:
+            report = {}
+            for name, stats in self._stats.items():
+                breaker = self._breakers[name]
+                report[name] = dict(
+                    stats,
+                    avg_latency=stats["total_latency"] / stats["calls"] if stats["calls"] else 0.0,
+                    circuit=breaker.state
+                )
+            return report
+
+
+# Registro compartido por los scrapers de CDTs y ETFs
+_shared_registry = RateSourceRegistry()
+
+
+# Funciones de conveniencia
+def get_rate_registry() -> RateSourceRegistry:
+    """
+    Obtiene el registro de fuentes de tasas compartido.
+    
+    Returns:
+        RateSourceRegistry: Registro compartido
+    """
+    return _shared_registry
+
+
+def get_rate_source_stats() -> Dict[str, Dict]:
+    """
+    Obtiene la latencia y el estado del circuito de cada fuente del registro compartido.
+    
+    Returns:
+        Dict[str, Dict]: Estadísticas por nombre de fuente
+    """
+    return _shared_registry.get_stats()
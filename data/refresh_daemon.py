@@ -0,0 +1,190 @@
+# refresh_daemon.py
+"""
+Background market data refresh service for Global Yield Optimizer v3.0
+"""
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict
+from .banrep_api import get_shared_api
+from .inflation_tracker import refresh_current_inflation
+from .market_snapshot import build_market_snapshot, publish_snapshot, DEFAULT_SNAPSHOT_PATH
+from .timeseries_store import TimeSeriesStore, to_day_ordinal
+from .trm_handler import refresh_current_trm, sync_trm_history
+
+
+# Intervalo (segundos) entre refrescos de cada fuente según su frecuencia de publicación
+REFRESH_SCHEDULES = {
+    "trm": 24 * 3600,             # Se publica una vez al día
+    "inflation": 30 * 24 * 3600,  # Se publica una vez al mes
+    "rates": 3600                 # Tasas de CDTs, ETFs y bancos
+}
+
+# Variación aleatoria del intervalo (±10%) para no consultar todas las fuentes a la vez
+DEFAULT_JITTER = 0.1
+
+# Espera antes de reintentar una fuente que falló
+RETRY_DELAY = 300
+
+# Días de historial de TRM que se mantienen al día
+DEFAULT_HISTORY_DAYS = 45
+
+
+class RefreshDaemon:
+    """Servicio que mantiene calientes la caché, las tablas locales y la fotografía publicada del mercado."""
+    
+    def __init__(self, portfolio=None, store: TimeSeriesStore = None, schedules: Dict[str, float] = None,
+                 jitter: float = DEFAULT_JITTER, history_days: int = DEFAULT_HISTORY_DAYS,
+                 snapshot_path: str = DEFAULT_SNAPSHOT_PATH, seed: int = None):
+        """
+        Inicializa el servicio de refresco.
+        
+        Args:
+            portfolio (Portfolio): Portfolio cuya tabla trm_history se sincroniza (opcional)
+            store (TimeSeriesStore): Almacén columnar donde se guardan TRM e IPC (opcional)
+            schedules (Dict[str, float]): Intervalos por fuente, sobrescribe REFRESH_SCHEDULES
+            jitter (float): Variación relativa aleatoria de cada intervalo
+            history_days (int): Días de historial de TRM a mantener
+            snapshot_path (str): Archivo donde se publica la fotografía del mercado
+            seed (int): Semilla del jitter (opcional)
+        """
+        self.portfolio = portfolio
+        self.store = store
+        self.schedules = dict(REFRESH_SCHEDULES)
+        if schedules:
+            self.schedules.update(schedules)
+        self.jitter = jitter
+        self.history_days = history_days
+        self.snapshot_path = snapshot_path
+        self.last_runs = {}
+        self._random = random.Random(seed)
+        self._jobs: Dict[str, Callable[[], None]] = {
+            "trm": self.refresh_trm,
+            "inflation": self.refresh_inflation,
+            "rates": self.refresh_rates
+        }
+        self._next_runs = {name: 0.0 for name in self._jobs}
+        self._stop = threading.Event()
+        self._thread = None
+    
+    def _next_delay(self, name: str) -> float:
+        """
+        Calcula la espera hasta el siguiente refresco de una fuente, con jitter.
+        
+        Args:
+            name (str): Nombre de la fuente
+        
+        Returns:
+            float: Segundos hasta el siguiente refresco
+        """
+        interval = self.schedules[name]
+        return interval * (1 + self._random.uniform(-self.jitter, self.jitter))
+    
+    def refresh_trm(self):
+        """Refresca el TRM actual y su historial en SQLite y en el almacén columnar."""
+        refresh_current_trm()
+        if self.portfolio is not None:
+            sync_trm_history(self.portfolio, self.history_days)
+        
+        if self.store is not None:
+            end_date = datetime.now()
+            start_date = end_date - timedelta(days=self.history_days)
+            history = get_shared_api().get_trm_history_arrays(
+                start_date=start_date.strftime("%Y-%m-%d"),
+                end_date=end_date.strftime("%Y-%m-%d")
+            )
+            if history is not None:
+                self.store.append("TRM", *history)
+    
+    def refresh_inflation(self):
+        """Refresca la inflación de Colombia y la agrega al almacén columnar."""
+        inflation = refresh_current_inflation("Colombia")
+        if self.store is not None:
+            self.store.append("IPC", [to_day_ordinal(datetime.now())], [inflation])
+    
+    def refresh_rates(self):
+        """Refresca las tasas de CDTs, ETFs y bancos construyendo y publicando una nueva fotografía."""
+        self.publish()
+    
+    def publish(self):
+        """
+        Construye la fotografía del mercado con los datos recién refrescados y la publica.
+        
+        La fotografía se construye en modo estricto: si alguna fuente cae en
+        valores de respaldo o simulados se lanza la excepción y se conserva la
+        fotografía publicada anterior.
+        """
+        snapshot = build_market_snapshot(history_days=self.history_days, portfolio=self.portfolio, strict=True)
+        publish_snapshot(snapshot, self.snapshot_path)
+    
+    def run_pending(self) -> int:
+        """
+        Ejecuta los refrescos vencidos y, si se refrescó el TRM o la inflación,
+        publica una nueva fotografía con los valores recién obtenidos.
+        
+        Returns:
+            int: Número de fuentes refrescadas con éxito
+        """
+        now = time.monotonic()
+        refreshed = 0
+        published = False
+        for name, job in self._jobs.items():
+            if self._next_runs[name] > now:
+                continue
+            try:
+                job()
+                refreshed += 1
+                published = published or name == "rates"
+                self.last_runs[name] = datetime.now()
+                self._next_runs[name] = time.monotonic() + self._next_delay(name)
+            except Exception as e:
+                print(f"Error al refrescar {name}: {e}")
+                self._next_runs[name] = time.monotonic() + min(RETRY_DELAY, self.schedules[name])
+        
+        if refreshed and not published:
+            try:
+                self.publish()
+            except Exception as e:
+                print(f"Error al publicar la fotografía del mercado: {e}")
+        return refreshed
+    
+    def run(self, max_cycles: int = None):
+        """
+        Ejecuta el servicio hasta que se detenga (o hasta max_cycles ciclos).
+        
+        Args:
+            max_cycles (int): Número máximo de ciclos (None para indefinido)
+        """
+        cycles = 0
+        while not self._stop.is_set():
+            self.run_pending()
+            cycles += 1
+            if max_cycles is not None and cycles >= max_cycles:
+                break
+            wait = max(min(self._next_runs.values()) - time.monotonic(), 0)
+            self._stop.wait(wait)
+    
+    def start(self) -> "RefreshDaemon":
+        """
+        Inicia el servicio en un hilo en segundo plano.
+        
+        Returns:
+            RefreshDaemon: El propio servicio
+        """
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, name="market-refresh", daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self, timeout: float = None):
+        """
+        Detiene el servicio.
+        
+        Args:
+            timeout (float): Segundos máximos a esperar que termine el refresco en curso
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
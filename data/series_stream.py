@@ -0,0 +1,259 @@
+# series_stream.py
+"""
+Streaming JSON parser for Banco de la República series responses
+"""
+import codecs
+import json
+import re
+import time
+import numpy as np
+from typing import Dict, Iterable, Iterator, List, Tuple
+from .timeseries_store import DATE_DTYPE, VALUE_DTYPE, dates_to_ordinals
+
+
+# Tamaño de los bloques leídos de la respuesta HTTP
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Bytes aproximados por registro {"date": ..., "value": ...}, para estimar la capacidad inicial
+BYTES_PER_RECORD_ESTIMATE = 40
+MIN_CAPACITY = 1024
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_decoder = json.JSONDecoder()
+
+
+class ChunkCounter:
+    """Iterador sobre los bloques de una respuesta que cuenta bytes y tiempo de espera de red."""
+    
+    def __init__(self, chunks: Iterable[bytes]):
+        """
+        Inicializa el contador.
+        
+        Args:
+            chunks (Iterable[bytes]): Bloques de la respuesta
+        """
+        self._chunks = iter(chunks)
+        self.bytes = 0
+        self.wait_seconds = 0.0
+    
+    def __iter__(self):
+        return self
+    
+    def __next__(self) -> bytes:
+        started = time.perf_counter()
+        try:
+            chunk = next(self._chunks)
+        finally:
+            self.wait_seconds += time.perf_counter() - started
+        self.bytes += len(chunk)
+        return chunk
+
+
+class _StreamReader:
+    """Lector incremental de texto JSON que solo mantiene en memoria el bloque pendiente."""
+    
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.fills = 0
+    
+    def fill(self) -> bool:
+        """
+        Lee el siguiente bloque descartando el texto ya consumido.
+        
+        Returns:
+            bool: False si la respuesta ya terminó
+        """
+        if self.eof:
+            return False
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self.eof = True
+            text = self._text_decoder.decode(b"", final=True)
+        else:
+            text = self._text_decoder.decode(chunk)
+        self.buf = self.buf[self.pos:] + text
+        self.pos = 0
+        self.fills += 1
+        return True
+    
+    def peek(self) -> str:
+        """
+        Obtiene el siguiente carácter significativo sin consumirlo.
+        
+        Returns:
+            str: Carácter siguiente (tras espacios en blanco)
+        """
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                raise ValueError("Fin inesperado del JSON")
+    
+    def expect(self, char: str):
+        """
+        Consume un carácter estructural.
+        
+        Args:
+            char (str): Carácter esperado
+        """
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Se esperaba '{char}' y se encontró '{found}'")
+        self.pos += 1
+    
+    def decode_value(self):
+        """
+        Decodifica el siguiente valor JSON completo, leyendo más bloques si hace falta.
+        
+        Returns:
+            Valor decodificado
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+                # Un número al final del bloque puede continuar en el siguiente
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self.fill()
+    
+    def array_batches(self) -> Iterator[List]:
+        """
+        Recorre un arreglo JSON (ya abierto) entregando sus elementos por lotes.
+        
+        Los objetos completos del bloque actual se decodifican con una sola
+        llamada a json.loads; si el corte no coincide con el fin de un elemento
+        (objetos anidados o elementos que no son objetos) se decodifica uno a uno.
+        
+        Returns:
+            Iterator[List]: Lotes de elementos del arreglo
+        """
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        
+        failed_cut = None
+        while True:
+            self.peek()
+            cut = self.buf.rfind("}", self.pos)
+            batch = None
+            # No repetir un corte que ya falló con el mismo bloque
+            if cut >= self.pos and (self.fills, cut) != failed_cut:
+                try:
+                    batch = json.loads("[" + self.buf[self.pos:cut + 1] + "]")
+                    self.pos = cut + 1
+                except json.JSONDecodeError:
+                    failed_cut = (self.fills, cut)
+            if batch is None:
+                batch = [self.decode_value()]
+            yield batch
+            
+            separator = self.peek()
+            self.pos += 1
+            if separator == "]":
+                return
+            if separator != ",":
+                raise ValueError(f"Se esperaba ',' o ']' y se encontró '{separator}'")
+
+
+def iter_array_batches(chunks: Iterable[bytes], key: str = "data", meta: Dict = None) -> Iterator[List]:
+    """
+    Recorre por lotes el arreglo de un campo de primer nivel de un objeto JSON
+    recibido por bloques, sin cargar la respuesta completa en memoria.
+    
+    Args:
+        chunks (Iterable[bytes]): Bloques de la respuesta
+        key (str): Campo de primer nivel que contiene el arreglo
+        meta (Dict): Si se indica, recibe los demás campos de primer nivel
+    
+    Returns:
+        Iterator[List]: Lotes de elementos del arreglo
+    """
+    reader = _StreamReader(chunks)
+    reader.expect("{")
+    if reader.peek() == "}":
+        return
+    
+    while True:
+        name = reader.decode_value()
+        reader.expect(":")
+        if name == key and reader.peek() == "[":
+            reader.pos += 1
+            yield from reader.array_batches()
+        else:
+            value = reader.decode_value()
+            if meta is not None:
+                meta[name] = value
+        
+        separator = reader.peek()
+        reader.pos += 1
+        if separator == "}":
+            return
+        if separator != ",":
+            raise ValueError(f"Se esperaba ',' o '}}' y se encontró '{separator}'")
+
+
+def parse_series_stream(chunks: Iterable[bytes], key: str = "data", size_hint: int = 0,
+                        meta: Dict = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convierte una respuesta de serie recibida por bloques en columnas NumPy.
+    
+    Los registros {"date", "value"} se escriben directamente en arreglos
+    preasignados (estimados a partir de size_hint y ampliados al doble si no
+    alcanzan), sin construir el árbol JSON completo ni listas intermedias.
+    
+    Args:
+        chunks (Iterable[bytes]): Bloques de la respuesta
+        key (str): Campo de primer nivel con los registros
+        size_hint (int): Tamaño esperado de la respuesta en bytes (ej: Content-Length)
+        meta (Dict): Si se indica, recibe los demás campos de primer nivel
+    
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (fechas int32, valores float64)
+    """
+    capacity = max(int(size_hint or 0) // BYTES_PER_RECORD_ESTIMATE, MIN_CAPACITY)
+    dates = np.empty(capacity, dtype=DATE_DTYPE)
+    values = np.empty(capacity, dtype=VALUE_DTYPE)
+    count = 0
+    
+    for batch in iter_array_batches(chunks, key, meta):
+        batch = [item for item in batch if isinstance(item, dict) and 'date' in item and 'value' in item]
+        size = len(batch)
+        if count + size > capacity:
+            capacity = max(capacity * 2, count + size)
+            dates.resize(capacity, refcheck=False)
+            values.resize(capacity, refcheck=False)
+        
+        dates[count:count + size] = dates_to_ordinals([item['date'] for item in batch])
+        values[count:count + size] = np.fromiter((float(item['value']) for item in batch), dtype=VALUE_DTYPE, count=size)
+        count += size
+    
+    dates.resize(count, refcheck=False)
+    values.resize(count, refcheck=False)
+    return dates, values
+
+
+# Funciones de conveniencia
+def parse_series_bytes(body: bytes, key: str = "data", meta: Dict = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convierte una respuesta de serie ya descargada en columnas NumPy.
+    
+    Args:
+        body (bytes): Cuerpo de la respuesta
+        key (str): Campo de primer nivel con los registros
+        meta (Dict): Si se indica, recibe los demás campos de primer nivel
+    
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (fechas int32, valores float64)
+    """
+    chunks = (body[i:i + STREAM_CHUNK_SIZE] for i in range(0, len(body), STREAM_CHUNK_SIZE))
+    return parse_series_stream(chunks, key, size_hint=len(body), meta=meta)
@@ -0,0 +1,174 @@
+# single_flight.py
+"""
+Single-flight request coalescing module for Global Yield Optimizer v3.0
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable
+
+
+# Segundos durante los que un valor se sirve sin consultar la fuente
+DEFAULT_FRESH_TTL = 60.0
+
+# Segundos adicionales durante los que un valor vencido se sirve mientras se refresca
+DEFAULT_MAX_STALE = 3600.0
+
+
+class _Call:
+    """Consulta en vuelo compartida por todos los que piden la misma clave."""
+    
+    __slots__ = ("event", "result", "error")
+    
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Agrupa las consultas concurrentes con la misma clave en una sola llamada a la
+    fuente y sirve el último valor válido mientras se refresca en segundo plano.
+    """
+    
+    def __init__(self, fresh_ttl: float = DEFAULT_FRESH_TTL, max_stale: float = DEFAULT_MAX_STALE):
+        """
+        Inicializa el grupo de consultas.
+        
+        Args:
+            fresh_ttl (float): Segundos durante los que un valor se considera vigente
+            max_stale (float): Segundos adicionales durante los que un valor vencido
+                se sirve de inmediato mientras se refresca (0 para desactivarlo)
+        """
+        self.fresh_ttl = fresh_ttl
+        self.max_stale = max_stale
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._values = {}
+        self._stats = {"fresh_hits": 0, "stale_hits": 0, "fetches": 0, "shared": 0}
+    
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Ejecuta fn una sola vez por clave entre los llamadores concurrentes.
+        
+        El primer llamador ejecuta la consulta; los que llegan mientras está en
+        vuelo esperan y reciben el mismo resultado (o la misma excepción).
+        
+        Args:
+            key (Hashable): Clave de la consulta
+            fn (Callable): Función que consulta la fuente
+            *args: Argumentos posicionales de fn
+            **kwargs: Argumentos por nombre de fn
+        
+        Returns:
+            Any: Resultado de fn
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._stats["fetches"] += 1
+            else:
+                self._stats["shared"] += 1
+        
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        
+        try:
+            call.result = fn(*args, **kwargs)
+            with self._lock:
+                self._values[key] = (call.result, time.monotonic())
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result
+    
+    def get(self, key: Hashable, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Obtiene un valor con stale-while-revalidate.
+        
+        Un valor vigente se devuelve sin consultar la fuente; uno vencido (dentro
+        de max_stale) se devuelve de inmediato y se lanza un refresco en segundo
+        plano; si no hay valor utilizable se consulta la fuente con do().
+        
+        Args:
+            key (Hashable): Clave de la consulta
+            fn (Callable): Función que consulta la fuente
+            *args: Argumentos posicionales de fn
+            **kwargs: Argumentos por nombre de fn
+        
+        Returns:
+            Any: Valor vigente, vencido o recién consultado
+        """
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is not None:
+                value, stored_at = entry
+                age = time.monotonic() - stored_at
+                if age < self.fresh_ttl:
+                    self._stats["fresh_hits"] += 1
+                    return value
+                if age < self.fresh_ttl + self.max_stale:
+                    self._stats["stale_hits"] += 1
+                    refresh = key not in self._calls
+                else:
+                    entry = None
+        
+        if entry is None:
+            return self.do(key, fn, *args, **kwargs)
+        
+        if refresh:
+            threading.Thread(
+                target=self._refresh,
+                args=(key, fn, args, kwargs),
+                name=f"refresh-{key}",
+                daemon=True
+            ).start()
+        return value
+    
+    def _refresh(self, key: Hashable, fn: Callable, args: tuple, kwargs: dict):
+        """
+        Refresca un valor en segundo plano, conservando el anterior si falla.
+        
+        Args:
+            key (Hashable): Clave de la consulta
+            fn (Callable): Función que consulta la fuente
+            args (tuple): Argumentos posicionales de fn
+            kwargs (dict): Argumentos por nombre de fn
+        """
+        try:
+            self.do(key, fn, *args, **kwargs)
+        except Exception as e:
+            print(f"Error al refrescar {key} en segundo plano: {e}")
+    
+    def forget(self, key: Hashable = None):
+        """
+        Descarta el valor guardado de una clave, o de todas si no se indica.
+        
+        Args:
+            key (Hashable): Clave a descartar (opcional)
+        """
+        with self._lock:
+            if key is None:
+                self._values.clear()
+            else:
+                self._values.pop(key, None)
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        Obtiene las estadísticas del grupo.
+        
+        Returns:
+            Dict[str, int]: Aciertos vigentes y vencidos, consultas a la fuente
+                y llamadas que compartieron una consulta en vuelo
+        """
+        with self._lock:
+            return dict(self._stats)
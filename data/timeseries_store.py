@@ -0,0 +1,350 @@
+# timeseries_store.py
+"""
+Columnar time series store module for Global Yield Optimizer v3.0
+"""
+import os
+import tempfile
+import numpy as np
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Tuple
+
+
+DEFAULT_STORE_PATH = "rag_memory/timeseries"
+
+# Tipos de las columnas: fecha como ordinal de día (date.toordinal) y valor
+DATE_DTYPE = np.int32
+VALUE_DTYPE = np.float64
+
+# Ordinal de 1970-01-01, origen de numpy.datetime64
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def to_day_ordinal(value) -> int:
+    """
+    Convierte una fecha a su ordinal de día.
+    
+    Args:
+        value: Fecha como str (YYYY-MM-DD), date o datetime
+    
+    Returns:
+        int: Ordinal de día (date.toordinal)
+    """
+    if isinstance(value, datetime):
+        return value.date().toordinal()
+    if isinstance(value, date):
+        return value.toordinal()
+    return date.fromisoformat(value[:10]).toordinal()
+
+
+def dates_to_ordinals(values: List[str]) -> np.ndarray:
+    """
+    Convierte fechas en formato YYYY-MM-DD a ordinales de día de forma vectorizada.
+    
+    Args:
+        values (List[str]): Fechas (se ignora cualquier parte de hora)
+    
+    Returns:
+        np.ndarray: Ordinales de día (int32)
+    """
+    days = np.array([value[:10] for value in values], dtype="datetime64[D]")
+    return (days.astype(np.int64) + EPOCH_ORDINAL).astype(DATE_DTYPE)
+
+
+def from_day_ordinal(ordinal: int) -> str:
+    """
+    Convierte un ordinal de día a fecha en formato YYYY-MM-DD.
+    
+    Args:
+        ordinal (int): Ordinal de día
+    
+    Returns:
+        str: Fecha en formato YYYY-MM-DD
+    """
+    return date.fromordinal(int(ordinal)).strftime("%Y-%m-%d")
+
+
+def records_to_arrays(records: Iterable[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convierte registros {"date", "value"} (formato BanRep) en columnas NumPy.
+    
+    Args:
+        records (Iterable[Dict]): Registros con claves "date" y "value"
+    
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (fechas int32, valores float64)
+    """
+    records = [item for item in records if 'date' in item and 'value' in item]
+    dates = dates_to_ordinals([item['date'] for item in records])
+    values = np.fromiter((float(item['value']) for item in records), dtype=VALUE_DTYPE, count=len(records))
+    return dates, values
+
+
+class SeriesView:
+    """Vista columnar de una serie temporal (fechas y valores) sin copias."""
+    
+    __slots__ = ("series", "dates", "values")
+    
+    def __init__(self, series: str, dates: np.ndarray, values: np.ndarray):
+        """
+        Inicializa la vista.
+        
+        Args:
+            series (str): ID de la serie
+            dates (np.ndarray): Ordinales de día ordenados ascendentemente
+            values (np.ndarray): Valores alineados con las fechas
+        """
+        self.series = series
+        self.dates = dates
+        self.values = values
+    
+    def __len__(self):
+        return len(self.dates)
+    
+    def slice(self, start=None, end=None) -> "SeriesView":
+        """
+        Obtiene el rango [start, end] por búsqueda binaria, sin copiar datos.
+        
+        Args:
+            start: Fecha inicial incluida (str, date o ordinal, opcional)
+            end: Fecha final incluida (str, date o ordinal, opcional)
+        
+        Returns:
+            SeriesView: Vista del rango solicitado
+        """
+        lo = 0
+        hi = len(self.dates)
+        if start is not None:
+            start = start if isinstance(start, (int, np.integer)) else to_day_ordinal(start)
+            lo = int(np.searchsorted(self.dates, start, side="left"))
+        if end is not None:
+            end = end if isinstance(end, (int, np.integer)) else to_day_ordinal(end)
+            hi = int(np.searchsorted(self.dates, end, side="right"))
+        return SeriesView(self.series, self.dates[lo:hi], self.values[lo:hi])
+    
+    def last(self, n: int) -> "SeriesView":
+        """
+        Obtiene las últimas n observaciones, sin copiar datos.
+        
+        Args:
+            n (int): Número de observaciones
+        
+        Returns:
+            SeriesView: Vista de las últimas observaciones (vacía si n <= 0)
+        """
+        # [-0:] seleccionaría la serie completa
+        start = max(len(self.dates) - max(n, 0), 0)
+        return SeriesView(self.series, self.dates[start:], self.values[start:])
+    
+    def to_records(self) -> List[Dict]:
+        """
+        Convierte la vista al formato de registros {"date", "value"}.
+        
+        Returns:
+            List[Dict]: Registros de la serie
+        """
+        return [
+            {"date": from_day_ordinal(ordinal), "value": float(value)}
+            for ordinal, value in zip(self.dates, self.values)
+        ]
+
+
+class TimeSeriesStore:
+    """Almacén columnar de series temporales en archivos .npy mapeables en memoria."""
+    
+    def __init__(self, root: str = DEFAULT_STORE_PATH):
+        """
+        Inicializa el almacén.
+        
+        Args:
+            root (str): Directorio donde se guardan las series
+        """
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+    
+    def _pointer_path(self, series: str) -> str:
+        """
+        Obtiene la ruta del archivo que apunta a la generación vigente de una serie.
+        
+        Args:
+            series (str): ID de la serie
+        
+        Returns:
+            str: Ruta del puntero
+        """
+        return os.path.join(self.root, f"{series}.current")
+    
+    def _paths(self, series: str, generation: int) -> Tuple[str, str]:
+        """
+        Obtiene las rutas de las columnas de una generación de la serie.
+        
+        Args:
+            series (str): ID de la serie
+            generation (int): Número de generación
+        
+        Returns:
+            Tuple[str, str]: (ruta_fechas, ruta_valores)
+        """
+        base = os.path.join(self.root, f"{series}.{generation}")
+        return f"{base}.dates.npy", f"{base}.values.npy"
+    
+    def _current_generation(self, series: str):
+        """
+        Lee la generación vigente de una serie.
+        
+        Args:
+            series (str): ID de la serie
+        
+        Returns:
+            int: Generación vigente, o None si la serie no existe
+        """
+        try:
+            with open(self._pointer_path(series)) as f:
+                return int(f.read().strip())
+        except FileNotFoundError:
+            return None
+    
+    def _replace_atomic(self, path: str, writer):
+        """
+        Escribe un archivo temporal y lo renombra sobre el destino.
+        
+        Args:
+            path (str): Ruta destino
+            writer: Función que recibe el archivo binario abierto y escribe el contenido
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                writer(f)
+            os.replace(tmp_path, path)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+    
+    def exists(self, series: str) -> bool:
+        """
+        Indica si una serie está almacenada.
+        
+        Args:
+            series (str): ID de la serie
+        
+        Returns:
+            bool: True si la serie existe
+        """
+        return self._current_generation(series) is not None
+    
+    def list_series(self) -> List[str]:
+        """
+        Lista las series almacenadas.
+        
+        Returns:
+            List[str]: IDs de las series
+        """
+        suffix = ".current"
+        return sorted(name[:-len(suffix)] for name in os.listdir(self.root) if name.endswith(suffix))
+    
+    def write(self, series: str, dates, values):
+        """
+        Reemplaza una serie completa. Las fechas se ordenan y, si se repiten,
+        se conserva el último valor recibido.
+        
+        Las columnas se escriben como una nueva generación y luego se cambia el
+        puntero de forma atómica, de modo que los lectores que tienen la serie
+        mapeada en memoria nunca ven fechas y valores de versiones distintas.
+        
+        Args:
+            series (str): ID de la serie
+            dates: Ordinales de día (array-like)
+            values: Valores alineados con las fechas (array-like)
+        """
+        dates = np.asarray(dates, dtype=DATE_DTYPE)
+        values = np.asarray(values, dtype=VALUE_DTYPE)
+        if dates.shape != values.shape:
+            raise ValueError(f"Fechas y valores de la serie {series} tienen tamaños distintos")
+        
+        order = np.argsort(dates, kind="stable")
+        dates = dates[order]
+        values = values[order]
+        keep = np.append(dates[1:] != dates[:-1], True) if len(dates) else np.ones(0, dtype=bool)
+        
+        previous = self._current_generation(series)
+        generation = (previous or 0) + 1
+        dates_path, values_path = self._paths(series, generation)
+        self._replace_atomic(dates_path, lambda f: np.save(f, dates[keep]))
+        self._replace_atomic(values_path, lambda f: np.save(f, values[keep]))
+        self._replace_atomic(self._pointer_path(series), lambda f: f.write(str(generation).encode()))
+        
+        # Los lectores que aún mapean la generación anterior conservan sus datos
+        if previous is not None:
+            for path in self._paths(series, previous):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+    
+    def write_records(self, series: str, records: Iterable[Dict]):
+        """
+        Reemplaza una serie a partir de registros {"date", "value"}.
+        
+        Args:
+            series (str): ID de la serie
+            records (Iterable[Dict]): Registros de la serie
+        """
+        self.write(series, *records_to_arrays(records))
+    
+    def append(self, series: str, dates, values):
+        """
+        Agrega observaciones a una serie; las fechas repetidas se actualizan.
+        
+        Args:
+            series (str): ID de la serie
+            dates: Ordinales de día (array-like)
+            values: Valores alineados con las fechas (array-like)
+        """
+        if self.exists(series):
+            current = self.load(series, mmap=False)
+            dates = np.concatenate([current.dates, np.asarray(dates, dtype=DATE_DTYPE)])
+            values = np.concatenate([current.values, np.asarray(values, dtype=VALUE_DTYPE)])
+        self.write(series, dates, values)
+    
+    def load(self, series: str, mmap: bool = True) -> SeriesView:
+        """
+        Carga una serie. Con mmap=True los arreglos se mapean en memoria, de modo
+        que la carga es casi instantánea y varios procesos comparten las páginas.
+        
+        Args:
+            series (str): ID de la serie
+            mmap (bool): Si True, mapea los archivos en lugar de leerlos
+        
+        Returns:
+            SeriesView: Vista de la serie completa
+        """
+        mode = "r" if mmap else None
+        for _ in range(3):
+            generation = self._current_generation(series)
+            if generation is None:
+                raise KeyError(f"La serie {series} no está almacenada")
+            dates_path, values_path = self._paths(series, generation)
+            try:
+                return SeriesView(
+                    series,
+                    np.load(dates_path, mmap_mode=mode),
+                    np.load(values_path, mmap_mode=mode)
+                )
+            except FileNotFoundError:
+                # Un escritor publicó una nueva generación entre la lectura del puntero y la carga
+                continue
+        raise KeyError(f"La serie {series} cambió durante la carga")
+    
+    def range(self, series: str, start=None, end=None) -> SeriesView:
+        """
+        Obtiene un rango de fechas de una serie en O(log n).
+        
+        Args:
+            series (str): ID de la serie
+            start: Fecha inicial incluida (opcional)
+            end: Fecha final incluida (opcional)
+        
+        Returns:
+            SeriesView: Vista del rango solicitado
+        """
+        return self.load(series).slice(start, end)
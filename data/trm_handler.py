@@ -2,72 +2,183 @@
 """
 TRM handler module for Global Yield Optimizer v3.0
 """
-import random  # Para simulación de datos
 import requests
 from datetime import datetime, timedelta
-from .banrep_api import BanRepAPI
+from .banrep_api import get_shared_api
+from .market_generator import get_market_generator
+from .single_flight import SingleFlight
+from .timeseries_store import from_day_ordinal
 
 
-def get_current_trm():
+# El TRM se publica una vez al día: se reutiliza 5 minutos y, vencido, se sirve
+# hasta un día mientras se refresca en segundo plano
+TRM_FRESH_TTL = 300.0
+TRM_MAX_STALE = 86400.0
+
+_trm_flight = SingleFlight(fresh_ttl=TRM_FRESH_TTL, max_stale=TRM_MAX_STALE)
+
+
+def _fetch_current_trm():
+    """
+    Consulta el TRM actual al Banco de la República.
+    
+    Returns:
+        float: Valor del TRM actual
+    """
+    api = get_shared_api()
+    trm_data = api.get_trm()
+    if trm_data and 'value' in trm_data:
+        return float(trm_data['value'])
+    raise ValueError("respuesta sin valor de TRM")
+
+
+def get_current_trm(strict=False):
     """
     Obtiene el TRM actual desde el Banco de la República.
     
+    Las llamadas concurrentes comparten una sola consulta a la API.
+    
+    Args:
+        strict (bool): Si True, propaga el error en lugar de devolver un valor simulado
+    
     Returns:
         float: Valor del TRM actual
     """
     # Obtener datos reales del Banco de la República
     try:
-        api = BanRepAPI()
-        trm_data = api.get_trm()
-        if trm_data and 'value' in trm_data:
-            return float(trm_data['value'])
+        return _trm_flight.get("latest", _fetch_current_trm)
     except Exception as e:
+        if strict:
+            raise
         print(f"Error al obtener TRM del Banco de la República: {e}")
     
     # Si hay error, usar datos simulados
+    return get_simulated_trm()
+
+
+def refresh_current_trm():
+    """
+    Consulta el TRM actual ignorando el valor reutilizable y lo actualiza para
+    los demás llamadores (usado por el servicio de refresco).
+    
+    Returns:
+        float: Valor del TRM actual
+    """
+    return _trm_flight.do("latest", _fetch_current_trm)
+
+
+def get_simulated_trm():
+    """
+    Genera un valor de TRM simulado basado en rangos históricos.
+    
+    Returns:
+        float: Valor del TRM simulado
+    """
     # El TRM históricamente ha estado entre 3500 y 5000 COP/USD
-    return round(random.uniform(3800, 4200), 2)
+    return get_market_generator("trm").uniform(3800, 4200)
 
 
-def get_trm_history(days=45):
+def sync_trm_history(portfolio, days=45):
     """
-    Obtiene el historial de TRM desde el Banco de la República.
+    Sincroniza incrementalmente la tabla trm_history con el Banco de la República.
+    
+    Solo se descargan los rangos que faltan en la tabla local: desde la última
+    fecha almacenada hasta hoy y, si el historial local es más corto que la
+    ventana pedida, el tramo anterior a la primera fecha almacenada.
     
     Args:
-        days (int): Número de días de historial a obtener
+        portfolio (Portfolio): Portfolio cuya tabla trm_history se sincroniza
+        days (int): Ventana mínima de historial (en días) a mantener localmente
     
     Returns:
-        list: Lista con valores históricos de TRM
+        int: Número de valores de TRM insertados o actualizados, o None si la
+            API no respondió para alguno de los rangos faltantes
     """
-    # Obtener datos históricos reales del Banco de la República
-    try:
-        api = BanRepAPI()
-        # Calcular fechas para obtener datos históricos
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days)
-        
-        trm_data = api.get_trm_history(
+    today = datetime.now().date()
+    window_start = today - timedelta(days=days)
+    first_date, last_date = portfolio.get_trm_date_range(until=today.strftime("%Y-%m-%d"))
+    
+    missing_ranges = []
+    if last_date is None:
+        missing_ranges.append((window_start, today))
+    else:
+        first_date = datetime.strptime(first_date, "%Y-%m-%d").date()
+        last_date = datetime.strptime(last_date, "%Y-%m-%d").date()
+        if first_date > window_start:
+            missing_ranges.append((window_start, first_date - timedelta(days=1)))
+        if last_date < today:
+            missing_ranges.append((last_date + timedelta(days=1), today))
+    
+    synced = 0
+    failed = False
+    api = get_shared_api()
+    for start_date, end_date in missing_ranges:
+        history = api.get_trm_history_arrays(
             start_date=start_date.strftime("%Y-%m-%d"),
             end_date=end_date.strftime("%Y-%m-%d")
         )
+        if history is None:
+            failed = True
+            continue
         
-        if trm_data and 'data' in trm_data:
-            # Extraer valores de la respuesta
-            values = [float(item['value']) for item in trm_data['data'] if 'value' in item]
-            return values
-    except Exception as e:
-        print(f"Error al obtener historial de TRM del Banco de la República: {e}")
+        dates, values = history
+        rows = [(from_day_ordinal(ordinal), float(value)) for ordinal, value in zip(dates, values)]
+        portfolio.upsert_trm_history(rows)
+        synced += len(rows)
     
-    # Si hay error, generar valores simulados
-    trm_values = []
-    base_value = 4000.0
+    return None if failed else synced
+
+
+def get_trm_history(days=45, portfolio=None, strict=False):
+    """
+    Obtiene el historial de TRM desde el Banco de la República.
     
-    for i in range(days):
-        # Variación aleatoria pequeña basada en volatilidad histórica del TRM
-        variation = random.uniform(-20, 20)
-        trm_values.append(round(base_value + variation, 2))
+    Args:
+        days (int): Número de días de historial a obtener
+        portfolio (Portfolio): Si se indica, el historial se sincroniza de forma
+            incremental y se sirve desde su tabla trm_history (opcional)
+        strict (bool): Si True, lanza ValueError en lugar de devolver una trayectoria simulada
     
-    return trm_values
+    Returns:
+        list: Lista con valores históricos de TRM
+    """
+    # Servir desde la tabla local cuando está disponible
+    api_failed = False
+    if portfolio is not None:
+        try:
+            api_failed = sync_trm_history(portfolio, days) is None
+            values = portfolio.get_trm_values(days, until=datetime.now().strftime("%Y-%m-%d"))
+            if len(values) >= days:
+                return values
+        except Exception as e:
+            print(f"Error al sincronizar historial local de TRM: {e}")
+            api_failed = True
+    
+    # Obtener datos históricos reales del Banco de la República, salvo que la
+    # sincronización acabe de fallar: repetir la consulta fallaría igual
+    if not api_failed:
+        try:
+            api = get_shared_api()
+            # Calcular fechas para obtener datos históricos
+            end_date = datetime.now()
+            start_date = end_date - timedelta(days=days)
+            
+            history = api.get_trm_history_arrays(
+                start_date=start_date.strftime("%Y-%m-%d"),
+                end_date=end_date.strftime("%Y-%m-%d")
+            )
+            
+            if history is not None:
+                # La respuesta se decodifica por bloques directamente en arreglos NumPy
+                return history[1].tolist()
+        except Exception as e:
+            print(f"Error al obtener historial de TRM del Banco de la República: {e}")
+    
+    if strict:
+        raise ValueError("historial de TRM no disponible en el Banco de la República")
+    
+    # Si hay error, generar una trayectoria simulada con la volatilidad histórica del TRM
+    return get_market_generator().trm_paths(days)[0].tolist()
 
 
 def get_trm_on_date(date):
@@ -82,7 +193,7 @@ def get_trm_on_date(date):
     """
     # Obtener datos reales del Banco de la República para una fecha específica
     try:
-        api = BanRepAPI()
+        api = get_shared_api()
         trm_data = api.get_trm(date)
         if trm_data and 'value' in trm_data:
             return float(trm_data['value'])
@@ -90,7 +201,7 @@ def get_trm_on_date(date):
         print(f"Error al obtener TRM del Banco de la República para fecha {date}: {e}")
     
     # Si hay error, devolver un valor simulado
-    return round(random.uniform(3800, 4200), 2)
+    return get_simulated_trm()
 
 
 def fetch_trm_from_banrep(start_date=None, end_date=None):
@@ -105,7 +216,7 @@ def fetch_trm_from_banrep(start_date=None, end_date=None):
         dict: Datos de TRM con fechas y valores
     """
     try:
-        api = BanRepAPI()
+        api = get_shared_api()
         return api.get_trm_history(start_date, end_date)
     except Exception as e:
         print(f"Error al obtener datos del Banco de la República: {e}")
@@ -135,22 +246,17 @@ def generate_simulated_trm_data(start_date=None, end_date=None):
         else:
             end_date = datetime.now()
     
-    # Generar datos simulados
-    data = []
-    current_date = start_date
-    base_value = 4000.0
+    # Generar toda la trayectoria simulada de una vez
+    n_days = (end_date - start_date).days + 1
+    values = get_market_generator().trm_paths(max(n_days, 0))[0].tolist()
     
-    while current_date <= end_date:
-        # Variación basada en volatilidad histórica del TRM
-        variation = random.uniform(-20, 20)
-        value = round(base_value + variation, 2)
-        
-        data.append({
-            "date": current_date.strftime("%Y-%m-%d"),
+    data = [
+        {
+            "date": (start_date + timedelta(days=i)).strftime("%Y-%m-%d"),
             "value": value
-        })
-        
-        current_date += timedelta(days=1)
+        }
+        for i, value in enumerate(values)
+    ]
     
     return {
         "series_id": "TRM",
@@ -3,19 +3,25 @@
 Main entry point for Global Yield Optimizer v3.0
 """
 import argparse
-from core.portfolio import Portfolio
-from core.rag_agent import RAGInvestmentAgent
-from simulation.simulator import YieldSimulator
-from chromadb import Client
+import os
+import subprocess
+import sys
+import time
+
+# Las dependencias pesadas (chromadb, sentence_transformers, pandas, numpy) se
+# importan dentro de cada modo, para que los modos livianos arranquen rápido
+
+# Número de módulos que muestra --import-profile
+IMPORT_PROFILE_TOP = 20
 
 
 def main():
     parser = argparse.ArgumentParser(description="Global Yield Optimizer v3.0")
     parser.add_argument(
         "--mode", 
-        choices=["simulate", "dashboard", "train"], 
+        choices=["simulate", "dashboard", "train", "refresh"], 
         default="simulate",
-        help="Modo de ejecución: simulate, dashboard, o train"
+        help="Modo de ejecución: simulate, dashboard, train o refresh"
     )
     parser.add_argument(
         "--months", 
@@ -23,23 +29,55 @@ def main():
         default=12,
         help="Número de meses para simular (solo en modo simulate)"
     )
+    parser.add_argument(
+        "--once",
+        action="store_true",
+        help="Refrescar todas las fuentes una sola vez y salir (solo en modo refresh)"
+    )
+    parser.add_argument(
+        "--write-behind",
+        action="store_true",
+        help="Escribir en el portfolio desde un hilo en segundo plano, sin esperar cada escritura (solo en modo simulate)"
+    )
+    parser.add_argument(
+        "--import-profile",
+        action="store_true",
+        help="Ejecutar el modo indicado y mostrar los módulos que más tardan en importarse"
+    )
     
     args = parser.parse_args()
     
+    if args.import_profile:
+        argv = [arg for arg in sys.argv[1:] if arg != "--import-profile"]
+        sys.exit(run_import_profile(argv))
+    
     if args.mode == "simulate":
-        run_simulation(args.months)
+        run_simulation(args.months, args.write_behind)
     elif args.mode == "dashboard":
         run_dashboard()
     elif args.mode == "train":
         run_training()
+    elif args.mode == "refresh":
+        run_refresh(args.once)
 
 
-def run_simulation(months=12):
-    """Ejecuta la simulación por un número especificado de meses."""
+def run_simulation(months=12, write_behind=False):
+    """
+    Ejecuta la simulación por un número especificado de meses.
+    
+    Args:
+        months (int): Número de meses a simular
+        write_behind (bool): Si True, el portfolio escribe desde un hilo en segundo plano
+    """
     print("🚀 Iniciando Global Yield Optimizer v3.0 - Modo Simulación")
     
+    from chromadb import Client
+    from core.portfolio import Portfolio
+    from core.rag_agent import RAGInvestmentAgent
+    from simulation.simulator import YieldSimulator
+    
     # Inicializar componentes
-    portfolio = Portfolio()
+    portfolio = Portfolio(write_behind=write_behind)
     chroma_client = Client()
     rag_agent = RAGInvestmentAgent(chroma_client)
     simulator = YieldSimulator(portfolio)
@@ -47,6 +85,7 @@ def run_simulation(months=12):
     # Ejecutar simulación mensual
     for _ in range(months):
         simulator.run_monthly_simulation(rag_agent)
+    portfolio.close()
     
     print(f"✅ Simulación completada por {months} meses")
 
@@ -57,6 +96,30 @@ def run_dashboard():
     print("Ejecuta: streamlit run dashboard/app.py")
 
 
+def run_refresh(once=False):
+    """
+    Ejecuta el servicio de refresco de datos de mercado.
+    
+    Args:
+        once (bool): Si True, refresca todas las fuentes una vez y termina
+    """
+    print("🔄 Iniciando servicio de refresco de datos de mercado...")
+    
+    from core.portfolio import Portfolio
+    from data.refresh_daemon import RefreshDaemon
+    from data.timeseries_store import TimeSeriesStore
+    
+    portfolio = Portfolio()
+    daemon = RefreshDaemon(portfolio=portfolio, store=TimeSeriesStore())
+    
+    try:
+        daemon.run(max_cycles=1 if once else None)
+    except KeyboardInterrupt:
+        print("⏹️ Servicio de refresco detenido")
+    finally:
+        portfolio.close()
+
+
 def run_training():
     """Ejecuta el entrenamiento del agente RAG."""
     print("🤖 Iniciando entrenamiento del agente RAG...")
@@ -64,5 +127,63 @@ def run_training():
     # con datos históricos y feedback
 
 
+def parse_import_times(lines):
+    """
+    Interpreta la salida de python -X importtime.
+    
+    Args:
+        lines (list): Líneas de la salida de error del proceso
+    
+    Returns:
+        list: Tuplas (módulo, tiempo propio en ms, tiempo acumulado en ms)
+    """
+    imports = []
+    for line in lines:
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # Encabezado de la tabla
+        # El nombre conserva la sangría que indica el anidamiento de la importación
+        imports.append((fields[2][1:].rstrip(), int(fields[0]) / 1000, int(fields[1]) / 1000))
+    return imports
+
+
+def run_import_profile(argv, top=IMPORT_PROFILE_TOP):
+    """
+    Ejecuta main.py en un subproceso con -X importtime y muestra los módulos más lentos de importar.
+    
+    Args:
+        argv (list): Argumentos con los que se ejecuta el modo a perfilar
+        top (int): Número de módulos a mostrar
+    
+    Returns:
+        int: Código de salida del subproceso
+    """
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", os.path.abspath(__file__)] + argv,
+        stderr=subprocess.PIPE,
+        text=True
+    )
+    elapsed = time.perf_counter() - started
+    
+    lines = result.stderr.splitlines()
+    # Los errores del modo se muestran tal cual
+    for line in lines:
+        if not line.startswith("import time:"):
+            print(line, file=sys.stderr)
+    
+    imports = parse_import_times(lines)
+    top_level = [item for item in imports if not item[0].startswith(" ")]
+    total = sum(cumulative for _, _, cumulative in top_level)
+    
+    print(f"\n⏱️ Importaciones: {total:.1f} ms de {elapsed * 1000:.1f} ms totales ({len(imports)} módulos)")
+    print(f"{'Acumulado (ms)':>15} {'Propio (ms)':>12}  Módulo")
+    for name, own, cumulative in sorted(imports, key=lambda item: item[2], reverse=True)[:top]:
+        print(f"{cumulative:>15.1f} {own:>12.1f}  {name.strip()}")
+    return result.returncode
+
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -5,12 +5,12 @@ Simulation module for Global Yield Optimizer v3.0
 import random
 from datetime import datetime, timedelta
 from core.portfolio import Portfolio
-from core.strategy import get_investment_recommendation, calculate_real_return
-from core.indicators import calculate_sma
+from core.strategy import get_snapshot_recommendation, calculate_real_return
+from core.indicators import calculate_sma, calculate_signals
 from data.rate_scraper import scrape_bank_rates, get_best_rate, fetch_banrep_indicator
 from data.trm_handler import get_current_trm, get_trm_history, fetch_trm_from_banrep
 from data.inflation_tracker import get_current_inflation, fetch_colombian_inflation_from_banrep
-from data.financial_data_provider import get_financial_data, get_best_investments
+from data.market_snapshot import get_market_snapshot
 from data.cdt_scraper import get_cdt_rates, get_best_cdt_rate
 from data.etf_scraper import get_etf_rates, get_best_etf_rate
 
@@ -35,19 +35,23 @@ class YieldSimulator:
         """
         print(f"\n--- Simulación del Mes {self.current_month} ---")
         
-        # 1. Obtener datos financieros completos
-        financial_data = get_financial_data()
-        best_investments = get_best_investments()
+        # 1. Obtener una única fotografía del mercado para todo el mes (la
+        # publicada por el servicio de refresco si es reciente)
+        snapshot = get_market_snapshot(history_days=45, portfolio=self.portfolio)
+        best_investments = snapshot.best_investments
         
-        current_trm = financial_data["trm"]
-        trm_history = get_trm_history(45)
-        sma_45 = calculate_sma(trm_history, 45)
-        inflation_data = financial_data["inflation_rates"]
+        current_trm = snapshot.trm
+        sma_45 = calculate_sma(snapshot.trm_history, 45)
+        trm_signals = calculate_signals(snapshot.trm_history)
+        inflation_data = snapshot.inflation_rates
         
         inf_co = inflation_data["Colombia"]
         
         print(f"TRM actual: {current_trm}")
         print(f"SMA45 TRM: {sma_45:.2f}")
+        if None not in trm_signals.values():
+            print(f"RSI TRM: {trm_signals['rsi']:.2f} | Z-score: {trm_signals['zscore']:.2f} | "
+                  f"Volatilidad: {trm_signals['volatility']:.2f}% | ROC: {trm_signals['roc']:.2f}%")
         print(f"Inflación Colombia: {inf_co}%")
         print(f"Inflación EE.UU.: {inflation_data['USA']}%")
         print(f"Inflación Panamá: {inflation_data['Panama']}%")
@@ -61,15 +65,14 @@ class YieldSimulator:
             print(f"  Mejor CDT: {best_cdt['bank']} - {best_cdt['rate']}%")
             print(f"  Mejor ETF: {best_etf['symbol']} - {best_etf['details']['rate']}%")
         
-        # 2. Obtener tasas de bancos (método existente para compatibilidad)
-        bank_rates = scrape_bank_rates()
-        best_bank, best_rate_co = get_best_rate(bank_rates, "COP")
+        # 2. Tasas de bancos (método existente para compatibilidad)
+        bank_rates = snapshot.bank_rates
+        best_bank, best_rate_co = snapshot.best_bank_rate("COP")
         print(f"\nMejor tasa en COP (bancos): {best_rate_co}% ({best_bank})")
         
         # 3. Obtener recomendación de inversión usando el agente RAG
-        recommendation = get_investment_recommendation(
-            current_trm, sma_45, inf_co, best_rate_co, 
-            self.current_month, rag_agent
+        recommendation = get_snapshot_recommendation(
+            snapshot, sma_45, self.current_month, rag_agent, trm_signals
         )
         print(f"Recomendación: {recommendation}")
         
@@ -77,67 +80,44 @@ class YieldSimulator:
         investment_result = self._execute_investment(best_bank, best_rate_co, inf_co)
         print(f"Inversión ejecutada: {investment_result}")
         
-        # 5. Registrar en portfolio
-        self.portfolio.record_investment(
-            month=self.current_month,
-            amount=investment_result['amount'],
-            currency=investment_result['currency'],
-            instrument=investment_result['instrument'],
-            nominal_rate=investment_result['nominal_rate'],
-            real_rate=investment_result['real_rate'],
-            start_date=investment_result['start_date'],
-            end_date=investment_result['end_date']
-        )
-        
-        # 6. Registrar datos en base de datos
+        # 5 y 6. Registrar la inversión y los datos del mes en una sola transacción
+        month = self.current_month
+        bank_rate_rows = []
         for bank, rates in bank_rates.items():
-            self.portfolio.record_bank_rate(
-                month=self.current_month,
-                bank=bank,
-                currency="COP",
-                nominal_rate=rates["COP"]
-            )
-            self.portfolio.record_bank_rate(
-                month=self.current_month,
-                bank=bank,
-                currency="USD",
-                nominal_rate=rates["USD"]
-            )
-        
-        # Registrar inflación de países relevantes
-        for country, inflation_rate in inflation_data.items():
-            self.portfolio.record_inflation_rate(
-                month=self.current_month,
-                country=country,
-                inflation_rate=inflation_rate
-            )
+            bank_rate_rows.append((month, bank, "COP", rates["COP"]))
+            bank_rate_rows.append((month, bank, "USD", rates["USD"]))
         
-        self.portfolio.record_trm(
-            date=self.simulation_date.strftime("%Y-%m-%d"),
-            trm_value=current_trm
-        )
-        
-        # Registrar tasas de CDTs
-        cdt_rates = financial_data["cdt_rates"]
-        for country, banks in cdt_rates.items():
+        # Tasas de CDTs
+        for country, banks in snapshot.cdt_rates.items():
             for bank, rate in banks.items():
-                self.portfolio.record_bank_rate(
-                    month=self.current_month,
-                    bank=f"{country}:{bank}",
-                    currency="COP" if country == "Colombia" else "USD",
-                    nominal_rate=rate
-                )
-        
-        # Registrar tasas de ETFs
-        etf_rates = financial_data["etf_rates"]
-        for country, etfs in etf_rates.items():
+                bank_rate_rows.append((month, f"{country}:{bank}", "COP" if country == "Colombia" else "USD", rate))
+        
+        # Tasas de ETFs
+        for country, etfs in snapshot.etf_rates.items():
             for symbol, details in etfs.items():
-                self.portfolio.record_bank_rate(
-                    month=self.current_month,
-                    bank=f"{country}:ETF:{symbol}",
-                    currency=details["currency"],
-                    nominal_rate=details["rate"]
-                )
+                bank_rate_rows.append((month, f"{country}:ETF:{symbol}", details["currency"], details["rate"]))
+        
+        with self.portfolio.transaction():
+            self.portfolio.record_investment(
+                month=month,
+                amount=investment_result['amount'],
+                currency=investment_result['currency'],
+                instrument=investment_result['instrument'],
+                nominal_rate=investment_result['nominal_rate'],
+                real_rate=investment_result['real_rate'],
+                start_date=investment_result['start_date'],
+                end_date=investment_result['end_date']
+            )
+            self.portfolio.record_bank_rates_bulk(bank_rate_rows)
+            # Inflación de países relevantes
+            self.portfolio.record_inflation_rates_bulk(
+                [(month, country, inflation_rate) for country, inflation_rate in inflation_data.items()]
+            )
+            # Fuera de trm_history: la fecha simulada puede ser futura y la TRM simulada
+            self.portfolio.record_simulation_trm(
+                date=self.simulation_date.strftime("%Y-%m-%d"),
+                trm_value=current_trm
+            )
         
         # 7. Registrar decisión en memoria RAG
         decision_text = f"MES {self.current_month}: {recommendation} porque TRM={'{:.2f}'.format(current_trm)} > SMA45={'{:.2f}'.format(sma_45)} y rentabilidad real={'{:.2f}'.format(investment_result['real_rate'])}%"
@@ -165,6 +145,7 @@ class YieldSimulator:
             "macro_data": {
                 "trm": current_trm,
                 "sma45": sma_45,
+                "trm_signals": trm_signals,
                 "inflation_data": inflation_data,
                 "best_rate_co": best_rate_co,
                 "best_investments": best_investments
@@ -0,0 +1,115 @@
+# test_banrep_async.py
+"""
+Tests for the asyncio BanRep client against a local stub server
+"""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.banrep_async import AsyncBanRepAPI
+from data.banrep_cache import BanRepCache
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Responde según las reglas del servidor: N respuestas 503 y luego un cuerpo fijo por ruta."""
+    
+    def do_GET(self):
+        server = self.server
+        path = self.path.split("?")[0]
+        with server.lock:
+            server.requests.append(path)
+            failures = server.failures.get(path, 0)
+            if failures:
+                server.failures[path] = failures - 1
+        
+        if failures:
+            status, body = 503, b""
+        else:
+            status, body = 200, server.bodies.get(path, b"{}")
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+class AsyncBanRepAPITest(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        self.server.lock = threading.Lock()
+        self.server.requests = []
+        self.server.failures = {}
+        self.server.bodies = {
+            "/series/TRM/latest": json.dumps({"value": 4000.5, "date": "2025-01-02"}).encode(),
+            "/series/IPC/latest": b"<html>mantenimiento</html>"
+        }
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache = BanRepCache(os.path.join(self.tmpdir.name, "cache.db"))
+    
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.cache.close()
+        self.tmpdir.cleanup()
+    
+    def _run(self, coroutine_factory, **kwargs):
+        """Ejecuta una corrutina con un cliente nuevo apuntando al servidor local."""
+        async def main():
+            async with AsyncBanRepAPI(base_url=self.base_url, backoff_factor=0.01, **kwargs) as api:
+                return await coroutine_factory(api)
+        return asyncio.run(main())
+    
+    def test_retries_on_503(self):
+        self.server.failures["/series/TRM/latest"] = 2
+        
+        data = self._run(lambda api: api.get_trm(), max_retries=3)
+        
+        self.assertEqual(data["value"], 4000.5)
+        self.assertEqual(self.server.requests.count("/series/TRM/latest"), 3)
+    
+    def test_gives_up_after_max_retries(self):
+        self.server.failures["/series/TRM/latest"] = 5
+        
+        data = self._run(lambda api: api.get_trm(), max_retries=1)
+        
+        self.assertIsNone(data)
+        self.assertEqual(self.server.requests.count("/series/TRM/latest"), 2)
+    
+    def test_cache_hit_skips_network(self):
+        first = self._run(lambda api: api.get_trm(), cache=self.cache)
+        second = self._run(lambda api: api.get_trm(), cache=self.cache)
+        
+        self.assertEqual(first, second)
+        self.assertEqual(self.server.requests.count("/series/TRM/latest"), 1)
+    
+    def test_offline_serves_cache_only(self):
+        self._run(lambda api: api.get_trm(), cache=self.cache)
+        
+        cached = self._run(lambda api: api.get_trm(), cache=self.cache, offline=True)
+        missing = self._run(lambda api: api.get_interest_rate(), cache=self.cache, offline=True)
+        
+        self.assertEqual(cached["value"], 4000.5)
+        self.assertIsNone(missing)
+        self.assertEqual(len(self.server.requests), 1)
+    
+    def test_malformed_body_returns_none(self):
+        data = self._run(lambda api: api.get_inflation(), cache=self.cache)
+        
+        self.assertIsNone(data)
+        self.assertEqual(self.server.requests.count("/series/IPC/latest"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
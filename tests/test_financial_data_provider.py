@@ -0,0 +1,45 @@
+# test_financial_data_provider.py
+"""
+Tests for the concurrent financial data provider
+"""
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.cdt_scraper import register_cdt_sources
+from data.financial_data_provider import FinancialDataProvider
+from data.rate_sources import RateSource, get_rate_registry
+
+
+def _failing():
+    raise ValueError("fuente caída")
+
+
+class ConcurrentProviderFallbackTest(unittest.TestCase):
+    def setUp(self):
+        # TRM e inflación responden; solo falla la fuente de CDTs de Colombia
+        patches = [
+            mock.patch("data.financial_data_provider.get_current_trm", return_value=4000.0),
+            mock.patch("data.financial_data_provider.get_current_inflation", return_value=5.0)
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        get_rate_registry().register(RateSource("cdt.colombia", "cdt", "Colombia", _failing))
+        self.addCleanup(register_cdt_sources)
+    
+    def test_failed_cdt_source_is_reported_as_fallback(self):
+        provider = FinancialDataProvider(concurrent=True)
+        
+        data = provider.get_macro_data()
+        
+        self.assertEqual(provider.fallback_sources, ["cdt (Colombia)"])
+        self.assertTrue(data["cdt_rates"]["Colombia"])
+        self.assertEqual(data["trm"], 4000.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+# test_indicators.py
+"""
+Tests for the batched NumPy indicator kernels against the per-call indicators
+"""
+import os
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.indicators import batch_ema, batch_macd, batch_sma, calculate_macd, calculate_sma
+
+
+class BatchIndicatorTest(unittest.TestCase):
+    def setUp(self):
+        # Tres series tipo TRM (caminatas aleatorias) de 120 instantes
+        rng = np.random.default_rng(16)
+        self.series = 4000 + rng.normal(0, 20, size=(3, 120)).cumsum(axis=1)
+    
+    def test_batch_sma_matches_calculate_sma(self):
+        windows = [1, 5, 20]
+        result = batch_sma(self.series, windows)
+        
+        self.assertEqual(result.shape, (3, 3, 120))
+        for i, window in enumerate(windows):
+            for s, series in enumerate(self.series):
+                self.assertTrue(np.isnan(result[i, s, :window - 1]).all())
+                expected = [calculate_sma(list(series[:t + 1]), window) for t in range(window - 1, 120)]
+                self.assertTrue(np.allclose(result[i, s, window - 1:], expected))
+    
+    def test_batch_sma_window_longer_than_series_is_nan(self):
+        self.assertTrue(np.isnan(batch_sma(self.series[0], [200])).all())
+    
+    def test_batch_ema_matches_pandas_ewm(self):
+        spans = [1, 12, 26]
+        result = batch_ema(self.series, spans)
+        
+        for i, span in enumerate(spans):
+            for s, series in enumerate(self.series):
+                expected = pd.Series(series).ewm(span=span).mean().to_numpy()
+                self.assertTrue(np.allclose(result[i, s], expected))
+    
+    def test_batch_macd_matches_calculate_macd(self):
+        periods = [(12, 26, 9), (5, 35, 5)]
+        macd_line, signal_line, histogram = batch_macd(self.series, periods)
+        
+        for p, (fast, slow, signal) in enumerate(periods):
+            for s, series in enumerate(self.series):
+                for t in (0, 1, 30, 119):
+                    expected = calculate_macd(list(series[:t + 1]), fast, slow, signal)
+                    actual = (macd_line[p, s, t], signal_line[p, s, t], histogram[p, s, t])
+                    self.assertTrue(np.allclose(actual, expected), (fast, slow, signal, t))
+
+
+if __name__ == "__main__":
+    unittest.main()
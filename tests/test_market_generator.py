@@ -0,0 +1,62 @@
+# test_market_generator.py
+"""
+Tests for the seeded synthetic market generator
+"""
+import os
+import sys
+import unittest
+from unittest import mock
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data import inflation_tracker
+from data.financial_data_provider import FinancialDataProvider
+from data.market_generator import MarketGenerator, get_market_generator, seed_market_generator
+
+
+def _colombia_from_api(country, strict=False):
+    """Inflación de Colombia fija (sin consultar la API); el resto de países se simula."""
+    if country == "Colombia":
+        return 5.0
+    return inflation_tracker.get_current_inflation(country, strict=strict)
+
+
+class MarketGeneratorSeedTest(unittest.TestCase):
+    def setUp(self):
+        patches = [
+            mock.patch("data.financial_data_provider.get_current_trm", return_value=4000.0),
+            mock.patch("data.financial_data_provider.get_current_inflation", side_effect=_colombia_from_api)
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.addCleanup(seed_market_generator, None)
+    
+    def test_seed_reproduces_concurrent_provider_output(self):
+        outputs = []
+        for _ in range(2):
+            seed_market_generator(42)
+            outputs.append(FinancialDataProvider(concurrent=True).get_macro_data())
+        
+        self.assertEqual(outputs[0], outputs[1])
+    
+    def test_streams_do_not_depend_on_draw_order(self):
+        seed_market_generator(7)
+        first = get_market_generator("etf.usa").uniform(0, 1, size=4).tolist()
+        
+        seed_market_generator(7)
+        get_market_generator().uniform(0, 1, size=10)
+        get_market_generator("etf.colombia").uniform(0, 1, size=10)
+        second = get_market_generator("etf.usa").uniform(0, 1, size=4).tolist()
+        
+        self.assertEqual(first, second)
+    
+    def test_seeded_generator_matches_numpy_default_rng(self):
+        expected = np.round(np.random.default_rng(3).uniform(0, 1, 5), 2).tolist()
+        self.assertEqual(MarketGenerator(3).uniform(0, 1, size=5).tolist(), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
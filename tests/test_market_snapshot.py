@@ -0,0 +1,70 @@
+# test_market_snapshot.py
+"""
+Tests for building and publishing market snapshots
+"""
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.cdt_scraper import register_cdt_sources
+from data.etf_scraper import register_etf_sources
+from data.financial_data_provider import IncompleteMarketData
+from data.market_snapshot import build_market_snapshot
+from data.rate_sources import RateSource, get_rate_registry
+from data.refresh_daemon import RefreshDaemon
+
+
+def _failing():
+    raise ValueError("fuente caída")
+
+
+class StrictSnapshotTest(unittest.TestCase):
+    def setUp(self):
+        # Solo fallan las fuentes de tasas que registra cada prueba
+        patches = [
+            mock.patch("data.financial_data_provider.get_current_trm", return_value=4000.0),
+            mock.patch("data.financial_data_provider.get_current_inflation", return_value=5.0),
+            mock.patch("data.market_snapshot.get_trm_history", return_value=[4000.0] * 45)
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.addCleanup(register_cdt_sources)
+        self.addCleanup(register_etf_sources)
+    
+    def test_complete_data_builds_strict_snapshot(self):
+        snapshot = build_market_snapshot(strict=True)
+        
+        self.assertEqual(snapshot.trm, 4000.0)
+    
+    def test_failing_rate_source_raises_in_strict_mode(self):
+        for kind in ("cdt", "etf"):
+            with self.subTest(kind=kind):
+                register_cdt_sources()
+                register_etf_sources()
+                get_rate_registry().register(RateSource(f"{kind}.usa", kind, "USA", _failing))
+                
+                with self.assertRaises(IncompleteMarketData) as raised:
+                    build_market_snapshot(strict=True)
+                self.assertEqual(raised.exception.sources, [f"{kind} (USA)"])
+                
+                # Sin modo estricto la fotografía se completa con datos de respaldo
+                self.assertTrue(getattr(build_market_snapshot(), f"{kind}_rates")["USA"])
+    
+    def test_daemon_does_not_publish_fallback_data(self):
+        get_rate_registry().register(RateSource("cdt.usa", "cdt", "USA", _failing))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "market_snapshot.json")
+            daemon = RefreshDaemon(snapshot_path=path)
+            
+            with self.assertRaises(IncompleteMarketData):
+                daemon.publish()
+            self.assertFalse(os.path.exists(path))
+
+
+if __name__ == "__main__":
+    unittest.main()
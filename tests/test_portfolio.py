@@ -0,0 +1,57 @@
+# test_portfolio.py
+"""
+Tests for the SQLite portfolio store
+"""
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.portfolio import Portfolio
+
+
+class PortfolioWriteTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "portfolio.db")
+        self.portfolio = Portfolio(self.db_path)
+    
+    def tearDown(self):
+        self.portfolio.close()
+        self.tmpdir.cleanup()
+    
+    def test_failed_write_is_rolled_back(self):
+        # El banco se interna antes de que falle el enlace de la tasa, así que
+        # la transacción ya está abierta cuando se produce el error
+        with self.assertRaises(Exception):
+            self.portfolio.record_bank_rate(1, "Banco Fallido", "COP", object())
+        
+        self.assertFalse(self.portfolio._connect().in_transaction)
+        
+        # Otra conexión puede escribir sin esperar el bloqueo
+        other = Portfolio(self.db_path)
+        try:
+            other.record_bank_rate(1, "Bancolombia", "COP", 10.5)
+        finally:
+            other.close()
+        
+        self.portfolio.record_bank_rate(2, "Davivienda", "COP", 11.0)
+        # La clave del banco revertido no llega a la caché al confirmar la siguiente escritura
+        self.assertNotIn(("instruments", "Banco Fallido"), self.portfolio._dimension_ids)
+        rates = {(row[1], row[0]) for row in self.portfolio.get_bank_rates()}
+        self.assertEqual(rates, {("Bancolombia", 1), ("Davivienda", 2)})
+    
+    def test_failed_write_inside_transaction_rolls_back_block(self):
+        with self.assertRaises(Exception):
+            with self.portfolio.transaction():
+                self.portfolio.record_bank_rate(1, "Bancolombia", "COP", 10.5)
+                self.portfolio.record_bank_rate(1, "Banco Fallido", "COP", object())
+        
+        self.assertFalse(self.portfolio._connect().in_transaction)
+        self.assertEqual(self.portfolio.get_bank_rates(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
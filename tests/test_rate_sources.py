@@ -0,0 +1,58 @@
+# test_rate_sources.py
+"""
+Tests for the rate source registry and its circuit breakers
+"""
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.rate_sources import RateSource, RateSourceRegistry
+
+
+def _failing():
+    raise ValueError("fuente caída")
+
+
+class RateSourceRegistryTest(unittest.TestCase):
+    def test_queued_sources_are_timed_from_their_start(self):
+        registry = RateSourceRegistry(max_workers=2)
+        for i in range(4):
+            registry.register(RateSource(
+                f"lenta{i}", "cdt", "Colombia", lambda i=i: time.sleep(0.3) or {f"Banco {i}": 10.0}, timeout=0.5
+            ))
+        
+        rates = registry.fetch("cdt", "Colombia")
+        
+        self.assertEqual(len(rates), 4)
+        for stats in registry.get_stats().values():
+            self.assertEqual((stats["calls"], stats["failures"]), (1, 0))
+    
+    def test_cancelled_probe_does_not_block_the_circuit(self):
+        registry = RateSourceRegistry(failure_threshold=1, cooldown=0.0, max_workers=1)
+        source = RateSource("caida", "cdt", "Colombia", _failing, timeout=0.1)
+        registry.register(source)
+        registry.fetch("cdt", "Colombia")
+        self.assertEqual(registry.get_stats()["caida"]["circuit"], "open")
+        
+        # Ocupar el único hilo para que la consulta de prueba se cancele en la cola
+        release = threading.Event()
+        blocker = registry._get_executor().submit(release.wait)
+        try:
+            self.assertIsNone(registry.fetch("cdt", "Colombia"))
+        finally:
+            release.set()
+            blocker.result()
+        self.assertEqual(registry.get_stats()["caida"]["queue_timeouts"], 1)
+        
+        # La fuente se recupera: la siguiente prueba debe poder ejecutarse y cerrar el circuito
+        source.fetch = lambda: {"Banco": 9.0}
+        self.assertEqual(registry.fetch("cdt", "Colombia"), {"Banco": 9.0})
+        self.assertEqual(registry.get_stats()["caida"]["circuit"], "closed")
+
+
+if __name__ == "__main__":
+    unittest.main()